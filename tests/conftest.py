@@ -0,0 +1,71 @@
+import pytest
+import spacy
+from spacy.language import Language
+
+from topic_extraction.advisor import Advisor
+from topic_extraction.data.text_preprocessor import TextPreprocessor
+
+
+@pytest.fixture
+def data_folder(tmp_path, monkeypatch):
+    """
+    Advisor's data folder can be set once, so each test gets its own temporary one
+    """
+    monkeypatch.setattr(Advisor, "data_folder", "{}/")
+    monkeypatch.setattr(Advisor, "data_folder_is_set", False)
+    Advisor.set_data_folder_path(str(tmp_path))
+    return tmp_path
+
+
+class LowercaseLemmatizer:
+    """
+    A lemmatizer component that the lemma of each token is its lowercase word
+    """
+    factory = "lowercase_lemmatizer"
+
+    def __call__(self, doc):
+        for token in doc:
+            token.lemma_ = self.lemmatize(token)[0]
+        return doc
+
+    @staticmethod
+    def lemmatize(token) -> list:
+        return [token.lower_]
+
+
+def create_lowercase_lemmatizer(nlp, name=LowercaseLemmatizer.factory, **cfg):
+    return LowercaseLemmatizer()
+
+
+# models are written by spaCy 2 (that requirements pin) or 3, and the component must be known to load them again
+if hasattr(Language, "factory"):
+    Language.factory(LowercaseLemmatizer.factory, func=create_lowercase_lemmatizer)
+else:
+    Language.factories[LowercaseLemmatizer.factory] = create_lowercase_lemmatizer
+
+
+def add_lowercase_lemmatizer(nlp):
+    if hasattr(Language, "factory"):
+        nlp.add_pipe(LowercaseLemmatizer.factory, name=TextPreprocessor.lemmatizer_component)
+    else:
+        nlp.add_pipe(LowercaseLemmatizer(), name=TextPreprocessor.lemmatizer_component)
+    return
+
+
+@pytest.fixture
+def lang_models(tmp_path_factory, monkeypatch):
+    """
+    Small blank models (their lemma is the lowercase word) instead of the trained ones
+    """
+    models = dict()
+    for lang in ["en", "de"]:
+        nlp = spacy.blank(lang)
+        add_lowercase_lemmatizer(nlp)
+        model_folder = tmp_path_factory.mktemp("model-" + lang)
+        nlp.to_disk(model_folder)
+        models[lang] = str(model_folder)
+    monkeypatch.setattr(TextPreprocessor, "lang_models", models)
+    TextPreprocessor.release_objects_of_TextPreprocessor_for_each_lang()
+    yield models
+    TextPreprocessor.release_objects_of_TextPreprocessor_for_each_lang()
+
@@ -0,0 +1,101 @@
+import gzip
+import json
+import os
+
+import pytest
+
+from topic_extraction.data.data_file_index import DataFileIndex
+from topic_extraction.data.data_provider import DataProvider
+from topic_extraction.data.language_detector import LanguageDetector
+
+pages = ["<html><body><p>page {} of the crawl</p></body></html>".format(number) for number in range(50)]
+
+
+def write_data_file(folder, data_file_type: str) -> str:
+    if data_file_type == "CommonCrawl":
+        content = "".join("{}\nWARC-Header: {}\n{}\n".format(DataProvider.common_crawl_page_start, number, page)
+                          for number, page in enumerate(pages))
+    elif data_file_type == "Json":
+        content = "".join(json.dumps(page) + "\n" for page in pages)
+    else:
+        content = "".join("1|key-{}|{}\n".format(number, json.dumps({"fd_data": json.dumps(page)}))
+                          if number % 7 else "broken line {}\n".format(number) for number, page in enumerate(pages))
+    file_path = str(folder / "data.{}".format(data_file_type.lower()))
+    with open(file_path, "w", encoding="utf-8") as file:
+        file.write(content)
+    return file_path
+
+
+@pytest.mark.parametrize("data_file_type", DataProvider.data_file_type)
+def test_records_of_index_are_the_pages_of_data_file(tmp_path, data_file_type):
+    file_path = write_data_file(tmp_path, data_file_type)
+    index = DataProvider._get_data_file_index(data_file_type, file_path)
+    assert len(index) == len(pages)
+    with open(file_path, "rb") as file:
+        content = file.read()
+    assert index.records["offset"][0] == 0 and index.records["length"].sum() == len(content)
+
+    pages_of_index = list(DataProvider._get_raw_data_from_index(data_file_type, index, 0, None))
+    streamed_pages = list(DataProvider._get_raw_data_from_path_file(data_file_type, file_path))
+    assert [page for page in pages_of_index if page is not None] == streamed_pages
+    if data_file_type == "SemiJson":
+        # broken lines are None, so pages stay aligned to their records
+        assert [number for number, page in enumerate(pages_of_index) if page is None] == list(range(0, 50, 7))
+    elif data_file_type == "Json":
+        assert streamed_pages == pages
+    else:
+        assert all(page.endswith(pages[number]) for number, page in enumerate(streamed_pages))
+
+    for start, stop in index.get_partitions(3):
+        assert list(DataProvider._get_raw_data_from_index(data_file_type, index, start, stop)) == \
+               pages_of_index[start:stop]
+    assert [bounds[0] for bounds in index.get_partitions(3)] + [len(pages)] == \
+           [0] + [bounds[1] for bounds in index.get_partitions(3)]
+
+
+@pytest.mark.parametrize("data_file_type", DataProvider.data_file_type)
+def test_reading_from_the_end_of_a_page_continues_after_it(tmp_path, data_file_type):
+    file_path = write_data_file(tmp_path, data_file_type)
+    read_progress = {"offset": 0}
+    pages_ends = [(page, read_progress["page_end"])
+                  for page in DataProvider._get_raw_data_from_path_file(data_file_type, file_path, read_progress)]
+    for number in [0, 6, len(pages_ends) - 1]:
+        rest = DataProvider._get_raw_data_from_path_file(data_file_type, file_path, {"offset": pages_ends[number][1]})
+        assert list(rest) == [page for page, page_end in pages_ends[number + 1:]]
+
+
+def test_records_are_skipped_by_their_saved_languages(tmp_path):
+    file_path = write_data_file(tmp_path, "Json")
+    index = DataFileIndex.get_index(file_path)
+    index.set_languages(10, ["en", "de", "fr", "en", LanguageDetector.unknown_language])
+    index.set_languages(20, ["de", "de"], record_numbers=index.get_record_numbers(20, 30, ["de"])[:2])
+
+    index = DataFileIndex.get_index(file_path)
+    assert index.records["lang"][10:15].tolist() == [b"en", b"de", b"fr", b"en", DataFileIndex.unknown_language]
+    record_numbers = index.get_record_numbers(8, 24, ["en"]).tolist()
+    # records whose language is not known (yet) are not skipped
+    assert record_numbers == [8, 9, 10] + list(range(13, 20)) + [22, 23]
+    assert [json.loads(record) for record in index.get_records(8, 24, ["en"])] == [pages[n] for n in record_numbers]
+
+
+def test_index_is_built_again_when_data_file_changes(tmp_path):
+    file_path = write_data_file(tmp_path, "Json")
+    index = DataFileIndex.get_index(file_path)
+    index.set_languages(0, ["en"])
+    assert DataFileIndex.get_index(file_path).records["lang"][0] == b"en"
+
+    with open(file_path, "a", encoding="utf-8") as file:
+        file.write(json.dumps("<p>appended page</p>") + "\n")
+    index_modified_time = os.path.getmtime(DataFileIndex.get_index_file_path(file_path))
+    os.utime(file_path, (index_modified_time + 1, index_modified_time + 1))
+    index = DataFileIndex.get_index(file_path)
+    assert len(index) == len(pages) + 1 and index.records["lang"][0] == DataFileIndex.unknown_language
+    assert json.loads(list(index.get_records(len(pages)))[0]) == "<p>appended page</p>"
+
+
+def test_compressed_data_file_can_not_be_indexed(tmp_path):
+    file_path = str(tmp_path / "data.json.gz")
+    with open(file_path, "wb") as file:
+        file.write(gzip.compress(b'"<p>page</p>"\n'))
+    with pytest.raises(ValueError):
+        DataFileIndex.get_index(file_path)
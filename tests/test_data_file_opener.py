@@ -0,0 +1,55 @@
+import bz2
+import gc
+import gzip
+import warnings
+
+import pytest
+
+from topic_extraction.data.data_file_opener import DataFileOpener
+from topic_extraction.data.data_provider import DataProvider
+
+lines = ['"<p>page %d</p>"\n' % number for number in range(1000)]
+content = "".join(lines).encode("utf-8")
+
+
+def write_file(folder, name: str, compression: str):
+    file_path = str(folder / name)
+    if compression == "gzip":
+        content_bytes = gzip.compress(content)
+    elif compression == "bz2":
+        content_bytes = bz2.compress(content)
+    elif compression == "zstd":
+        zstandard = pytest.importorskip("zstandard")
+        content_bytes = zstandard.ZstdCompressor().compress(content)
+    else:
+        content_bytes = content
+    with open(file_path, "wb") as file:
+        file.write(content_bytes)
+    return file_path
+
+
+@pytest.mark.parametrize("name, compression", [("data.json", None), ("data.json.gz", "gzip"),
+                                               ("data.json.bz2", "bz2"), ("data.json.zst", "zstd"),
+                                               ("data-gzip-without-extension", "gzip"),
+                                               ("data-bz2-without-extension", "bz2")])
+def test_compressed_files_are_read_and_closed(tmp_path, name, compression):
+    file_path = write_file(tmp_path, name, compression)
+    assert DataFileOpener.get_compression(file_path) == compression
+    with warnings.catch_warnings(record=True) as caught_warnings:
+        warnings.simplefilter("always")
+        with DataFileOpener.open_binary(file_path) as file:
+            assert file.read() == content
+        gc.collect()
+    assert not [warning for warning in caught_warnings if issubclass(warning.category, ResourceWarning)]
+
+
+@pytest.mark.parametrize("name, compression", [("data.json", None), ("data.json.gz", "gzip"),
+                                               ("data.json.bz2", "bz2")])
+def test_reading_is_resumed_from_offset(tmp_path, name, compression):
+    file_path = write_file(tmp_path, name, compression)
+    read_progress = {"offset": 0, "stop": len("".join(lines[:10]).encode("utf-8"))}
+    assert list(DataProvider._read_json_file(file_path, read_progress)) == ["<p>page %d</p>" % n for n in range(10)]
+    read_progress["stop"] = None
+    pages = list(DataProvider._read_json_file(file_path, read_progress))
+    assert pages == ["<p>page %d</p>" % number for number in range(10, 1000)]
+    assert read_progress["offset"] == len(content)
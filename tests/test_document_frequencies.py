@@ -0,0 +1,114 @@
+from collections import OrderedDict
+from itertools import chain
+
+import numpy
+import pytest
+
+from topic_extraction.data.processed_documents import ProcessedDocuments
+from topic_extraction.topic_model.bounded_vocabulary import RestrictedDocuments
+from topic_extraction.topic_model.document_frequencies import DocumentFrequencies
+from topic_extraction.topic_model.sparse_corpus import SparseCorpus
+
+
+def get_documents(number_of_documents: int, number_of_words: int) -> list:
+    random = numpy.random.RandomState(0)
+    words = ["word{}".format(index) for index in range(number_of_words)]
+    return [[words[index] for index in random.zipf(1.3, size=random.randint(0, 12)) % number_of_words]
+            for _ in range(number_of_documents)]
+
+
+@pytest.fixture
+def document_frequencies(data_folder, monkeypatch):
+    monkeypatch.setattr(DocumentFrequencies, "document_frequencies", OrderedDict())
+    monkeypatch.setattr(DocumentFrequencies, "number_of_workers", 1)
+    monkeypatch.setattr(DocumentFrequencies, "max_vocabulary_size", 0)
+    monkeypatch.setattr(DocumentFrequencies, "n_grams_name", "")
+    return DocumentFrequencies
+
+
+def get_state(frequencies: DocumentFrequencies) -> tuple:
+    """
+    :return: everything of the unfiltered dictionary and corpus but the dictionary's lifecycle events
+    """
+    dictionary = {name: value for name, value in vars(frequencies.dictionary).items() if name != "lifecycle_events"}
+    return dictionary, list(frequencies.corpus), frequencies.pruning_threshold
+
+
+@pytest.mark.parametrize("number_of_documents, prune_at", [(3000, 2000000), (25000, 300)])
+def test_parallel_counting_is_the_same_as_serial(document_frequencies, monkeypatch, number_of_documents, prune_at):
+    monkeypatch.setattr(document_frequencies, "prune_at", prune_at)
+    documents = get_documents(number_of_documents, 2000)
+    serial = get_state(document_frequencies.get_document_frequencies("en", 1, 1.0, documents))
+    document_frequencies.set_number_of_workers(3)
+    parallel = get_state(document_frequencies.get_document_frequencies("en", 1, 2.0, documents))
+    assert parallel == serial
+    # gensim prunes the second vocabulary while counting
+    assert (len(serial[0]["token2id"]) < len(set(chain.from_iterable(documents)))) == (prune_at == 300)
+
+
+def test_pruned_counting_is_exact_above_its_pruning_threshold(document_frequencies, tmp_path):
+    documents = get_documents(3000, 2000)
+    exact = document_frequencies.get_document_frequencies("en", 1, 1.0, documents)
+    document_frequencies.set_max_vocabulary_size(200)
+    bounded = document_frequencies.get_document_frequencies("en", 1, 1.0, documents)
+    assert exact.pruning_threshold == 0 and bounded.pruning_threshold > 0
+    assert len(bounded.dictionary) < len(exact.dictionary)
+    for no_below in [bounded.pruning_threshold + 1, bounded.pruning_threshold + 10]:
+        exact_dictionary = exact.get_filtered_dictionary(no_below, 0.5, 2)
+        bounded_dictionary = bounded.get_filtered_dictionary(no_below, 0.5, 2)
+        assert len(exact_dictionary) > 0
+        assert (bounded_dictionary.token2id, bounded_dictionary.dfs, bounded_dictionary.cfs) == \
+               (exact_dictionary.token2id, exact_dictionary.dfs, exact_dictionary.cfs)
+        exact.write_filtered_corpus(exact_dictionary, str(tmp_path / "exact.npy"))
+        bounded.write_filtered_corpus(bounded_dictionary, str(tmp_path / "bounded.npy"))
+        assert list(SparseCorpus.read(str(tmp_path / "bounded.npy"))) == \
+               list(SparseCorpus.read(str(tmp_path / "exact.npy")))
+
+    # frequencies of another maximum vocabulary size are counted again, not taken from memory or disk
+    document_frequencies.document_frequencies.clear()
+    document_frequencies.set_max_vocabulary_size(0)
+    assert document_frequencies.get_document_frequencies("en", 1, 1.0, documents).pruning_threshold == 0
+
+
+def test_frequencies_of_phrased_data_are_counted_apart(document_frequencies):
+    documents = get_documents(300, 50)
+    unigrams = document_frequencies.get_document_frequencies("en", 1, 1.0, documents)
+    phrased_documents = [["_".join(document[:2])] + document[2:] for document in documents]
+    document_frequencies.set_n_grams_name("2-grams-5-10.0-1000")
+    phrased = document_frequencies.get_document_frequencies("en", 1, 1.0, phrased_documents)
+    assert phrased is not unigrams and phrased.dictionary.token2id != unigrams.dictionary.token2id
+    assert document_frequencies.get_counting_name() == "0-2-grams-5-10.0-1000"
+
+    # frequencies of processed data without phrases are taken from disk, not from the phrased ones
+    document_frequencies.document_frequencies.clear()
+    document_frequencies.set_n_grams_name()
+    saved = document_frequencies.get_document_frequencies("en", 1, 1.0, phrased_documents)
+    assert saved.dictionary.token2id == unigrams.dictionary.token2id
+
+
+def test_frequencies_are_counted_again_when_processed_data_is_changed(document_frequencies):
+    documents = get_documents(300, 50)
+    counted = document_frequencies.get_document_frequencies("en", 1, 1.0, documents)
+    document_frequencies.document_frequencies.clear()
+    assert get_state(document_frequencies.get_document_frequencies("en", 1, 1.0, documents)) == get_state(counted)
+
+    document_frequencies.document_frequencies.clear()
+    appended = document_frequencies.get_document_frequencies("en", 1, 1.0, documents + [["word0", "new"]])
+    assert appended.dictionary.num_docs == 301 and "new" in appended.dictionary.token2id
+    assert list(appended.corpus)[-1] == appended.dictionary.doc2bow(["word0", "new"])
+
+
+@pytest.mark.parametrize("max_vocabulary_size", [0, 20])
+def test_workers_reopen_processed_documents(document_frequencies, max_vocabulary_size):
+    documents = get_documents(3000, 200)
+    ProcessedDocuments.write("en", 1, "crawl", documents[:1000])
+    ProcessedDocuments.write("en", 1, "crawl", documents[1000:], part=1)
+    processed_documents = ProcessedDocuments.read("en", 1, "crawl", number_of_parts=2)
+    document_frequencies.set_max_vocabulary_size(max_vocabulary_size)
+    serial = get_state(document_frequencies.get_document_frequencies("en", 1, 1.0, processed_documents))
+    assert (serial[2] > 0) == (max_vocabulary_size > 0)
+
+    init_args = document_frequencies._get_worker_args(RestrictedDocuments({"word0"}, processed_documents))
+    assert init_args == (("en", 1, "crawl", 2), {"word0"}, None)
+    document_frequencies.set_number_of_workers(3)
+    assert get_state(document_frequencies.get_document_frequencies("en", 1, 2.0, processed_documents)) == serial
@@ -0,0 +1,16 @@
+import pytest
+
+from topic_extraction.data.extraction_backend.beautiful_soup_backend import BeautifulSoupBackend
+from topic_extraction.data.extraction_backend.lxml_backend import LxmlBackend
+
+
+@pytest.mark.parametrize("page", ["", "   ", "<", "<<", "a < b", "< p>a</p>", "<1>", "</>", "\x00",
+                                  '<?xml version="1.0" encoding="utf-8"?>', "<p>text</p>",
+                                  "header\n<html><body><p>a < b</p><script>x</script></body></html>"])
+def test_backends_extract_the_same_text(page):
+    texts = list()
+    for backend in [BeautifulSoupBackend(), LxmlBackend()]:
+        web_page = backend.parse(page)
+        texts.append((backend.get_tags_text(web_page, ["p"]),
+                      backend.get_not_excluded_tags_text(web_page, [], ["script"])))
+    assert texts[0] == texts[1]
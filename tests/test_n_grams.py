@@ -0,0 +1,82 @@
+import numpy
+from gensim.models.phrases import Phrases
+
+from topic_extraction.data.n_grams import NGrams
+from topic_extraction.data.processed_documents import ProcessedDocuments
+
+words = ["apple", "river", "mountain", "garden", "window", "forest", "ocean", "silver", "planet", "castle"]
+phrases = [["new", "york"], ["machine", "learning"], ["ice", "cream"]]
+
+
+def get_documents(number_of_documents: int, seed: int = 0) -> list:
+    """
+    :return: documents of random words and phrases
+    """
+    random = numpy.random.RandomState(seed)
+    documents = list()
+    for number in range(number_of_documents):
+        document = list()
+        for position in range(random.randint(0, 20)):
+            if random.rand() < 0.2:
+                document.extend(phrases[random.randint(len(phrases))])
+            else:
+                document.append(words[random.randint(len(words))])
+        documents.append(document)
+    return documents
+
+
+def test_bigrams_are_the_same_as_gensim_phrases(data_folder):
+    documents = get_documents(300)
+    ProcessedDocuments.write("en", 1, "crawl", documents[:100])
+    ProcessedDocuments.write("en", 1, "crawl", documents[100:], part=1)
+    processed_documents = ProcessedDocuments.read("en", 1, "crawl", 2)
+    for min_count, threshold in [(5, 10.0), (1, 1.0), (20, 0.5)]:
+        n_grams = NGrams.learn(processed_documents, 2, min_count, threshold, batch_size=64)
+        gensim_phrases = Phrases(documents, min_count=min_count, threshold=threshold, delimiter="_")
+        phrased_documents = n_grams.write_phrased_documents("en", 1, processed_documents, "phrased", batch_size=64)
+        assert len(phrased_documents) == len(documents)
+        assert list(phrased_documents) == [gensim_phrases[document] for document in documents]
+        assert phrased_documents[5:8] == [gensim_phrases[document] for document in documents[5:8]]
+
+
+def test_learned_n_grams_are_saved_by_their_params(data_folder):
+    ProcessedDocuments.write("en", 1, "crawl", get_documents(100))
+    processed_documents = ProcessedDocuments.read("en", 1, "crawl")
+    n_grams = NGrams.get_n_grams("en", 1, processed_documents, 3, 5, 0.5, max_vocab_size=1000)
+    assert NGrams.get_n_grams_file_path("en", 1, 3, 5, 0.5, 1000) != NGrams.get_n_grams_file_path("en", 1, 3, 5,
+                                                                                                 0.5, 100)
+    saved_n_grams = NGrams.get_n_grams("en", 1, processed_documents, 3, 5, 0.5, max_vocab_size=1000)
+    assert numpy.array_equal(saved_n_grams.bigram_keys, n_grams.bigram_keys)
+    assert numpy.array_equal(saved_n_grams.trigram_keys, n_grams.trigram_keys)
+    phrased_documents = n_grams.write_phrased_documents("en", 1, processed_documents, "phrased")
+    assert "new_york" in [token for document in phrased_documents for token in document]
+
+
+def test_phrased_documents_are_written_once_by_their_n_grams(data_folder, monkeypatch):
+    documents = get_documents(100)
+    ProcessedDocuments.write("en", 1, "crawl", documents)
+    processed_documents = ProcessedDocuments.read("en", 1, "crawl")
+    phrased_documents = NGrams.get_phrased_documents("en", 1, processed_documents, 2, 5, 0.5, max_vocab_size=1000)
+    gensim_phrases = Phrases(documents, min_count=5, threshold=0.5, delimiter="_")
+    assert list(phrased_documents) == [gensim_phrases[document] for document in documents]
+    assert "new_york" in phrased_documents.vocab
+    assert phrased_documents.location[2] == NGrams.get_phrased_data_file_name(2, 5, 0.5, 1000)
+
+    write_phrased_documents = NGrams.write_phrased_documents
+    written = list()
+
+    def recorded_write_phrased_documents(n_grams, *args, **kwargs):
+        written.append(args)
+        return write_phrased_documents(n_grams, *args, **kwargs)
+
+    monkeypatch.setattr(NGrams, "write_phrased_documents", recorded_write_phrased_documents)
+    assert list(NGrams.get_phrased_documents("en", 1, processed_documents, 2, 5, 0.5, 1000)) == \
+           list(phrased_documents)
+    assert written == []
+    # documents of other n-grams or documents that are processed again are phrased again
+    NGrams.get_phrased_documents("en", 1, processed_documents, 2, 5, 10.0, 1000)
+    assert len(written) == 1
+    ProcessedDocuments.write("en", 1, "crawl", documents + documents[:10])
+    processed_documents = ProcessedDocuments.read("en", 1, "crawl")
+    assert len(NGrams.get_phrased_documents("en", 1, processed_documents, 2, 5, 0.5, 1000)) == 110
+    assert len(written) == 2
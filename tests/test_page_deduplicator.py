@@ -0,0 +1,37 @@
+import random
+
+from topic_extraction.data.page_deduplicator import PageDeduplicator
+
+random.seed(0)
+words = ["word%d" % number for number in range(5000)]
+page = " ".join(random.choice(words) for _ in range(300))
+near_page = page.replace(page.split()[150], "changed", 1)
+other_page = " ".join(random.choice(words) for _ in range(300))
+
+
+def get_pages():
+    return [("en", page), ("en", "  " + page.upper() + "\n"), ("en", near_page), ("en", other_page), ("de", page)]
+
+
+def test_none_mode_keeps_every_page():
+    assert list(PageDeduplicator("none").deduplicate(get_pages())) == get_pages()
+
+
+def test_exact_mode_removes_pages_with_the_same_words_only():
+    deduplicator = PageDeduplicator("exact")
+    pages = deduplicator.deduplicate(get_pages())
+    assert deduplicator.removed_pages == {"exact": 0, "near": 0}
+    assert list(pages) == [("en", page), ("en", near_page), ("en", other_page)]
+    assert deduplicator.removed_pages == {"exact": 2, "near": 0}
+
+
+def test_near_mode_removes_near_duplicates_too():
+    deduplicator = PageDeduplicator("near", threshold=0.8)
+    assert list(deduplicator.deduplicate(get_pages())) == [("en", page), ("en", other_page)]
+    assert deduplicator.removed_pages == {"exact": 2, "near": 1}
+
+
+def test_only_the_last_kept_pages_are_remembered():
+    deduplicator = PageDeduplicator("exact", max_pages=1)
+    pages = [("en", page), ("en", other_page), ("en", page)]
+    assert list(deduplicator.deduplicate(pages)) == pages
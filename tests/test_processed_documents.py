@@ -0,0 +1,43 @@
+import numpy
+import pytest
+
+from topic_extraction.data.processed_documents import ProcessedDocuments
+
+first_part = [["topic", "model", "data"], [], ["data", "über", "straße", "data"]]
+second_part = [["model", "news"], ["crawl", "topic", "news", "news"]]
+
+
+def test_documents_are_the_same_after_they_are_written_and_read(data_folder):
+    assert ProcessedDocuments.read("de", 1, "data") is None
+    ProcessedDocuments.write("de", 1, "data", first_part)
+    documents = ProcessedDocuments.read("de", 1, "data")
+    assert list(documents) == first_part
+    assert documents.vocab == ["topic", "model", "data", "über", "straße"]
+    first_part_ids = [documents.get_token_ids(index).tolist() for index in range(len(documents))]
+
+    ProcessedDocuments.write("de", 1, "data", second_part, part=1)
+    assert ProcessedDocuments.read("de", 1, "data", number_of_parts=3) is None
+    documents = ProcessedDocuments.read("de", 1, "data", number_of_parts=2)
+    all_documents = first_part + second_part
+    assert len(documents) == len(all_documents)
+    assert list(documents) == all_documents
+    assert [documents[index] for index in range(len(documents))] == all_documents
+    assert documents[-1] == all_documents[-1] and documents[1:4] == all_documents[1:4]
+    # ids of the parts that are written before are not changed by the next parts' words
+    assert documents.vocab[:5] == ["topic", "model", "data", "über", "straße"]
+    assert [documents.get_token_ids(index).tolist() for index in range(len(first_part))] == first_part_ids
+    assert isinstance(documents.get_token_ids(3), numpy.memmap)
+    with pytest.raises(IndexError):
+        documents.get_token_ids(len(all_documents))
+
+
+def test_documents_of_another_vocabulary_are_written_without_decoding(data_folder):
+    ProcessedDocuments.write("en", 1, "shard-1", second_part)
+    ProcessedDocuments.write("en", 1, "shard-1", first_part, part=1)
+    shard = ProcessedDocuments.read("en", 1, "shard-1", number_of_parts=2)
+    ProcessedDocuments.write("en", 1, "data", first_part)
+    ProcessedDocuments.write_documents("en", 1, "data", shard, part=1)
+
+    documents = ProcessedDocuments.read("en", 1, "data", number_of_parts=2)
+    assert list(documents) == first_part + second_part + first_part
+    assert len(documents.vocab) == len(set(documents.vocab)) == 7
@@ -0,0 +1,51 @@
+import numpy
+import pytest
+from gensim.corpora import Dictionary
+from gensim.matutils import corpus2csc
+from gensim.models import LsiModel, TfidfModel
+
+from topic_extraction.topic_model.sparse_corpus import SparseCorpus
+
+
+def get_documents(number_of_documents: int = 60) -> list:
+    random = numpy.random.RandomState(0)
+    words = ["word{}".format(index) for index in range(40)]
+    documents = [[words[index] for index in random.zipf(1.5, size=random.randint(0, 30)) % len(words)]
+                 for _ in range(number_of_documents)]
+    # words that are in all documents have zero weight in TF-IDF
+    return [document + ["common"] for document in documents]
+
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    documents = get_documents()
+    dictionary = Dictionary(documents)
+    monkeypatch.setattr(SparseCorpus, "write_buffer_size", 7)
+    SparseCorpus.write(str(tmp_path / "corpus.npy"), (dictionary.doc2bow(document) for document in documents))
+    return dictionary, [dictionary.doc2bow(document) for document in documents], \
+        SparseCorpus.read(str(tmp_path / "corpus.npy"))
+
+
+def test_written_corpus_is_the_same_as_bag_of_words(corpus, tmp_path):
+    dictionary, bag_of_words, sparse_corpus = corpus
+    assert list(sparse_corpus) == bag_of_words
+    assert sparse_corpus[5:9] == bag_of_words[5:9]
+    assert not list(tmp_path.glob("*.raw"))
+    SparseCorpus.write(str(tmp_path / "empty.npy"), [[], []])
+    assert list(SparseCorpus.read(str(tmp_path / "empty.npy"))) == [[], []]
+
+
+def test_tf_idf_matrices_are_the_same_as_gensim_tfidf(corpus):
+    dictionary, bag_of_words, sparse_corpus = corpus
+    tf_idf = TfidfModel(bag_of_words)
+    expected = corpus2csc(tf_idf[bag_of_words], num_terms=len(dictionary)).toarray()
+    matrices = list(sparse_corpus.get_tf_idf_matrices(len(dictionary), 25))
+    assert [matrix.shape[1] for matrix in matrices] == [25, 25, 10]
+    numpy.testing.assert_allclose(numpy.hstack([matrix.toarray() for matrix in matrices]), expected, atol=1e-12)
+
+    lsi_of_bag_of_words = LsiModel(tf_idf[bag_of_words], id2word=dictionary, num_topics=5, chunksize=25,
+                                   random_seed=1)
+    lsi_of_matrices = LsiModel(id2word=dictionary, num_topics=5, chunksize=25, random_seed=1)
+    for matrix in sparse_corpus.get_tf_idf_matrices(len(dictionary), lsi_of_matrices.chunksize):
+        lsi_of_matrices.add_documents(matrix)
+    numpy.testing.assert_allclose(lsi_of_matrices.projection.s, lsi_of_bag_of_words.projection.s, rtol=1e-6)
@@ -0,0 +1,216 @@
+import json
+import os
+
+import numpy
+import pytest
+
+from topic_extraction.advisor import Advisor
+from topic_extraction.data.data_provider import DataProvider
+from topic_extraction.data.text_preprocessor import TextPreprocessor
+
+words = ["apple", "river", "mountain", "garden", "window", "forest", "Ocean", "silver", "planet", "castle", "music",
+         "winter", "summer", "bridge", "island", "market"]
+
+
+def get_pages(number_of_pages: int, seed: int = 0, langs: tuple = ("en",)) -> list:
+    """
+    :return: lines of a Json data file, pages declare their language and have random words
+    """
+    random = numpy.random.RandomState(seed)
+    lines = list()
+    for number in range(number_of_pages):
+        text = " ".join(random.choice(words, random.randint(3, 30)))
+        lines.append(json.dumps('<html lang="%s"><p>%s</p></html>' % (langs[number % len(langs)], text)) + "\n")
+    return lines
+
+
+def write_data_file(file_path, lines: list):
+    with open(str(file_path), "w") as data_file:
+        data_file.writelines(lines)
+
+
+def get_processed_data(data_file_name: str, data_version: int, **kwargs) -> dict:
+    processed_data = TextPreprocessor.get_processed_data(data_file_name, "json", data_version, "Json", None, None,
+                                                         use_page_lang=True, **kwargs)
+    return {lang: list(documents) for lang, documents in processed_data.items()}
+
+
+def test_shards_are_processed_like_one_data_file(data_folder, lang_models):
+    lines = get_pages(60, langs=("en", "de"))
+    for shard in range(3):
+        write_data_file(data_folder / ("crawl-%d.json" % shard), lines[shard * 20:(shard + 1) * 20])
+    write_data_file(data_folder / "crawl.json", lines)
+    expected = get_processed_data("crawl", 1)
+    assert expected["en"][0] == json.loads(lines[0]).split("<p>")[1].split("</p>")[0].lower().split()
+
+    assert get_processed_data("sharded", 2, data_shards="crawl-*.json", shard_workers=2,
+                              checkpoint_size=7) == expected
+    # a new shard is processed alone and appended in shards' order
+    new_lines = get_pages(10, seed=1, langs=("en", "de"))
+    write_data_file(data_folder / "crawl-3.json", new_lines)
+    write_data_file(data_folder / "crawl.json", lines + new_lines)
+    assert get_processed_data("sharded", 2, data_shards="crawl-*.json") == get_processed_data("crawl", 3)
+
+
+def test_state_of_data_versions_is_kept_apart(data_folder, lang_models):
+    lines = get_pages(40, langs=("en", "de"))
+    write_data_file(data_folder / "crawl.json", lines)
+    english = get_processed_data("crawl", 1, requested_langs=["en"])
+    all_langs = get_processed_data("crawl", 2)
+    assert list(english) == ["en"] and sorted(all_langs) == ["de", "en"]
+    assert english["en"] == all_langs["en"]
+
+    # new records are appended to the first version only
+    new_lines = get_pages(10, seed=1, langs=("en", "de"))
+    write_data_file(data_folder / "crawl.json", lines + new_lines)
+    appended = get_processed_data("crawl", 1, requested_langs=["en"], incremental=True)
+    assert list(appended) == ["en"] and len(appended["en"]) == 25
+    assert get_processed_data("crawl", 2) == all_langs
+    assert get_processed_data("crawl", 1, requested_langs=["en"]) == appended
+
+
+def test_long_documents_are_processed_in_batches_of_bounded_characters(lang_models):
+    random = numpy.random.RandomState(0)
+    documents = [" ".join(random.choice(words, length)) for length in [5, 2000, 40, 3, 900, 10, 10, 10]]
+    text_processor = TextPreprocessor.init_replacement("en")
+    expected = [[word.lower() for word in document.split()] for document in documents]
+    assert [text_processor.document_pre_process(document, chunk_size=500) for document in documents] == expected
+
+    batches_characters = list()
+    pipe = text_processor.model.pipe
+
+    def recorded_pipe(texts, as_tuples: bool = False, **kwargs):
+        if as_tuples:
+            texts = list(texts)
+            batches_characters.append(sum(len(text) for text, context in texts))
+        return pipe(texts, as_tuples=as_tuples, **kwargs)
+
+    text_processor.model.pipe = recorded_pipe
+    processed_documents = text_processor._TextPreprocessor__process_list_of_docs(list(documents), batch_size=4,
+                                                                                 chunk_size=500)
+    assert processed_documents == expected
+    assert len(batches_characters) > 1 and max(batches_characters) <= 500
+    assert sum(batches_characters) == sum(len(document) for document in documents)
+
+
+@pytest.mark.parametrize("language_workers", [1, 2])
+def test_stopped_processing_is_resumed_from_checkpoints(data_folder, lang_models, monkeypatch, language_workers):
+    write_data_file(data_folder / "crawl.json", get_pages(50, langs=("en", "de")))
+    expected = get_processed_data("crawl", 1)
+
+    write_json_file = TextPreprocessor._write_json_file
+    saved_batches = list()
+
+    def stopping_write_json_file(file_path: str, content, indent: int = None):
+        if "-batch-" in file_path and "-raw-batch-" not in file_path:
+            if len(saved_batches) == 3:
+                raise KeyboardInterrupt()
+            saved_batches.append(file_path)
+        write_json_file(file_path, content, indent)
+
+    monkeypatch.setattr(TextPreprocessor, "_write_json_file", staticmethod(stopping_write_json_file))
+    with pytest.raises(KeyboardInterrupt):
+        get_processed_data("crawl", 2, checkpoint_size=4, language_workers=language_workers)
+    monkeypatch.setattr(TextPreprocessor, "_write_json_file", staticmethod(write_json_file))
+    checkpoints = os.listdir(Advisor.get_checkpoints_folder_path(2))
+    # raw data of the saved batches is released, the rest of it is loaded only when it is processed; kept pages of
+    # both languages are saved when 4 pages of one of them are read, so 7 pages in 2 batches each time
+    assert len([name for name in checkpoints if "-raw-batch-" in name]) == 2 * 7 + 1 - 3
+    assert len([name for name in checkpoints if "-raw-batch-" not in name and "-batch-" in name]) == 3
+
+    def read_again(*args, **kwargs):
+        raise AssertionError("raw data is read again")
+
+    monkeypatch.setattr(DataProvider, "get_train_data_pages", read_again)
+    assert get_processed_data("crawl", 2, checkpoint_size=4, language_workers=language_workers) == expected
+    assert not os.path.exists(Advisor.get_checkpoints_folder_path(2))
+
+
+def test_stopped_reading_is_resumed_from_its_offset(data_folder, lang_models, monkeypatch):
+    lines = get_pages(50, langs=("en", "de"))
+    write_data_file(data_folder / "crawl.json", lines)
+    expected = get_processed_data("crawl", 1)
+
+    write_json_file = TextPreprocessor._write_json_file
+    saved_raw_batches = list()
+
+    def stopping_write_json_file(file_path: str, content, indent: int = None):
+        if "-raw-batch-" in file_path:
+            if len(saved_raw_batches) == 5:
+                raise KeyboardInterrupt()
+            saved_raw_batches.append(file_path)
+        write_json_file(file_path, content, indent)
+
+    monkeypatch.setattr(TextPreprocessor, "_write_json_file", staticmethod(stopping_write_json_file))
+    with pytest.raises(KeyboardInterrupt):
+        get_processed_data("crawl", 2, checkpoint_size=4)
+    monkeypatch.setattr(TextPreprocessor, "_write_json_file", staticmethod(write_json_file))
+    manifest = TextPreprocessor._read_json_file(Advisor.get_checkpoints_folders_file_path(2, "manifest", "json"))
+    # the third save is stopped after its first batch, so reading is resumed after the pages of two saves
+    assert manifest["raw_data"] is None and manifest["raw_batches"] == {"en": 2, "de": 2}
+    assert manifest["read_progress"]["read_offset"] == sum(len(line) for line in lines[:14])
+
+    start_offsets = list()
+    get_train_data_pages = DataProvider.get_train_data_pages
+
+    def recorded_get_train_data_pages(data_provider, *args, start_offset: int = 0, **kwargs):
+        start_offsets.append(start_offset)
+        return get_train_data_pages(data_provider, *args, start_offset=start_offset, **kwargs)
+
+    monkeypatch.setattr(DataProvider, "get_train_data_pages", recorded_get_train_data_pages)
+    assert get_processed_data("crawl", 2, checkpoint_size=4) == expected
+    assert start_offsets == [manifest["read_progress"]["read_offset"]]
+    meta = TextPreprocessor._read_json_file(Advisor.get_data_file_meta_path())
+    assert meta["data_versions"]["2"]["read_offset"] == sum(len(line) for line in lines)
+
+
+@pytest.mark.parametrize("number_of_workers", [1, 2])
+def test_pages_are_read_while_they_are_taken(data_folder, monkeypatch, number_of_workers):
+    lines = get_pages(20, langs=("en", "de"))
+    write_data_file(data_folder / "crawl.json", lines)
+    read_pages = list()
+    get_raw_data_from_path_file = DataProvider._get_raw_data_from_path_file
+
+    def recorded_raw_data(*args, **kwargs):
+        for page in get_raw_data_from_path_file(*args, **kwargs):
+            read_pages.append(page)
+            yield page
+
+    monkeypatch.setattr(DataProvider, "_get_raw_data_from_path_file", staticmethod(recorded_raw_data))
+    data_provider = DataProvider(number_of_workers=number_of_workers, chunk_size=3, use_page_lang=True)
+    pages = data_provider.get_train_data_pages("crawl", "json", "Json")
+    assert next(pages)[0] == "en"
+    # only the first batch of pages is read to take the first one
+    assert len(read_pages) == (1 if number_of_workers == 1 else 6)
+    assert [lang for lang, text in pages] == ["de", "en"] * 9 + ["de"]
+    assert data_provider.read_offset == sum(len(line) for line in lines)
+
+
+def test_cached_lemmas_are_not_lemmatized_again(lang_models):
+    random = numpy.random.RandomState(0)
+    documents = [" ".join(random.choice(words, random.randint(3, 30))) for _ in range(40)]
+    without_cache = TextPreprocessor.init_replacement("en", lemma_cache_size=0)
+    assert TextPreprocessor.lemmatizer_component in without_cache.model.pipe_names
+    expected = without_cache._TextPreprocessor__process_list_of_docs(list(documents))
+
+    for lemma_cache_size in [len(words), 10]:
+        text_processor = TextPreprocessor.init_replacement("en", lemma_cache_size=lemma_cache_size)
+        assert TextPreprocessor.lemmatizer_component not in text_processor.model.pipe_names
+        lemmatizer = text_processor.token_filter.lemmatizer
+        lemmatized_words = list()
+        lemmatize = lemmatizer.lemmatize
+
+        def recorded_lemmatize(token):
+            lemmatized_words.append(token.text)
+            return lemmatize(token)
+
+        lemmatizer.lemmatize = recorded_lemmatize
+        assert text_processor._TextPreprocessor__process_list_of_docs(list(documents)) == expected
+        token_filter = text_processor.token_filter
+        assert len(lemmatized_words) == token_filter.cache_misses and token_filter.cache_hits > 0
+        assert len(token_filter.cache) == lemma_cache_size
+        # each distinct word is lemmatized once if it is not evicted
+        if lemma_cache_size == len(words):
+            assert sorted(lemmatized_words) == sorted(set(words))
+        else:
+            assert token_filter.cache_evictions == token_filter.cache_misses - lemma_cache_size > 0
@@ -1,3 +1,4 @@
+from glob import glob
 from os import path, makedirs
 
 
@@ -13,6 +14,8 @@ class Advisor:
     model_type_folder_name = "{}-model/"
     visualization_folder_name = "visualization/"
     topic_number_folder_name = "Topic-{}/"
+    shards_folder_name = "shards-data-version-{}/"
+    checkpoints_folder_name = "checkpoints-data-version-{}/"
 
     file_with_extension = "{}.{}"
     file_without_extension = "{}"
@@ -39,6 +42,61 @@ class Advisor:
     def get_data_file_meta_path(cls):
         return cls.get_data_folders_file_path("meta-of-data-file", "json")
 
+    @classmethod
+    def get_data_shards_paths(cls, data_shards: str) -> list:
+        """
+        :param data_shards: either a glob pattern of data shards (e.g. "crawl-*.warc.gz") or a manifest file that
+        each line of it is a shard's path; relative paths are in data folder
+        :return: list of exact shards' paths; glob's shards are sorted by name and manifest's shards are in its order
+        """
+        if path.isabs(data_shards) is False:
+            data_shards = cls.get_data_folder_path() + data_shards
+        if any(char in data_shards for char in "*?["):
+            return sorted(glob(data_shards))
+        with open(data_shards, "r") as manifest:
+            shards = [line.strip() for line in manifest if line.strip()]
+        return [shard if path.isabs(shard) else cls.get_data_folder_path() + shard for shard in shards]
+
+    @classmethod
+    def get_shard_name(cls, shard_path: str) -> str:
+        """
+        :return: the shard's path relative to data folder in one name e.g. "2020/crawl-1.gz" -> "2020__crawl-1.gz"
+        """
+        shard_path = path.relpath(shard_path, cls.get_data_folder_path())
+        return shard_path.replace(path.sep, "__")
+
+    @classmethod
+    def get_shards_folders_file_path(cls, data_version: int, file_name: str, file_extension: str):
+        """
+        This is for files of processed shards, each shard of each data version is processed and kept separately
+        """
+        folder = cls.get_data_folder_path() + cls.shards_folder_name.format(data_version)
+        if path.exists(folder) is False:
+            makedirs(folder)
+        return folder + cls.file_with_extension.format(file_name, file_extension)
+
+    @classmethod
+    def get_checkpoints_folder_path(cls, data_version: int, checkpoints_name: str = None):
+        """
+        :param checkpoints_name: name of a separate processing of the data version (e.g. a data shard), its
+        checkpoints are in a sub folder of data version's checkpoints
+        """
+        folder = cls.get_data_folder_path() + cls.checkpoints_folder_name.format(data_version)
+        if checkpoints_name is not None:
+            folder += cls.file_without_extension.format(checkpoints_name) + "/"
+        return folder
+
+    @classmethod
+    def get_checkpoints_folders_file_path(cls, data_version: int, file_name: str, file_extension: str,
+                                          checkpoints_name: str = None):
+        """
+        This is for checkpoints of processing a data version, they are kept until the data version is written
+        """
+        folder = cls.get_checkpoints_folder_path(data_version, checkpoints_name)
+        if path.exists(folder) is False:
+            makedirs(folder)
+        return folder + cls.file_with_extension.format(file_name, file_extension)
+
     @classmethod
     def get_language_folders_path(cls, lang: str):
         folder = cls.get_data_folder_path() + cls.lang_folder_name.format(lang)
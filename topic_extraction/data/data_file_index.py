@@ -0,0 +1,144 @@
+import logging
+import mmap
+from os import path
+
+import numpy
+
+from topic_extraction.data.data_file_opener import DataFileOpener
+from topic_extraction.data.language_detector import LanguageDetector
+
+
+class DataFileIndex:
+    """
+    A sidecar index of a raw data file that keeps the byte offset and length of each of its records (pages) and,
+    once they are detected, their languages; so any range of records can be read straight from the file by mmap
+    without scanning it from the top, e.g. to split one file between workers or to re-read a part of it.
+    The index is a numpy array saved next to the data file: (data-file-name).(data-file-extension).index.npy
+    """
+    record_dtype = numpy.dtype([("offset", "<i8"), ("length", "<i8"), ("lang", "S8")])
+    # language of records that is not detected yet or could not be detected (LanguageDetector.unknown_language)
+    unknown_language = b""
+
+    def __init__(self, data_file_path: str, records: numpy.ndarray):
+        """
+        :raise This should not be called, instead "get_index" must be called
+        :param data_file_path: the exact data file path
+        :param records: array of records in record_dtype
+        """
+        self.data_file_path = data_file_path
+        self.records = records
+
+    @staticmethod
+    def get_index_file_path(data_file_path: str) -> str:
+        return data_file_path + ".index.npy"
+
+    @classmethod
+    def get_index(cls, data_file_path: str, record_start: bytes = None):
+        """
+        First it looks for the index that is built before, if it is not there the index is built and saved
+        :param data_file_path: the exact data file path
+        :param record_start: a record starts at a line that begins with this; if it is None each line is a record
+        :return: DataFileIndex object
+        """
+        if DataFileOpener.get_compression(data_file_path) is not None:
+            raise ValueError("Compressed data file %s can not be read by index; it must be decompressed first" %
+                             data_file_path)
+        index_file_path = cls.get_index_file_path(data_file_path)
+        if path.exists(index_file_path) and path.getmtime(index_file_path) >= path.getmtime(data_file_path):
+            logging.info("---- Index of data file was built before")
+            return DataFileIndex(data_file_path, numpy.load(index_file_path, mmap_mode="r+"))
+        records = cls._build_records(data_file_path, record_start)
+        numpy.save(index_file_path, records)
+        return DataFileIndex(data_file_path, numpy.load(index_file_path, mmap_mode="r+"))
+
+    @classmethod
+    def _build_records(cls, data_file_path: str, record_start: bytes = None) -> numpy.ndarray:
+        """
+        Scans the data file once line by line
+        :return: array of records' offsets and lengths
+        """
+        logging.info("---- Building index of data file %s" % data_file_path)
+        offsets = list()
+        offset = 0
+        with open(data_file_path, "rb") as file:
+            for line in file:
+                if record_start is None or not offsets or line.strip().startswith(record_start):
+                    offsets.append(offset)
+                offset += len(line)
+        records = numpy.zeros(len(offsets), dtype=cls.record_dtype)
+        records["offset"] = offsets
+        records["length"] = numpy.diff(numpy.append(records["offset"], offset))
+        logging.info("---- Index of data file is built; %d records" % len(records))
+        return records
+
+    def __len__(self):
+        return len(self.records)
+
+    def get_records(self, start: int = 0, stop: int = None, langs: list = None):
+        """
+        :param start: index of the first record
+        :param stop: index after the last record, None for the end of file
+        :param langs: if it is given, records that their language is known and is not one of these are skipped
+        :return: generator of records' text in the range
+        """
+        records = self.records[start:stop]
+        if len(records) == 0:
+            return
+        if langs is not None:
+            records = records[self.__get_langs_mask(records, langs)]
+        with open(self.data_file_path, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for offset, length in zip(records["offset"].tolist(), records["length"].tolist()):
+                    yield data[offset:offset + length].decode("utf-8", errors="replace")
+
+    def __get_langs_mask(self, records: numpy.ndarray, langs: list) -> numpy.ndarray:
+        """
+        :return: mask of records that their language is one of langs or is not known yet
+        """
+        known_langs = [lang.encode() for lang in langs] + [self.unknown_language]
+        return numpy.isin(records["lang"], known_langs)
+
+    def get_record_numbers(self, start: int = 0, stop: int = None, langs: list = None) -> numpy.ndarray:
+        """
+        :return: indexes of the records that "get_records" gives by the same arguments
+        """
+        record_numbers = numpy.arange(len(self.records))[start:stop]
+        if langs is not None:
+            record_numbers = record_numbers[self.__get_langs_mask(self.records[start:stop], langs)]
+        return record_numbers
+
+    def get_record_end(self, record_number: int) -> int:
+        """
+        :return: the byte offset that the record ends at
+        """
+        return int(self.records["offset"][record_number] + self.records["length"][record_number])
+
+    def get_record_number(self, offset: int) -> int:
+        """
+        :return: index of the first record that starts at or after the byte offset
+        """
+        return int(numpy.searchsorted(self.records["offset"], offset))
+
+    def get_partitions(self, number_of_partitions: int) -> list:
+        """
+        :return: list of (start, stop) ranges of records that split the file to (almost) equal number of records
+        """
+        bounds = numpy.linspace(0, len(self.records), number_of_partitions + 1).astype(int).tolist()
+        return [(bounds[i], bounds[i + 1]) for i in range(number_of_partitions) if bounds[i] < bounds[i + 1]]
+
+    def set_languages(self, start: int, langs: list, record_numbers: numpy.ndarray = None):
+        """
+        Writes the detected languages of a range of records in the index file; ranges of different workers can be
+        written at the same time since each of them writes only its own part of the file
+        :param start: index of the first record of the range
+        :param langs: list of languages of the records in the range in order; LanguageDetector.unknown_language is
+        saved as unknown_language, so those records are not skipped as if they were of another language
+        :param record_numbers: indexes of the records if they are not all records of the range (e.g. some are skipped)
+        """
+        if record_numbers is None:
+            record_numbers = numpy.arange(start, start + len(langs))
+        self.records["lang"][record_numbers[:len(langs)]] = \
+            [self.unknown_language if lang == LanguageDetector.unknown_language else lang.encode()[:8]
+             for lang in langs]
+        self.records.flush()
+        return
@@ -0,0 +1,73 @@
+import bz2
+import gzip
+import io
+
+
+class DataFileOpener:
+    """
+    Opens raw data files whether they are compressed (gzip, bz2 or zstd) or not, so they are read as a stream
+    without decompressing them to disk first; compression is detected by file's extension or its magic bytes
+    """
+    buffer_size = 1 << 20  # data files are read in 1MB blocks
+
+    compressions = {"gzip": [".gz", ".gzip"], "bz2": [".bz2"], "zstd": [".zst", ".zstd"]}
+    magic_bytes = {"gzip": b"\x1f\x8b", "bz2": b"BZh", "zstd": b"\x28\xb5\x2f\xfd"}
+
+    @classmethod
+    def get_compression(cls, data_file_path: str):
+        """
+        :param data_file_path: the exact data file path
+        :return: one of the compressions' names, None if the file is not compressed
+        """
+        for compression, extensions in cls.compressions.items():
+            if data_file_path.lower().endswith(tuple(extensions)):
+                return compression
+        with open(data_file_path, "rb") as file:
+            head = file.read(4)
+        for compression, magic in cls.magic_bytes.items():
+            if head.startswith(magic):
+                return compression
+        return None
+
+    @classmethod
+    def open_binary(cls, data_file_path: str):
+        """
+        :return: buffered binary stream of the (decompressed) content of the file
+        """
+        compression = cls.get_compression(data_file_path)
+        if compression is None:
+            return open(data_file_path, "rb", buffering=cls.buffer_size)
+        # gzip and bz2 files are opened by their path, so closing the stream closes the file too
+        if compression == "gzip":
+            stream = gzip.open(data_file_path, "rb")
+        elif compression == "bz2":
+            stream = bz2.open(data_file_path, "rb")
+        else:
+            stream = cls._open_zstd(open(data_file_path, "rb", buffering=cls.buffer_size))
+        return io.BufferedReader(stream, buffer_size=cls.buffer_size)
+
+    @classmethod
+    def seek(cls, file, offset: int):
+        """
+        Moves the stream to the offset of (decompressed) content; streams that can not seek are read up to it
+        """
+        if offset == 0:
+            return
+        if file.seekable():
+            file.seek(offset)
+            return
+        while offset > 0:
+            block = file.read(min(offset, cls.buffer_size))
+            if not block:
+                break
+            offset -= len(block)
+        return
+
+    @classmethod
+    def _open_zstd(cls, file):
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("Reading zstd compressed data files needs 'zstandard' package; "
+                              "pip3 install zstandard")
+        return zstandard.ZstdDecompressor().stream_reader(file, read_size=cls.buffer_size, closefd=True)
@@ -1,22 +1,36 @@
 import json
 import logging
-
-from bs4 import BeautifulSoup
-
-from langdetect import detect
-from langdetect.lang_detect_exception import LangDetectException
+from itertools import islice
+from multiprocessing import Pool
+from time import perf_counter
 
 from topic_extraction.advisor import Advisor
+from topic_extraction.data.data_file_index import DataFileIndex
+from topic_extraction.data.data_file_opener import DataFileOpener
+from topic_extraction.data.extraction_backend.beautiful_soup_backend import BeautifulSoupBackend
+from topic_extraction.data.extraction_backend.lxml_backend import LxmlBackend
+from topic_extraction.data.language_detector import LanguageDetector
 
 
 class DataProvider:
     data_file_type = ["CommonCrawl", "Json", "SemiJson"]
     important_tags = ["h1", "p"]
     skip_tags = ["head", "style", "script", "noscript", "title", "link", "meta"]
+    common_crawl_page_start = "Content-Type: text/html"
+    extraction_backends = {BeautifulSoupBackend.backend_name: BeautifulSoupBackend,
+                           LxmlBackend.backend_name: LxmlBackend}
+    # the DataProvider of a worker process, it is set once by the pool's initializer
+    worker_data_provider = None
 
     def __init__(self,
                  include_tags: list = None,
-                 exclude_tags: list = None
+                 exclude_tags: list = None,
+                 number_of_workers: int = 1,
+                 chunk_size: int = 64,
+                 extraction_backend: str = "html.parser",
+                 lang_sample_size: int = 2000,
+                 use_page_lang: bool = False,
+                 langs: list = None
                  ):
         """
 
@@ -26,82 +40,142 @@ class DataProvider:
 
         :param include_tags: html tags that their text are wanted (pass this param make exclude_tags params ignored)
         :param exclude_tags: html tags that their text are unwanted
+        :param number_of_workers: number of processes that parse pages and detect their language; with 1 (default)
+        pages are handled one after another in the current process
+        :param chunk_size: number of pages that are sent to a worker process at once
+        :param extraction_backend: name of the html parser that pages are parsed by, one of the extraction_backends
+        :param lang_sample_size: maximum number of page text's characters that its language is detected by
+        :param use_page_lang: if True the language that page declares (<html lang> or meta tags) is used and
+        detection is skipped for that page
+        :param langs: if it is given, pages of other languages are dropped right after their language is detected
+        (and records of other languages are not read at all when they are read by data file's index)
         """
         self.include_tags = include_tags
         self.exclude_tags = exclude_tags
+        self.number_of_workers = number_of_workers
+        self.chunk_size = chunk_size
+        self.extraction_backend = self._get_extraction_backend(extraction_backend)
+        self.language_detector = LanguageDetector(lang_sample_size, use_page_lang)
+        self.langs = None if langs is None else list(langs)
+        self.dropped_pages = 0
+        self.read_offset = 0
 
         return
 
+    @classmethod
+    def _get_extraction_backend(cls, backend_name: str):
+        if backend_name in cls.extraction_backends:
+            return cls.extraction_backends[backend_name]()
+        raise NotImplementedError("Html extraction backend '%s' is not supported" % backend_name)
+
     @staticmethod
-    def _read_json_file(data_file_path: str) -> list:
+    def _get_json_page(record: str):
         """
-        :param data_file_path: os path to data file
-        :return: list of web pages in html
+        :param record: one line of a Json data file
+        :return: the web page of the line
         """
-        file_data = list()
-        with open(data_file_path) as json_file:
-            for line in json_file:
-                data_file = json.loads(line)
-                file_data.append(data_file)
-        return file_data
+        return json.loads(record)
 
     @staticmethod
-    def _read_semi_json_file(data_file_path: str) -> list:
-        """
-        :param data_file_path: os path to data file
-        :return: list of web pages in html
-        """
-        file = open(data_file_path, "r")
-        count = 0
-        dataset = list()
-        while True:
-            line = file.readline()
-            if not line:
-                break
-            count += 1
-            splits = [l for l in line.split('|') if l]
-            if len(splits) == 3:
-                try:
-                    # check the storage version protocol
-                    if splits[0] == '1':
-                        data = json.loads(json.loads(splits[2])['fd_data'])
-                        dataset.append(data)
-                    else:
-                        raise Warning(f"Undefined storage version `{splits[0]}`")
-                except:
-                    logging.warning(" ---- There is a problem in reading data file line {} ----".format(count))
-        file.close()
-        return dataset
+    def _get_semi_json_page(record: str, record_number: int):
+        """
+        :param record: one line of a SemiJson data file
+        :param record_number: the line number (for logging)
+        :return: the web page of the line, None if the line does not have a valid page
+        """
+        splits = [l for l in record.split('|') if l]
+        if len(splits) == 3:
+            try:
+                # check the storage version protocol
+                if splits[0] == '1':
+                    return json.loads(json.loads(splits[2])['fd_data'])
+                else:
+                    raise Warning(f"Undefined storage version `{splits[0]}`")
+            except:
+                logging.warning(" ---- There is a problem in reading data file line {} ----".format(record_number))
+        return None
 
     @staticmethod
-    def _read_common_crawl_file(data_file_path: str):
+    def _get_common_crawl_page(record: str) -> str:
         """
-        :param data_file_path: os path to data file
-        :return: list of web pages in html
+        :param record: lines of a CommonCrawl data file from a "Content-Type: text/html" line to the next one
+        :return: the web page of the record
         """
-        logging.info("---- Reading data file %s " % data_file_path)
-        # line_number = 1
-        error_line_count = 0
-        file = open(data_file_path, "r")
-        data_set = list()
-        page = ""
-        while True:
-            try:
-                line = file.readline()
-                if not line:
-                    data_set.append(page)
+        return "".join(line.strip() for line in record.split("\n"))
+
+    @staticmethod
+    def _read_lines(data_file_path: str, read_progress: dict = None):
+        """
+        :param data_file_path: os path to data file (it can be compressed)
+        :param read_progress: {"offset": the byte offset to start reading from}; while lines are read its "offset" is
+        moved to the end of the last read line, so after reading the whole file it is the end of the file.
+        If it has "stop" too, reading stops at that byte offset (it must be the end of a line).
+        Readers of pages set its "page_end" to the byte offset that their last yielded page ends at, so reading
+        again from there starts at the next page
+        :return: generator of the file's lines
+        """
+        if read_progress is None:
+            read_progress = {"offset": 0}
+        with DataFileOpener.open_binary(data_file_path) as file:
+            DataFileOpener.seek(file, read_progress["offset"])
+            for line in file:
+                if read_progress.get("stop") is not None and read_progress["offset"] >= read_progress["stop"]:
                     break
-                line = line.strip()
-                if line.startswith("Content-Type: text/html"):
-                    data_set.append(page)
-                    page = ""
-                page += line
-            except Exception as err:
-                error_line_count += 1
-        file.close()
-        logging.info("------ Total error lines are %d" % error_line_count)
+                read_progress["offset"] += len(line)
+                yield line.decode("utf-8", errors="replace")
+
+    @staticmethod
+    def _read_json_file(data_file_path: str, read_progress: dict = None):
+        """
+        :param data_file_path: os path to data file (it can be compressed)
+        :param read_progress: (look at _read_lines)
+        :return: generator of web pages in html, one page at a time
+        """
+        read_progress = {"offset": 0} if read_progress is None else read_progress
+        for line in DataProvider._read_lines(data_file_path, read_progress):
+            read_progress["page_end"] = read_progress["offset"]
+            yield DataProvider._get_json_page(line)
+
+    @staticmethod
+    def _read_semi_json_file(data_file_path: str, read_progress: dict = None):
+        """
+        :param data_file_path: os path to data file (it can be compressed)
+        :param read_progress: (look at _read_lines)
+        :return: generator of web pages in html, one page at a time
+        """
+        read_progress = {"offset": 0} if read_progress is None else read_progress
+        for count, line in enumerate(DataProvider._read_lines(data_file_path, read_progress), start=1):
+            data = DataProvider._get_semi_json_page(line, count)
+            if data is not None:
+                read_progress["page_end"] = read_progress["offset"]
+                yield data
+
+    @staticmethod
+    def _read_common_crawl_file(data_file_path: str, read_progress: dict = None):
+        """
+        Pages are separated by a "Content-Type: text/html" line; the lines of a page are kept in a list and joined
+        once the page is complete, so only the page that is being read is held in memory
+        :param data_file_path: os path to data file (it can be compressed)
+        :param read_progress: (look at _read_lines)
+        :return: generator of web pages in html, one page at a time
+        """
+        logging.info("---- Reading data file %s " % data_file_path)
+        read_progress = {"offset": 0} if read_progress is None else read_progress
+        page_lines = list()
+        line_start = read_progress["offset"]
+        for line in DataProvider._read_lines(data_file_path, read_progress):
+            line = line.strip()
+            if line.startswith(DataProvider.common_crawl_page_start) and page_lines:
+                # the page ends where the line that starts the next page starts
+                read_progress["page_end"] = line_start
+                yield "".join(page_lines)
+                page_lines = list()
+            page_lines.append(line)
+            line_start = read_progress["offset"]
+        if page_lines:
+            read_progress["page_end"] = read_progress["offset"]
+            yield "".join(page_lines)
         logging.info("---- Reading data file %s is Finished " % data_file_path)
-        return data_set
 
     @staticmethod
     def _convert_list_of_string_to_one_string(list_of_str: list):
@@ -111,107 +185,264 @@ class DataProvider:
         return text
 
     @classmethod
-    def _get_raw_data_from_path_file(cls, data_file_type: str, data_file_path: str):
+    def _get_raw_data_from_path_file(cls, data_file_type: str, data_file_path: str, read_progress: dict = None):
         """
         :param data_file_type: one of the ["CommonCrawl", "Json", "SemiJson"]; base on this,file reading is happening
-        :param data_file_path: the exact data file path
+        :param data_file_path: the exact data file path; gzip, bz2 and zstd compressed files are read directly
                         (path-to-data-folder/(data-file-name)-(train/test).data-extension)
-        :return: list of web pages ( html code and content)
+        :param read_progress: {"offset": the byte offset to start reading from}, it is the end of file after reading
+        :return: generator of web pages ( html code and content); pages are read lazily one at a time
         """
         if data_file_type == cls.data_file_type[0]:
-            return DataProvider._read_common_crawl_file(data_file_path)
+            return DataProvider._read_common_crawl_file(data_file_path, read_progress)
         if data_file_type == cls.data_file_type[1]:
-            return DataProvider._read_json_file(data_file_path)
+            return DataProvider._read_json_file(data_file_path, read_progress)
         if data_file_type == cls.data_file_type[2]:
-            return DataProvider._read_semi_json_file(data_file_path)
+            return DataProvider._read_semi_json_file(data_file_path, read_progress)
+
+    @classmethod
+    def _get_data_file_index(cls, data_file_type: str, data_file_path: str) -> DataFileIndex:
+        """
+        :return: the index of data file; in CommonCrawl files a record starts at a "Content-Type: text/html" line and
+        in the other types each line is a record
+        """
+        record_start = cls.common_crawl_page_start.encode() if data_file_type == cls.data_file_type[0] else None
+        return DataFileIndex.get_index(data_file_path, record_start)
+
+    @classmethod
+    def _get_raw_data_from_index(cls, data_file_type: str, data_file_index: DataFileIndex, start: int, stop: int,
+                                 langs: list = None, read_progress: dict = None):
+        """
+        :param data_file_type: one of the ["CommonCrawl", "Json", "SemiJson"]
+        :param data_file_index: the index of data file
+        :param start: index of the first record to read
+        :param stop: index after the last record to read
+        :param langs: if it is given, records that their language is known and is not one of these are skipped
+        :param read_progress: if it is given, its "page_end" and "offset" are set to the end of the last read record
+        :return: generator of web pages of the records in order; for a record that does not have a valid page
+        None is yielded, so pages stay aligned to the records (DataFileIndex.get_record_numbers)
+        """
+        read_progress = dict() if read_progress is None else read_progress
+        records = data_file_index.get_records(start, stop, langs)
+        for record_number, record in zip(data_file_index.get_record_numbers(start, stop, langs).tolist(), records):
+            read_progress["page_end"] = read_progress["offset"] = data_file_index.get_record_end(record_number)
+            record_number += 1
+            if data_file_type == cls.data_file_type[0]:
+                yield cls._get_common_crawl_page(record)
+            elif data_file_type == cls.data_file_type[1]:
+                yield cls._get_json_page(record)
+            elif data_file_type == cls.data_file_type[2]:
+                yield cls._get_semi_json_page(record, record_number)
 
-    def get_train_data_ready_to_work(self, data_file_name: str,
-                                     data_file_extension: str, data_file_type: str, ) -> dict:
+    def get_train_data_pages(self, data_file_name: str,
+                             data_file_extension: str, data_file_type: str,
+                             record_range: tuple = None, start_offset: int = 0,
+                             stop_offset: int = None):
         """
         :param data_file_name: data file name -> {data_file_name}-train.{data_file_extension}
         :param data_file_extension: data file extension
         :param data_file_type: only three types are supported["CommonCrawl", "Json", "SemiJson"]
                         (path-to-data-folder/(data-file-name)-(train/test).data-extension)
-        :return: dic of languages as keys, and their values are list of that language's documents;
-        and each document is one string that holds all web page's text
+        :param record_range: (start, stop) of the records (pages) to read; if it is given the data file's index is
+        used (it is built the first time) to read only these records, and their detected languages are saved in it
+        :param start_offset: the byte offset of data file that reading starts from (e.g. the end of the part of file
+        that is read before, or the 'read_offset' of a stopped reading); by index, records that start before it are
+        skipped. While pages are taken 'read_offset' attribute is the end of the last taken page, and after reading
+        it is the end of the file
+        :param stop_offset: the byte offset of data file that reading stops at, None for the end of file
+        :return: generator of (language, text) of pages in reading order (see "get_data_file_pages")
         """
         data_file_path = Advisor.get_data_folders_file_path(data_file_name, data_file_extension)
-        ready_to_train_data = dict()
+        return self.get_data_file_pages(data_file_path, data_file_type, record_range, start_offset, stop_offset)
+
+    def get_data_file_pages(self, data_file_path: str, data_file_type: str, record_range: tuple = None,
+                            start_offset: int = 0, stop_offset: int = None):
+        """
+        Pages are read, parsed and their language is detected as they are taken from the generator (by workers in
+        batches of (number_of_workers * chunk_size) pages), so only one batch of pages is in memory; what is kept
+        of all pages is only counters (e.g. 'dropped_pages').
+        When a page is taken, 'read_offset' is the byte offset that the page ends at, so reading from there again
+        continues after it; after the last page, it is the byte offset that reading stopped at
+        :param data_file_path: the exact data file path (e.g. a shard of the data)
+        :param data_file_type: only three types are supported["CommonCrawl", "Json", "SemiJson"]
+        :param record_range: (start, stop) of the records (pages) to read by data file's index
+        :param start_offset: the byte offset of data file that reading starts from, by index the first record that
+        starts at or after it
+        :param stop_offset: the byte offset of data file that reading stops at, None for the end of file
+        :return: generator of (language, text) of pages in reading order, each text holds all of its page's text
+        """
+        self.dropped_pages = 0
         logging.info("--- Get data file content")
 
-        text_data = self._get_raw_data_from_path_file(data_file_type,
-                                                      data_file_path)
+        # pages are consumed one by one from the reader's generator, so the raw html of a page is released as soon
+        # as its text is extracted
+        records_langs = None
+        read_progress = {"offset": start_offset, "stop": stop_offset}
+        if record_range is None:
+            text_data = self._get_raw_data_from_path_file(data_file_type,
+                                                          data_file_path, read_progress)
+        else:
+            data_file_index = self._get_data_file_index(data_file_type, data_file_path)
+            record_range = (max(record_range[0], data_file_index.get_record_number(start_offset)), record_range[1])
+            record_numbers = data_file_index.get_record_numbers(*record_range, self.langs)
+            text_data = self._get_raw_data_from_index(data_file_type, data_file_index, *record_range, self.langs,
+                                                      read_progress)
+            records_langs = list()
+        # the end of each page is taken right after the page is read, since workers read pages ahead
+        pages_ends = ((page, read_progress["page_end"]) for page in text_data)
         logging.info("--- Getting pages's code and language")
-        for index, page in enumerate(text_data):
-            page = BeautifulSoup(page, features="html.parser")
-            text, lang = self._get_text_data_from_page(page)
-            if lang not in ready_to_train_data:
-                ready_to_train_data[lang] = list()
-            ready_to_train_data[lang].append(text)
-        logging.info("--- Got pages's text and language")
-        logging.info("-- Data is ready for further processes")
-        return ready_to_train_data
-
-    def _get_text_data_from_page(self, page: BeautifulSoup):
+        start_time = perf_counter()
+        if self.number_of_workers > 1:
+            texts_and_langs = self._get_pages_text_and_lang_in_parallel(pages_ends)
+        else:
+            texts_and_langs = ((*self._get_text_and_lang_of_raw_page(page), page_end) for page, page_end in pages_ends)
+        number_of_pages = 0
+        for text, lang, page_end in texts_and_langs:
+            self.read_offset = page_end
+            if records_langs is not None:
+                records_langs.append(lang)
+            if text is None:
+                continue
+            if self.langs is not None and lang not in self.langs:
+                self.dropped_pages += 1
+                continue
+            number_of_pages += 1
+            yield lang, text
+        self.language_detector.log_statistics()
+        if records_langs is not None:
+            data_file_index.set_languages(record_range[0], records_langs, record_numbers)
+        if self.langs is not None:
+            logging.info("--- %d pages of other languages than %s are dropped" % (self.dropped_pages, self.langs))
+        self.read_offset = read_progress["offset"]
+        logging.info("--- Got pages's text and language; %d pages by '%s' backend (%.1f pages/sec)" %
+                     (number_of_pages, self.extraction_backend.backend_name,
+                      number_of_pages / max(perf_counter() - start_time, 1e-9)))
+        logging.info("-- Data is read completely")
+        return
+
+    def _get_pages_text_and_lang_in_parallel(self, pages_ends):
+        """
+        Pages are taken from the reader in batches of (number_of_workers * chunk_size) so the pool never holds more
+        than one batch; each batch is spread over the workers in chunks and the results come back in reading order.
+        Each worker gets a copy of this DataProvider once (by the pool's initializer), so its language detector's
+        cache lives as long as the worker; workers' detection statistics are added to this one's detector
+        :param pages_ends: generator of (web page, the byte offset that the page ends at)
+        :return: generator of (text, lang, page's end) of pages in reading order; text is None for a broken page
+        """
+        logging.info("---- Parsing pages by %d workers (chunk size %d)" % (self.number_of_workers, self.chunk_size))
+        batch_size = self.number_of_workers * self.chunk_size
+        with Pool(self.number_of_workers, initializer=DataProvider._init_worker, initargs=(self,)) as pool:
+            while True:
+                batch = list(islice(pages_ends, batch_size))
+                if not batch:
+                    break
+                results = pool.map(DataProvider._get_text_and_lang_in_worker, [page for page, page_end in batch],
+                                   chunksize=self.chunk_size)
+                batch_ends = [page_end for page, page_end in batch]
+                del batch
+                for (text, lang, statistics), page_end in zip(results, batch_ends):
+                    self.language_detector.add_statistics(statistics)
+                    yield text, lang, page_end
+        return
+
+    @classmethod
+    def _init_worker(cls, data_provider):
+        """
+        Runs once in each worker process
+        """
+        cls.worker_data_provider = data_provider
+        return
+
+    @classmethod
+    def _get_text_and_lang_in_worker(cls, page) -> tuple:
+        """
+        Runs in a worker process by its DataProvider
+        :return: the extracted text, its language and the statistics of its language detection
+        """
+        language_detector = cls.worker_data_provider.language_detector
+        statistics = language_detector.get_statistics()
+        text, lang = cls.worker_data_provider._get_text_and_lang_of_raw_page(page)
+        return text, lang, [after - before for before, after in zip(statistics, language_detector.get_statistics())]
+
+    def _get_text_and_lang_of_raw_page(self, page) -> tuple:
+        """
+        :param page: web page's html code as it is read from data file
+        :return: the extracted text and its language; (None, "None") if there is no page
+        """
+        if page is None:
+            return None, LanguageDetector.unknown_language
+        page = self.extraction_backend.parse(page)
+        return self._get_text_data_from_page(page)
+
+    def _get_text_of_page(self, page) -> str:
+        """
+        Based on requested tags it will extract the text from page
+        :param page: page parsed by the extraction backend
+        """
+        if self.include_tags is not None:
+            return self._get_included_tag_data(page)
+        if self.exclude_tags is not None:
+            return self._get_not_excluded_tag_data(page)
+        return self._get_important_tags_data(page)
+
+    def get_extraction_backends_speed(self, pages: list) -> dict:
+        """
+        Parses and extracts the text of the same pages by every extraction backend (language detection is not
+        included) to compare them
+        :param pages: list of web pages in html
+        :return: dict of backends' names as keys, and their speed in pages/sec as values
+        """
+        current_backend = self.extraction_backend
+        speeds = dict()
+        for backend_name in self.extraction_backends:
+            self.extraction_backend = self._get_extraction_backend(backend_name)
+            start_time = perf_counter()
+            for page in pages:
+                self._get_text_of_page(self.extraction_backend.parse(page))
+            speeds[backend_name] = len(pages) / max(perf_counter() - start_time, 1e-9)
+            logging.info("---- '%s' backend extracts %.1f pages/sec" % (backend_name, speeds[backend_name]))
+        self.extraction_backend = current_backend
+        return speeds
+
+    def _get_text_data_from_page(self, page):
         """
         Based on requested tags it will extract the data from page
-        :param page: page in BeautifulSoup type
+        :param page: page parsed by the extraction backend
         :return: the extracted text and its language;
         """
-        lang = "None"
-        if self.include_tags is not None:
-            text = self._get_included_tag_data(page)
-        elif self.exclude_tags is not None:
-            text = self._get_not_excluded_tag_data(page)
-        else:
-            text = self._get_important_tags_data(page)
-        try:
-            lang = detect(text)
-        except LangDetectException as err:
-            pass
+        text = self._get_text_of_page(page)
+        page_lang = None
+        if self.language_detector.use_page_lang:
+            page_lang = self.extraction_backend.get_page_lang(page)
+        lang = self.language_detector.get_language(text, page_lang)
         return text, lang
 
-    def _get_included_tag_data(self, web_page: BeautifulSoup) -> str:
+    def _get_included_tag_data(self, web_page) -> str:
         """
-        :param web_page: the html code
+        :param web_page: the html code parsed by the extraction backend
         :return: list of texts in included tags in the page
 
-        there is a miss in here if we have a text in a child tag in html and both child and parent tags are exploring
-        the same text is there for each of them
+        a text is there only once even if both child and parent tags are included
         e.g. <p> <a> there is a example </a> </p>
-        there is two text in return variable : "there is a example" twice, one for <p> and another for <a>
+        there is one text in return variable : "there is a example" for <p>, and <a> is not explored again
         """
-        final_data = ""
-        for tag in self.include_tags:
-            group_tag = web_page.find_all(tag)
-            for tag_data in group_tag:
-                final_data += tag_data.text + " "
-        return final_data
+        return self.extraction_backend.get_tags_text(web_page, self.include_tags)
 
-    def _get_not_excluded_tag_data(self, web_page: BeautifulSoup) -> str:
+    def _get_not_excluded_tag_data(self, web_page) -> str:
         """
-        :param web_page: the html code
+        :param web_page: the html code parsed by the extraction backend
         :return: list of texts that are not in excluded tags in the page
-        there is a miss in here if we have a text in a child tag in html and both child and parent tags are exploring
-        the same text is there for each of them
+        the page is walked once and each text is there only once; excluded and skipped tags and all of their
+        children are pruned from the walk
         e.g. <p> <a> there is a example </a> </p>
-        there is two text in return variable : "there is a example" twice, one for <p> and another for <a>
+        there is one text in return variable : "there is a example"
         """
-        final_data = ""
-        for tag in web_page.find_all():
-            if tag.name not in self.exclude_tags and tag.name not in self.skip_tags:
-                final_data += tag.text + " "
-        return final_data
+        return self.extraction_backend.get_not_excluded_tags_text(web_page, self.exclude_tags, self.skip_tags)
 
-    def _get_important_tags_data(self, web_page: BeautifulSoup) -> str:
+    def _get_important_tags_data(self, web_page) -> str:
         """
-        :param web_page: the html code in BeautifulSoup object
+        :param web_page: the html code parsed by the extraction backend
         :return: list of texts that are in important tags in the page
         if there is include_tags and exclude_tags are none we use important_tags
         """
-        final_data = ""
-        for tag in self.important_tags:
-            group_tag = web_page.find_all(tag)
-            for tag_data in group_tag:
-                final_data += tag_data.text + " "
-        return final_data
+        return self.extraction_backend.get_tags_text(web_page, self.important_tags)
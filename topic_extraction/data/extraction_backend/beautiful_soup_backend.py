@@ -0,0 +1,50 @@
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
+
+from topic_extraction.data.extraction_backend.extraction_backend import ExtractionBackend
+
+
+class BeautifulSoupBackend(ExtractionBackend):
+    """
+    Builds a full BeautifulSoup tree by python's pure "html.parser"
+    """
+    backend_name = "html.parser"
+    # like Tag.text, only these strings are text (comments, doctype, script's code, ... are not)
+    text_types = (NavigableString, CData)
+
+    def parse(self, page: str) -> BeautifulSoup:
+        return BeautifulSoup(page, features="html.parser")
+
+    def get_tags_text(self, web_page: BeautifulSoup, tags: list) -> str:
+        final_data = ""
+        elements = [web_page]
+        while elements:
+            element = elements.pop()
+            if element.name in tags:
+                final_data += element.text + " "
+            else:
+                elements.extend(child for child in reversed(element.contents) if isinstance(child, Tag))
+        return final_data
+
+    def get_not_excluded_tags_text(self, web_page: BeautifulSoup, exclude_tags: list, skip_tags: list) -> str:
+        pruned_tags = set(exclude_tags).union(skip_tags)
+        final_data = ""
+        # strings out of any tag are not a part of page's text
+        elements = [child for child in reversed(web_page.contents) if isinstance(child, Tag)]
+        while elements:
+            element = elements.pop()
+            if isinstance(element, Tag):
+                if element.name not in pruned_tags:
+                    elements.extend(reversed(element.contents))
+            elif type(element) in self.text_types:
+                final_data += element + " "
+        return final_data
+
+    def get_page_lang(self, web_page: BeautifulSoup):
+        html = web_page.find("html")
+        if html is not None and html.get("lang"):
+            return html.get("lang")
+        for meta in web_page.find_all("meta"):
+            meta_name = meta.get("http-equiv") or meta.get("name") or meta.get("property") or ""
+            if meta_name.lower() in self.lang_meta_names and meta.get("content"):
+                return meta.get("content")
+        return None
@@ -0,0 +1,49 @@
+from abc import ABC, abstractmethod
+
+
+class ExtractionBackend(ABC):
+    """
+    This is an abstract class that any html extraction backend of DataProvider should inherit from it.
+    A backend parses a web page once and then extracts text of the requested tags from the parsed page
+    """
+    backend_name = str()
+    # meta tags (by their name, http-equiv or property) that declare the page's language in their content
+    lang_meta_names = ["content-language", "language", "og:locale"]
+
+    @abstractmethod
+    def parse(self, page: str):
+        """
+        :param page: web page's html code
+        :return: the parsed page in the backend's own type; it is passed to the other methods as web_page
+        """
+        pass
+
+    @abstractmethod
+    def get_tags_text(self, web_page, tags: list) -> str:
+        """
+        :param web_page: the parsed page
+        :param tags: html tags that their text are wanted
+        :return: texts of the given tags in the page joined by space, in the page's order; a wanted tag that is
+        inside another wanted tag is not repeated since its text is already in its ancestor's text
+        """
+        pass
+
+    @abstractmethod
+    def get_not_excluded_tags_text(self, web_page, exclude_tags: list, skip_tags: list) -> str:
+        """
+        :param web_page: the parsed page
+        :param exclude_tags: html tags that their text are unwanted
+        :param skip_tags: html tags that never have a useful text (e.g. script or style)
+        :return: every text node of the page that is not inside an excluded or skipped tag, exactly once, joined by
+        space; excluded and skipped tags are not descended into
+        """
+        pass
+
+    @abstractmethod
+    def get_page_lang(self, web_page):
+        """
+        :param web_page: the parsed page
+        :return: the language that page declares by <html lang> or its meta tags as it is written in the page,
+        None if the page does not declare it
+        """
+        pass
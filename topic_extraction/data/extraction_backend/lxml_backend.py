@@ -0,0 +1,108 @@
+import re
+
+from lxml import etree
+from lxml.etree import ParserError
+
+from topic_extraction.data.extraction_backend.extraction_backend import ExtractionBackend
+
+
+class LxmlBackend(ExtractionBackend):
+    """
+    Parses pages by libxml2's C html parser.
+    lxml completes a broken page the way browsers do (e.g. it adds missing <html> and <body> tags), so for such
+    pages the extracted text can differ slightly from "html.parser"'s one. Text before the first tag of a page is
+    removed like "html.parser" does (so a page without any tag, e.g. "<" or "a < b", has no text in both backends),
+    but text that is out of every tag after the first one (e.g. after a comment or a doctype) is a part of lxml's
+    page text while "html.parser" leaves it out
+    """
+    backend_name = "lxml"
+    # like BeautifulSoup's Tag.text, texts of these tags are not a part of their parents' text
+    non_text_tags = ["script", "style", "template"]
+    # like "html.parser", "<" only starts markup if a tag name, "/", "!" or "?" comes right after it
+    markup_start = re.compile(r"<[a-zA-Z/!?]")
+
+    def __init__(self):
+        self.parser = etree.HTMLParser(remove_comments=True)
+
+    def __getstate__(self):
+        # lxml's parser can not be pickled, so it is created again in each worker process
+        return dict()
+
+    def __setstate__(self, state):
+        self.__init__()
+
+    def parse(self, page: str):
+        """
+        :return: root element of the page or None if there is nothing to parse in the page
+        """
+        # the text before the first tag (e.g. CommonCrawl's headers) is not in any tag for "html.parser", but lxml
+        # puts it in a paragraph
+        markup_start = self.markup_start.search(page)
+        page = page[markup_start.start():] if markup_start is not None else ""
+        try:
+            try:
+                return etree.fromstring(page, self.parser)
+            except ValueError:
+                # unicode strings with an encoding declaration are not accepted by lxml
+                return etree.fromstring(page.encode("utf-8"), self.parser)
+        except ParserError:
+            return None
+
+    def get_tags_text(self, web_page, tags: list) -> str:
+        if web_page is None:
+            return ""
+        final_data = ""
+        elements = [web_page]
+        while elements:
+            element = elements.pop()
+            if element.tag in tags:
+                final_data += "".join(self._get_texts(element, self.non_text_tags)) + " "
+            else:
+                elements.extend(reversed(list(element.iterchildren(etree.Element))))
+        return final_data
+
+    def get_not_excluded_tags_text(self, web_page, exclude_tags: list, skip_tags: list) -> str:
+        if web_page is None:
+            return ""
+        pruned_tags = set(exclude_tags).union(skip_tags, self.non_text_tags)
+        final_data = ""
+        for text in self._get_texts(web_page, pruned_tags):
+            final_data += text + " "
+        return final_data
+
+    def get_page_lang(self, web_page):
+        if web_page is None:
+            return None
+        if web_page.get("lang"):
+            return web_page.get("lang")
+        for meta in web_page.iter("meta"):
+            meta_name = meta.get("http-equiv") or meta.get("name") or meta.get("property") or ""
+            if meta_name.lower() in self.lang_meta_names and meta.get("content"):
+                return meta.get("content")
+        return None
+
+    @staticmethod
+    def _get_texts(element, pruned_tags) -> list:
+        """
+        Walks the element's tree once and without recursion
+        :param element: the root of the walk
+        :param pruned_tags: tags that the walk does not descend into (their tail text is still a part of the text)
+        :return: the non-empty text nodes of the element in the page's order (like BeautifulSoup's Tag.strings)
+        """
+        texts = list()
+        if element.tag in pruned_tags:
+            return [element.text] if element.text else texts
+        items = [element]
+        while items:
+            item = items.pop()
+            if isinstance(item, str):
+                texts.append(item)
+                continue
+            children = [item.text] if item.text else []
+            for child in item.iterchildren(etree.Element):
+                if child.tag not in pruned_tags:
+                    children.append(child)
+                if child.tail:
+                    children.append(child.tail)
+            items.extend(reversed(children))
+        return texts
@@ -0,0 +1,110 @@
+import logging
+from collections import OrderedDict
+from hashlib import blake2b
+
+from langdetect import DetectorFactory, detect
+from langdetect.lang_detect_exception import LangDetectException
+
+
+class LanguageDetector:
+    """
+    Detects the language of pages' texts by langdetect in a cheaper and reproducible way:
+        • only a bounded sample of the text is classified
+        • the language that page declares for itself (<html lang> or meta tags) can be used instead of detection
+        • results are cached by the hash of the classified sample
+        • langdetect is seeded, so reruns give the same language for the same text
+    """
+    unknown_language = "None"
+
+    def __init__(self, sample_size: int = 2000, use_page_lang: bool = False, cache_size: int = 100000,
+                 seed: int = 0):
+        """
+        :param sample_size: maximum number of text's characters that are classified
+        :param use_page_lang: if True the page's declared language is trusted and detection is skipped for it
+        :param cache_size: maximum number of cached detections (the least recently used ones are evicted)
+        :param seed: langdetect's seed
+        """
+        self.sample_size = sample_size
+        self.use_page_lang = use_page_lang
+        self.cache_size = cache_size
+        self.seed = seed
+        self.cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.page_lang_hits = 0
+
+    def get_language(self, text: str, page_lang: str = None) -> str:
+        """
+        :param text: the extracted text of page
+        :param page_lang: the language that page declares (e.g. "en-US"), None if it is not declared
+        :return: two letters language code or "None" if the language is not detectable
+        """
+        if self.use_page_lang:
+            page_lang = self._normalize_lang(page_lang)
+            if page_lang is not None:
+                self.page_lang_hits += 1
+                return page_lang
+        sample = self._get_sample(text)
+        key = blake2b(sample.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        if key in self.cache:
+            self.cache_hits += 1
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        self.cache_misses += 1
+        lang = self._detect(sample)
+        self.cache[key] = lang
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return lang
+
+    def _get_sample(self, text: str) -> str:
+        """
+        :return: the text itself if it is short enough, otherwise three equal windows from its beginning, middle and end
+        """
+        if len(text) <= self.sample_size:
+            return text
+        window = self.sample_size // 3
+        middle = (len(text) - window) // 2
+        return " ".join([text[:window], text[middle:middle + window], text[-window:]])
+
+    def _detect(self, sample: str) -> str:
+        # langdetect is random unless its factory is seeded; it is set here so worker processes are seeded too
+        DetectorFactory.seed = self.seed
+        try:
+            return detect(sample)
+        except LangDetectException:
+            return self.unknown_language
+
+    @staticmethod
+    def _normalize_lang(page_lang: str):
+        """
+        :param page_lang: declared language e.g. "en", "en-US", "pt_BR" or "de, en"
+        :return: its lower case primary language code, None if it is not a valid code
+        """
+        if not page_lang:
+            return None
+        lang = page_lang.strip().lower().split(",")[0].replace("_", "-").split("-")[0].strip()
+        if lang.isalpha() and 2 <= len(lang) <= 3:
+            return lang
+        return None
+
+    def get_statistics(self) -> list:
+        """
+        :return: [number of page's declared languages, cache hits, detections]
+        """
+        return [self.page_lang_hits, self.cache_hits, self.cache_misses]
+
+    def add_statistics(self, statistics: list):
+        """
+        Adds the statistics of another detector (e.g. a worker process's one) to this one's
+        :param statistics: the other detector's "get_statistics"
+        """
+        self.page_lang_hits += statistics[0]
+        self.cache_hits += statistics[1]
+        self.cache_misses += statistics[2]
+        return
+
+    def log_statistics(self):
+        logging.info("---- Language detection: %d from page's declared language, %d cache hits, %d detections" %
+                     (self.page_lang_hits, self.cache_hits, self.cache_misses))
+        return
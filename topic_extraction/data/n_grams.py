@@ -1,3 +1,262 @@
-"""
-For future to add bigrams or trigrams to models
-"""
\ No newline at end of file
+import logging
+from os import path, replace
+
+import numpy
+
+from topic_extraction.advisor import Advisor
+from topic_extraction.data.processed_documents import ProcessedDocuments
+
+
+class NGrams:
+    """
+    Detects phrases (bigrams and trigrams) of processed documents and joins their words into one token
+    (e.g. "new", "york" -> "new_york"). It is learned in one streaming pass over documents' lemma ids:
+        • counts of words, bigrams and (bigram, word) trigrams are taken batch by batch
+        • if bigrams and trigrams are more than 'max_vocab_size' the rare ones are pruned, so memory is bounded
+        • a bigram is a phrase if its score is more than 'threshold', and a trigram is a phrase if its first two
+        words are a phrase and the score of (that phrase, third word) is more than 'threshold'; the score is
+        (count - min_count) / (count of first part * count of second part) * size of vocabulary, like gensim's
+        Phrases the vocabulary is the distinct words and bigrams that are counted
+    Then it is frozen into two sorted arrays of phrases' keys that documents are looked up in, and it is saved
+    in the data version's folder, so dictionaries and models of the same data reuse it.
+    Documents with their phrases are written once as ProcessedDocuments named by the n-grams' params (phrases are
+    added to the vocabulary after the words), so phrases are not joined again in each pass over documents
+    """
+    phrase_delimiter = "_"
+
+    def __init__(self, n: int, vocab_size: int, number_of_documents: int, bigram_keys: numpy.ndarray,
+                 trigram_keys: numpy.ndarray):
+        """
+        :raise This should not be called, instead "get_n_grams" must be called
+        :param n: 2 for bigrams, 3 for bigrams and trigrams
+        :param vocab_size: size of documents' vocabulary that it is learned from
+        :param number_of_documents: number of documents that it is learned from
+        :param bigram_keys: sorted keys of bigram phrases, (first word id * vocab_size + second word id)
+        :param trigram_keys: sorted keys of trigram phrases, (index of its bigram in bigram_keys * vocab_size +
+        third word id)
+        """
+        self.n = n
+        self.vocab_size = vocab_size
+        self.number_of_documents = number_of_documents
+        self.bigram_keys = bigram_keys
+        self.trigram_keys = trigram_keys
+
+    @staticmethod
+    def get_n_grams_name(n: int, min_count: int, threshold: float, max_vocab_size: int) -> str:
+        """
+        :return: the name that n-grams and documents with their phrases are saved by
+        """
+        return "{}-grams-{}-{}-{}".format(n, min_count, threshold, max_vocab_size)
+
+    @classmethod
+    def get_n_grams_file_path(cls, lang: str, data_version: int, n: int, min_count: int, threshold: float,
+                              max_vocab_size: int) -> str:
+        return Advisor.get_data_version_folders_file_path(lang, data_version, cls.get_n_grams_name(
+            n, min_count, threshold, max_vocab_size), "npz")
+
+    @classmethod
+    def get_phrased_data_file_name(cls, n: int, min_count: int, threshold: float, max_vocab_size: int) -> str:
+        return "phrased-" + cls.get_n_grams_name(n, min_count, threshold, max_vocab_size)
+
+    @classmethod
+    def get_n_grams(cls, lang: str, data_version: int, documents: ProcessedDocuments, n: int = 2,
+                    min_count: int = 5, threshold: float = 10.0, max_vocab_size: int = 20000000,
+                    batch_size: int = 10000):
+        """
+        First it looks for the phrases that are learned from the same data before, if they are not there they are
+        learned and saved
+        :param lang: documents' language
+        :param data_version: documents' data version
+        :param documents: processed documents of the language
+        :param n: 2 for bigrams, 3 for bigrams and trigrams
+        :param min_count: bigrams and trigrams that happen less than this are ignored
+        :param threshold: minimum score of phrases
+        :param max_vocab_size: maximum number of bigrams and trigrams that are counted at once
+        :param batch_size: number of documents that are counted at once
+        :return: NGrams object
+        """
+        n_grams_file_path = cls.get_n_grams_file_path(lang, data_version, n, min_count, threshold, max_vocab_size)
+        if path.exists(n_grams_file_path):
+            with numpy.load(n_grams_file_path) as n_grams_file:
+                n_grams = NGrams(n, int(n_grams_file["vocab_size"]), int(n_grams_file["number_of_documents"]),
+                                 n_grams_file["bigram_keys"], n_grams_file["trigram_keys"])
+            if n_grams.vocab_size == len(documents.vocab) and n_grams.number_of_documents == len(documents):
+                logging.info("--- %d-grams of '%s' were learned before" % (n, lang))
+                return n_grams
+            logging.info("--- Processed data of '%s' is changed since its %d-grams were learned" % (lang, n))
+        n_grams = cls.learn(documents, n, min_count, threshold, max_vocab_size, batch_size)
+        with open(n_grams_file_path + ".tmp", "wb") as n_grams_file:
+            numpy.savez(n_grams_file, vocab_size=n_grams.vocab_size, number_of_documents=n_grams.number_of_documents,
+                        bigram_keys=n_grams.bigram_keys, trigram_keys=n_grams.trigram_keys)
+        replace(n_grams_file_path + ".tmp", n_grams_file_path)
+        return n_grams
+
+    @classmethod
+    def learn(cls, documents: ProcessedDocuments, n: int = 2, min_count: int = 5, threshold: float = 10.0,
+              max_vocab_size: int = 20000000, batch_size: int = 10000):
+        """
+        :return: NGrams object that is learned from documents
+        """
+        logging.info("--- Learning %d-grams of %d documents" % (n, len(documents)))
+        vocab_size = len(documents.vocab)
+        word_counts = numpy.zeros(vocab_size, dtype=numpy.int64)
+        bigram_counts = dict()
+        trigram_counts = dict()
+        min_reduce = 1
+        for start in range(0, len(documents), batch_size):
+            batch = [documents.get_token_ids(index).astype(numpy.int64)
+                     for index in range(start, min(start + batch_size, len(documents)))]
+            batch = [token_ids for token_ids in batch if len(token_ids) > 0]
+            if not batch:
+                continue
+            word_counts += numpy.bincount(numpy.concatenate(batch), minlength=vocab_size)
+            bigrams = [token_ids[:-1] * vocab_size + token_ids[1:] for token_ids in batch if len(token_ids) > 1]
+            if bigrams:
+                cls.__add_counts(bigram_counts, *numpy.unique(numpy.concatenate(bigrams), return_counts=True))
+            trigrams = [numpy.stack([token_ids[:-2] * vocab_size + token_ids[1:-1], token_ids[2:]], axis=1)
+                        for token_ids in batch if len(token_ids) > 2]
+            if n > 2 and trigrams:
+                keys, counts = numpy.unique(numpy.concatenate(trigrams), axis=0, return_counts=True)
+                cls.__add_counts(trigram_counts, map(tuple, keys.tolist()), counts)
+            while len(bigram_counts) + len(trigram_counts) > max_vocab_size:
+                for n_gram_counts in [bigram_counts, trigram_counts]:
+                    for key in [key for key, count in n_gram_counts.items() if count < min_reduce]:
+                        del n_gram_counts[key]
+                min_reduce += 1
+        if min_reduce > 1:
+            logging.info("---- N-grams that happened less than %d times in a batch were pruned" % (min_reduce - 1))
+
+        scoring_vocab_size = numpy.count_nonzero(word_counts) + len(bigram_counts)
+        bigram_keys = numpy.array(sorted(key for key, count in bigram_counts.items()
+                                         if cls.__get_score(count, word_counts[key // vocab_size],
+                                                            word_counts[key % vocab_size], min_count,
+                                                            scoring_vocab_size) > threshold), dtype=numpy.int64)
+        trigram_keys = list()
+        for (bigram_key, word), count in trigram_counts.items():
+            bigram_index = numpy.searchsorted(bigram_keys, bigram_key)
+            if bigram_index < len(bigram_keys) and bigram_keys[bigram_index] == bigram_key and \
+                    cls.__get_score(count, bigram_counts[bigram_key], word_counts[word], min_count,
+                                    scoring_vocab_size) > threshold:
+                trigram_keys.append(int(bigram_index) * vocab_size + word)
+        trigram_keys = numpy.array(sorted(trigram_keys), dtype=numpy.int64)
+        logging.info("--- %d bigram and %d trigram phrases are learned" % (len(bigram_keys), len(trigram_keys)))
+        return NGrams(n, vocab_size, len(documents), bigram_keys, trigram_keys)
+
+    @staticmethod
+    def __add_counts(n_gram_counts: dict, keys, counts: numpy.ndarray):
+        for key, count in zip(keys, counts.tolist()):
+            n_gram_counts[key] = n_gram_counts.get(key, 0) + count
+        return
+
+    @staticmethod
+    def __get_score(count: int, first_count: int, second_count: int, min_count: int,
+                    scoring_vocab_size: int) -> float:
+        if count < min_count or first_count == 0 or second_count == 0:
+            return 0.0
+        return (count - min_count) / (first_count * second_count) * scoring_vocab_size
+
+    @staticmethod
+    def __lookup(keys: numpy.ndarray, phrases_keys: numpy.ndarray) -> tuple:
+        """
+        :return: (mask of keys that are phrases, their indexes in phrases_keys)
+        """
+        indexes = numpy.searchsorted(phrases_keys, keys)
+        if len(phrases_keys) == 0:
+            return numpy.zeros(len(keys), dtype=bool), indexes
+        return phrases_keys[numpy.minimum(indexes, len(phrases_keys) - 1)] == keys, indexes
+
+    def __get_phrases_lengths(self, token_ids: numpy.ndarray) -> tuple:
+        """
+        Phrases are joined greedily from left to right, a trigram is preferred to the bigram at the same position
+        :param token_ids: lemma ids of the document
+        :return: (the document's lemma ids, number of lemmas of each of its tokens in order, 1 for a word)
+        """
+        token_ids = token_ids.astype(numpy.int64)
+        if len(token_ids) < 2:
+            return token_ids.tolist(), [1] * len(token_ids)
+        is_bigram, bigram_indexes = self.__lookup(token_ids[:-1] * self.vocab_size + token_ids[1:], self.bigram_keys)
+        is_trigram = numpy.zeros(len(token_ids), dtype=bool)
+        if self.n > 2 and len(token_ids) > 2:
+            is_trigram[:-2] = self.__lookup(bigram_indexes[:-1] * self.vocab_size + token_ids[2:],
+                                            self.trigram_keys)[0] & is_bigram[:-1]
+        is_bigram, is_trigram = is_bigram.tolist() + [False], is_trigram.tolist()
+        lengths = list()
+        index = 0
+        while index < len(token_ids):
+            lengths.append(3 if is_trigram[index] else 2 if is_bigram[index] else 1)
+            index += lengths[-1]
+        return token_ids.tolist(), lengths
+
+    def get_phrased_document(self, token_ids: numpy.ndarray, vocab: list) -> list:
+        """
+        :param token_ids: lemma ids of the document
+        :param vocab: the vocabulary of lemma ids
+        :return: the document's lemmas and phrases
+        """
+        token_ids, lengths = self.__get_phrases_lengths(token_ids)
+        document = list()
+        index = 0
+        for length in lengths:
+            document.append(self.phrase_delimiter.join(vocab[token_id]
+                                                       for token_id in token_ids[index:index + length]))
+            index += length
+        return document
+
+    def write_phrased_documents(self, lang: str, data_version: int, documents: ProcessedDocuments,
+                                data_file_name: str, batch_size: int = 10000) -> ProcessedDocuments:
+        """
+        Writes documents with their phrases as ProcessedDocuments of one part; a phrase's id is after the ids of
+        documents' vocabulary, in the order that phrases are found
+        :param documents: processed documents that n-grams are learned from
+        :param data_file_name: the name that documents with their phrases are written by
+        :param batch_size: number of documents that their ids are gathered in python lists at once
+        :return: documents with their phrases
+        """
+        logging.info("--- Joining phrases of %d documents of '%s'" % (len(documents), lang))
+        vocab_size = len(documents.vocab)
+        phrases_ids = dict()
+        tokens = list()
+        lengths = list()
+        for start in range(0, len(documents), batch_size):
+            batch_tokens = list()
+            for index in range(start, min(start + batch_size, len(documents))):
+                token_ids, phrases_lengths = self.__get_phrases_lengths(documents.get_token_ids(index))
+                position = 0
+                for length in phrases_lengths:
+                    if length == 1:
+                        batch_tokens.append(token_ids[position])
+                    else:
+                        batch_tokens.append(phrases_ids.setdefault(tuple(token_ids[position:position + length]),
+                                                                   vocab_size + len(phrases_ids)))
+                    position += length
+                lengths.append(len(phrases_lengths))
+            tokens.append(numpy.array(batch_tokens, dtype=ProcessedDocuments.token_dtype))
+        vocab = documents.vocab + [self.phrase_delimiter.join(documents.vocab[token_id] for token_id in phrase)
+                                   for phrase in phrases_ids]
+        offsets = numpy.zeros(len(lengths) + 1, dtype=ProcessedDocuments.offset_dtype)
+        numpy.cumsum(lengths, out=offsets[1:])
+        tokens = numpy.concatenate(tokens) if tokens else numpy.zeros(0, dtype=ProcessedDocuments.token_dtype)
+        ProcessedDocuments.write_token_ids(lang, data_version, data_file_name, vocab, tokens, offsets)
+        return ProcessedDocuments.read(lang, data_version, data_file_name)
+
+    @classmethod
+    def get_phrased_documents(cls, lang: str, data_version: int, documents: ProcessedDocuments, n: int = 2,
+                              min_count: int = 5, threshold: float = 10.0, max_vocab_size: int = 20000000,
+                              batch_size: int = 10000) -> ProcessedDocuments:
+        """
+        First it looks for documents with their phrases that are written after the n-grams and processed documents,
+        if they are not there, phrases are joined by the n-grams (see "get_n_grams") and written
+        :return: documents with their phrases as ProcessedDocuments, a phrase is one token (e.g. "new_york")
+        """
+        data_file_name = cls.get_phrased_data_file_name(n, min_count, threshold, max_vocab_size)
+        phrased_documents = ProcessedDocuments.read(lang, data_version, data_file_name)
+        n_grams_file_path = cls.get_n_grams_file_path(lang, data_version, n, min_count, threshold, max_vocab_size)
+        if phrased_documents is not None and len(phrased_documents) == len(documents) and \
+                path.exists(n_grams_file_path):
+            phrased_time = path.getmtime(ProcessedDocuments.get_vocab_file_path(lang, data_version, data_file_name))
+            if phrased_time >= path.getmtime(n_grams_file_path) and phrased_time >= documents.get_modified_time():
+                logging.info("--- Phrases of '%s' were joined before" % lang)
+                return phrased_documents
+        n_grams = cls.get_n_grams(lang, data_version, documents, n, min_count, threshold, max_vocab_size, batch_size)
+        return n_grams.write_phrased_documents(lang, data_version, documents, data_file_name, batch_size)
+
@@ -0,0 +1,131 @@
+import logging
+from collections import deque
+from hashlib import blake2b
+from zlib import crc32
+
+import numpy
+
+
+class PageDeduplicator:
+    """
+    Removes duplicate pages' texts before they are processed:
+        • exact: pages that their texts are the same after normalizing white spaces and letters' case
+        • near: pages that their estimated Jaccard similarity (of their 5 words shingles) is more than threshold;
+        it is estimated by MinHash signatures and found by LSH (signatures are split to bands, and two pages that
+        have a same band are duplicates)
+    The first page of duplicates is kept. Memory is bounded, only the hashes of the last 'max_pages' kept pages
+    are remembered, so a duplicate of an older page is not found
+    """
+    modes = ["none", "exact", "near"]
+    mersenne_prime = numpy.uint64((1 << 61) - 1)
+    max_hash = numpy.uint64((1 << 32) - 1)
+    shingles_block_size = 4096
+
+    def __init__(self, mode: str = "none", threshold: float = 0.8, number_of_permutations: int = 64,
+                 shingle_size: int = 5, max_pages: int = 200000, seed: int = 1):
+        """
+        :param mode: one of the modes; "near" removes exact duplicates too
+        :param threshold: the Jaccard similarity that pages with more than that are near duplicates
+        :param number_of_permutations: number of MinHash permutations (length of signatures)
+        :param shingle_size: number of words in each shingle
+        :param max_pages: maximum number of kept pages that their hashes are remembered
+        :param seed: seed of MinHash permutations
+        """
+        if mode not in self.modes:
+            raise NotImplementedError("Deduplication mode '%s' is not supported" % mode)
+        self.mode = mode
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.max_pages = max_pages
+        self.number_of_bands, self.band_size = self._get_bands(threshold, number_of_permutations)
+
+        random_state = numpy.random.RandomState(seed)
+        number_of_permutations = self.number_of_bands * self.band_size
+        self.permutation_a = random_state.randint(1, self.mersenne_prime, number_of_permutations,
+                                                  dtype=numpy.uint64)[:, None]
+        self.permutation_b = random_state.randint(0, self.mersenne_prime, number_of_permutations,
+                                                  dtype=numpy.uint64)[:, None]
+
+        self.page_hashes = set()
+        self.band_hashes = set()
+        self.kept_pages_hashes = deque()
+        self.removed_pages = {"exact": 0, "near": 0}
+
+    @staticmethod
+    def _get_bands(threshold: float, number_of_permutations: int) -> tuple:
+        """
+        :return: (number of bands, rows of each band) that the LSH threshold ((1/bands)^(1/rows)) of them is the
+        closest to the threshold
+        """
+        bands_and_rows = [(bands, number_of_permutations // bands) for bands in range(1, number_of_permutations + 1)
+                          if number_of_permutations % bands == 0]
+        return min(bands_and_rows, key=lambda band: abs((1 / band[0]) ** (1 / band[1]) - threshold))
+
+    def deduplicate(self, pages):
+        """
+        :param pages: the output of data provider step; generator of (language, text) of pages
+        :return: generator of the same pages that duplicate pages are removed from them
+        """
+        if self.mode == "none":
+            yield from pages
+            return
+        logging.info("--- Removing duplicate pages (%s)" % self.mode)
+        for lang, text in pages:
+            if not self.is_duplicate(text):
+                yield lang, text
+        logging.info("--- Removed %d exact and %d near duplicate pages" %
+                     (self.removed_pages["exact"], self.removed_pages["near"]))
+        return
+
+    def is_duplicate(self, text: str) -> bool:
+        """
+        :param text: page's text; if it is not a duplicate it is remembered for next pages
+        """
+        words = text.lower().split()
+        page_hash = blake2b(" ".join(words).encode("utf-8", "surrogatepass"), digest_size=8).digest()
+        if page_hash in self.page_hashes:
+            self.removed_pages["exact"] += 1
+            return True
+        band_hashes = list()
+        if self.mode == "near":
+            band_hashes = self._get_band_hashes(words)
+            if any(band_hash in self.band_hashes for band_hash in band_hashes):
+                self.removed_pages["near"] += 1
+                return True
+        self._remember(page_hash, band_hashes)
+        return False
+
+    def _remember(self, page_hash: bytes, band_hashes: list):
+        self.page_hashes.add(page_hash)
+        self.band_hashes.update(band_hashes)
+        self.kept_pages_hashes.append((page_hash, band_hashes))
+        if len(self.kept_pages_hashes) > self.max_pages:
+            old_page_hash, old_band_hashes = self.kept_pages_hashes.popleft()
+            self.page_hashes.discard(old_page_hash)
+            self.band_hashes.difference_update(old_band_hashes)
+        return
+
+    def _get_signature(self, words: list) -> numpy.ndarray:
+        """
+        :return: MinHash signature of the words' shingles
+        """
+        shingle_size = min(self.shingle_size, len(words))
+        shingles = (" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1))
+        shingles_hashes = numpy.fromiter((crc32(shingle.encode("utf-8", "surrogatepass")) for shingle in shingles),
+                                         dtype=numpy.uint64)
+        signature = numpy.full(len(self.permutation_a), self.max_hash, dtype=numpy.uint64)
+        # shingles are hashed block by block so memory does not grow by page's size
+        for start in range(0, len(shingles_hashes), self.shingles_block_size):
+            block = shingles_hashes[start:start + self.shingles_block_size][None, :]
+            permuted = numpy.bitwise_and((self.permutation_a * block + self.permutation_b) % self.mersenne_prime,
+                                         self.max_hash)
+            signature = numpy.minimum(signature, permuted.min(axis=1))
+        return signature
+
+    def _get_band_hashes(self, words: list) -> list:
+        if not words:
+            return list()
+        signature = self._get_signature(words).astype(numpy.uint32)
+        return [blake2b(bytes([band]) + signature[band * self.band_size:(band + 1) * self.band_size].tobytes(),
+                        digest_size=8).digest()
+                for band in range(self.number_of_bands)]
@@ -0,0 +1,200 @@
+import json
+import logging
+from bisect import bisect_right
+from collections.abc import Sequence
+from itertools import chain
+from os import path, replace
+
+import numpy
+
+from topic_extraction.advisor import Advisor
+
+
+class ProcessedDocuments(Sequence):
+    """
+    Processed documents of one language in a compact binary format instead of lists of lemma strings:
+        • a vocabulary of the language's lemmas, a lemma's id is its index (one file for all parts of data)
+        • a flat int32 array of all documents' lemma ids
+        • an int64 array of offsets, document i is tokens[offsets[i]:offsets[i + 1]]
+    Processed data can be in some parts (e.g. new data that is appended to it later), each part has its own tokens
+    and offsets arrays; the arrays are memory mapped and a document's lemmas are only decoded when it is accessed
+    """
+    token_dtype = numpy.int32
+    offset_dtype = numpy.int64
+
+    def __init__(self, vocab: list, parts: list, location: tuple):
+        """
+        :raise This should not be called, instead "read" must be called
+        :param vocab: lemmas of the language
+        :param parts: list of (tokens, offsets) arrays of each part of data
+        :param location: (lang, data_version, data_file_name, number_of_parts) that documents are read by
+        """
+        self.vocab = vocab
+        self.parts = parts
+        self.location = location
+        self.parts_starts = [0]
+        for tokens, offsets in parts:
+            self.parts_starts.append(self.parts_starts[-1] + len(offsets) - 1)
+
+    @staticmethod
+    def get_part_file_name(data_file_name: str, part: int) -> str:
+        """
+        The first part has the data file's name and the next ones are "(data file name)-part-(part number)"
+        """
+        if part == 0:
+            return data_file_name
+        return "{}-part-{}".format(data_file_name, part)
+
+    @staticmethod
+    def get_vocab_file_path(lang: str, data_version: int, data_file_name: str) -> str:
+        return Advisor.get_data_version_folders_file_path(lang, data_version, data_file_name + "-vocab", "json")
+
+    @classmethod
+    def get_part_files_paths(cls, lang: str, data_version: int, data_file_name: str, part: int) -> tuple:
+        """
+        :return: (tokens file path, offsets file path) of the part
+        """
+        part_file_name = cls.get_part_file_name(data_file_name, part)
+        return (Advisor.get_data_version_folders_file_path(lang, data_version, part_file_name + "-tokens", "npy"),
+                Advisor.get_data_version_folders_file_path(lang, data_version, part_file_name + "-offsets", "npy"))
+
+    @classmethod
+    def exists(cls, lang: str, data_version: int, data_file_name: str, part: int) -> bool:
+        return path.exists(cls.get_vocab_file_path(lang, data_version, data_file_name)) and \
+               all(path.exists(file_path) for file_path in cls.get_part_files_paths(lang, data_version,
+                                                                                      data_file_name, part))
+
+    @classmethod
+    def read(cls, lang: str, data_version: int, data_file_name: str, number_of_parts: int = 1):
+        """
+        :return: ProcessedDocuments object of all parts, None if some of its files are not there
+        """
+        if not all(cls.exists(lang, data_version, data_file_name, part) for part in range(number_of_parts)):
+            return None
+        with open(cls.get_vocab_file_path(lang, data_version, data_file_name), "r") as json_file:
+            vocab = json.load(json_file)
+        parts = list()
+        for part in range(number_of_parts):
+            tokens_file_path, offsets_file_path = cls.get_part_files_paths(lang, data_version, data_file_name, part)
+            parts.append((numpy.load(tokens_file_path, mmap_mode="r"), numpy.load(offsets_file_path, mmap_mode="r")))
+        return ProcessedDocuments(vocab, parts, (lang, data_version, data_file_name, number_of_parts))
+
+    @classmethod
+    def write(cls, lang: str, data_version: int, data_file_name: str, documents: list, part: int = 0):
+        """
+        Writes documents as a part of processed data. The vocabulary of the next parts are appended to the first
+        part's vocabulary, so ids of the parts that are written before are not changed.
+        Every file is written by a temporary name and then renamed, so a half-written file is never read
+        :param documents: list of documents that each of them is a list of lemmas
+        :param part: the part number of documents
+        """
+        vocab = cls.__read_vocab_of_part(lang, data_version, data_file_name, part)
+        ids = {lemma: lemma_id for lemma_id, lemma in enumerate(vocab)}
+        number_of_tokens = sum(len(document) for document in documents)
+        tokens = numpy.fromiter((ids.setdefault(lemma, len(ids)) for lemma in chain.from_iterable(documents)),
+                                dtype=cls.token_dtype, count=number_of_tokens)
+        offsets = numpy.zeros(len(documents) + 1, dtype=cls.offset_dtype)
+        numpy.cumsum([len(document) for document in documents], out=offsets[1:])
+        vocab.extend(list(ids)[len(vocab):])
+        cls.__write_part(lang, data_version, data_file_name, part, vocab, tokens, offsets)
+        return
+
+    @classmethod
+    def write_token_ids(cls, lang: str, data_version: int, data_file_name: str, vocab: list, tokens: numpy.ndarray,
+                        offsets: numpy.ndarray):
+        """
+        Writes documents that are already lemma ids of vocab (e.g. documents with their phrases) as the only part
+        of processed data
+        """
+        cls.__write_part(lang, data_version, data_file_name, 0, vocab, tokens.astype(cls.token_dtype, copy=False),
+                         offsets)
+        return
+
+    @classmethod
+    def write_documents(cls, lang: str, data_version: int, data_file_name: str, documents, part: int = 0):
+        """
+        Writes processed documents (e.g. of a data shard) as a part of processed data like "write", but their lemma
+        ids are mapped to the vocabulary of processed data by numpy, so documents are not decoded
+        :param documents: ProcessedDocuments object
+        :param part: the part number of documents
+        """
+        vocab = cls.__read_vocab_of_part(lang, data_version, data_file_name, part)
+        ids = {lemma: lemma_id for lemma_id, lemma in enumerate(vocab)}
+        ids_map = numpy.fromiter((ids.setdefault(lemma, len(ids)) for lemma in documents.vocab),
+                                 dtype=cls.token_dtype, count=len(documents.vocab))
+        vocab.extend(list(ids)[len(vocab):])
+        tokens = [numpy.zeros(0, dtype=cls.token_dtype)]
+        offsets = [numpy.zeros(1, dtype=cls.offset_dtype)]
+        for part_tokens, part_offsets in documents.parts:
+            tokens.append(ids_map[part_tokens])
+            offsets.append(part_offsets[1:] + offsets[-1][-1])
+        cls.__write_part(lang, data_version, data_file_name, part, vocab, numpy.concatenate(tokens),
+                         numpy.concatenate(offsets))
+        return
+
+    @classmethod
+    def __read_vocab_of_part(cls, lang: str, data_version: int, data_file_name: str, part: int) -> list:
+        """
+        :return: the vocabulary that the part's lemmas are added to, empty for the first part
+        """
+        vocab_file_path = cls.get_vocab_file_path(lang, data_version, data_file_name)
+        if part > 0 and path.exists(vocab_file_path):
+            with open(vocab_file_path, "r") as json_file:
+                return json.load(json_file)
+        return list()
+
+    @classmethod
+    def __write_part(cls, lang: str, data_version: int, data_file_name: str, part: int, vocab: list,
+                     tokens: numpy.ndarray, offsets: numpy.ndarray):
+        """
+        Every file is written by a temporary name and then renamed, so a half-written file is never read
+        """
+        vocab_file_path = cls.get_vocab_file_path(lang, data_version, data_file_name)
+        with open(vocab_file_path + ".tmp", "w") as json_file:
+            json.dump(vocab, json_file)
+        replace(vocab_file_path + ".tmp", vocab_file_path)
+        for file_path, array in zip(cls.get_part_files_paths(lang, data_version, data_file_name, part),
+                                    [tokens, offsets]):
+            with open(file_path + ".tmp", "wb") as npy_file:
+                numpy.save(npy_file, array)
+            replace(file_path + ".tmp", file_path)
+        logging.info("---- %d documents of '%s' are written (%d tokens, %d words in vocabulary)" %
+                     (len(offsets) - 1, lang, len(tokens), len(vocab)))
+        return
+
+    def get_modified_time(self) -> float:
+        """
+        :return: the last time that a part of documents is written (the vocabulary is written with each part)
+        """
+        return path.getmtime(self.get_vocab_file_path(*self.location[:3]))
+
+    def __len__(self):
+        return self.parts_starts[-1]
+
+    def get_token_ids(self, index: int) -> numpy.ndarray:
+        """
+        :return: lemma ids of the document, a view of the memory mapped array (no copy)
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("document index out of range")
+        part = bisect_right(self.parts_starts, index) - 1
+        tokens, offsets = self.parts[part]
+        index -= self.parts_starts[part]
+        return tokens[offsets[index]:offsets[index + 1]]
+
+    def __getitem__(self, index):
+        """
+        :return: the document's lemmas, or list of documents if index is a slice
+        """
+        if isinstance(index, slice):
+            return [self[document_index] for document_index in range(*index.indices(len(self)))]
+        vocab = self.vocab
+        return [vocab[lemma_id] for lemma_id in self.get_token_ids(index).tolist()]
+
+    def __iter__(self):
+        vocab = self.vocab
+        for tokens, offsets in self.parts:
+            for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist()):
+                yield [vocab[lemma_id] for lemma_id in tokens[start:end].tolist()]
@@ -1,12 +1,18 @@
 import json
 import logging
-from os import path
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from os import path, remove, replace
+from shutil import rmtree
+from time import perf_counter
 
 import spacy
-from spacy.tokens.token import Token
+from spacy.tokens.doc import Doc
 
 from topic_extraction.advisor import Advisor
 from topic_extraction.data.data_provider import DataProvider
+from topic_extraction.data.page_deduplicator import PageDeduplicator
+from topic_extraction.data.processed_documents import ProcessedDocuments
+from topic_extraction.data.token_filter import TokenFilter
 
 spacy.prefer_gpu()
 
@@ -25,55 +31,104 @@ class TextPreprocessor:
         "lt": "lt_core_news_sm"  # Lithuanian
     }
 
+    # components of spacy's pipeline that are not loaded in each profile; lemmas are assigned by tagger's POS
+    pipeline_profiles = {
+        "tagger": ["parser", "ner"],  # POS and lemma that token validation needs
+        "ner": ["parser"],  # named entities too, for filtering them
+        "full": []  # the whole pipeline of the model
+    }
+
+    # spaCy 3's models lemmatize in their own component of the pipeline; spaCy 2's tagger assigns lemmas itself
+    lemmatizer_component = "lemmatizer"
+
+    # a valid token has all "must" properties and none of "must Not" properties (see TokenFilter.rules_attributes)
+    token_validation = {"must": ["alpha"],
+                        "must Not": ["stop_word", "space", "bracket", "currency", "url", "email", "number", "verb"]}
+    # "adj", "adv"
+
+    # long documents are split at the first of these boundaries (paragraph, sentence, word) that is found
+    chunk_separators = ["\n\n", "\n", ". ", "! ", "? ", " "]
+
+    # approximate memory (MB) of a loaded model by its size, for scheduling languages in the models' memory budget
+    models_memory = {"sm": 100, "md": 300, "lg": 1000}
+
     objects_of_TextPreprocessor_for_each_lang = dict()
 
     @staticmethod
-    def __write_processed_data(data_file_name: str, processed_data: dict, version: int):
+    def __write_processed_data(data_file_name: str, processed_data: dict, version: int, lang_parts: dict = None):
         """
         :param data_file_name: processed data's file name
         :param processed_data: the data that we want to write it down
         :param version: the version of data
+        :param lang_parts: the part number that each language's data is written as, the first part if it is None
         """
         for lang in processed_data:
-            processed_data_file_path = Advisor.get_data_version_folders_file_path(lang, version, data_file_name, "json")
-
-            with open(processed_data_file_path, 'w') as json_file:
-                json.dump(processed_data[lang], json_file)
-                json_file.close()
+            part = 0 if lang_parts is None else lang_parts[lang]
+            ProcessedDocuments.write(lang, version, data_file_name, processed_data[lang], part)
         return
 
     @staticmethod
-    def __write_meta_data(language_list: list, tags: dict, data_version: int, lang_length: dict):
+    def __write_meta_data(language_list: list, tags: dict, data_version: int, lang_length: dict,
+                          removed_pages: dict, data_file_state: dict = None, filter_entities: bool = False):
+        """
+        Meta of data file keeps the state of each data version apart (by its version), so processing a data version
+        does not change what is known about the others
+        :param data_file_state: what is read from data file so far; e.g. its processed shards, or the byte offset
+        that new records start from and the number of processed data's parts of each language
+        :param filter_entities: if True, tokens that are part of a named entity are removed
+        """
         data_file_meta_path = Advisor.get_data_file_meta_path()
-        data_file_meta_content = {"languages": language_list,
-                                  "lang_length": lang_length}
-
-        data_process_version_meta_content = {
-                                             "tags": tags, "token_ validation": {"must": ["alpha"],
-                                                                                 "must Not":
-                                                                                     ["stop_word", "space", "bracket",
-                                                                                      "currency",
-                                                                                      "url", "email", "number",
-                                                                                      "verb"]}}
-        with open(data_file_meta_path, "w") as json_file:
-            json.dump(data_file_meta_content, json_file, indent=4)
-            json_file.close()
+        data_version_state = {"languages": language_list,
+                              "lang_length": lang_length,
+                              "removed_duplicate_pages": removed_pages}
+        if data_file_state is not None:
+            data_version_state.update(data_file_state)
+        data_file_meta_content = TextPreprocessor.__read_data_meta_file() or dict()
+        data_file_meta_content.setdefault("data_versions", dict())[str(data_version)] = data_version_state
+
+        data_process_version_meta_content = {"tags": tags,
+                                             "token_ validation":
+                                                 TextPreprocessor.get_token_validation(filter_entities)}
+        TextPreprocessor._write_json_file(data_file_meta_path, data_file_meta_content, indent=4)
         for lang in language_list:
             data_version_meta_path = Advisor.get_data_version_folders_file_path(lang, data_version,
                                                                                 "data-process-mata", "json")
-            with open(data_version_meta_path, "w") as json_file:
-                json.dump(data_process_version_meta_content, json_file, indent=4)
-                json_file.close()
+            TextPreprocessor._write_json_file(data_version_meta_path, data_process_version_meta_content, indent=4)
+        return
+
+    @staticmethod
+    def _write_json_file(file_path: str, content, indent: int = None):
+        """
+        The file is written by a temporary name and then renamed, so a half-written file is never read
+        """
+        with open(file_path + ".tmp", "w") as json_file:
+            json.dump(content, json_file, indent=indent)
+        replace(file_path + ".tmp", file_path)
         return
 
     @staticmethod
-    def __read_data_meta_file():
+    def _read_json_file(file_path: str):
+        with open(file_path, "r") as json_file:
+            return json.load(json_file)
+
+    @staticmethod
+    def __read_data_meta_file(data_version: int = None):
+        """
+        :param data_version: the data version that its state is returned, None for the whole meta of data file
+        :return: meta of data file (the data version's state), None if there is not any
+        """
         meta_file_path = Advisor.get_data_file_meta_path()
         if path.exists(meta_file_path):
             with open(meta_file_path, "r") as json_file:
                 meta = json.load(json_file)
                 json_file.close()
-            return meta
+            if data_version is None:
+                return meta
+            data_versions = meta.pop("data_versions", dict())
+            if str(data_version) in data_versions:
+                return data_versions[str(data_version)]
+            # meta that is written before data versions were kept apart has one state for all of them
+            return meta if "languages" in meta else None
         return None
 
     @staticmethod
@@ -81,112 +136,154 @@ class TextPreprocessor:
         """
         :param data_file_name: processed data's file name
         :param version: the data that we want to read it
-        :return: (dict format) the processed data that we wrote it down before
+        :return: (dict format) the processed data that we wrote it down before, as ProcessedDocuments of each language
         """
-        meta = TextPreprocessor.__read_data_meta_file()
+        meta = TextPreprocessor.__read_data_meta_file(version)
         if meta is None:
             return None
+        manifest = TextPreprocessor.__read_checkpoints_manifest(version)
+        if manifest is not None and manifest["run"]["append"] is False:
+            logging.info("-- Processing data version %d was not finished" % version)
+            return None
         processed_data = dict()
+        lang_parts = meta.get("lang_parts", dict())
         for lang in meta["languages"]:
-            processed_data_file_name = Advisor.get_data_version_folders_file_path(lang, version, data_file_name, "json")
-            if path.exists(processed_data_file_name) is False:
-                return None
-            with open(processed_data_file_name) as json_file:
-                processed_data[lang] = json.load(json_file)
-                json_file.close()
+            for part in range(lang_parts.get(lang, 1)):
+                if ProcessedDocuments.exists(lang, version, data_file_name, part) is False and \
+                        TextPreprocessor.__convert_json_processed_data(lang, version, data_file_name, part) is False:
+                    return None
+            processed_data[lang] = ProcessedDocuments.read(lang, version, data_file_name, lang_parts.get(lang, 1))
         return processed_data
 
-    def __init__(self, lang: str):
+    @staticmethod
+    def __convert_json_processed_data(lang: str, version: int, data_file_name: str, part: int) -> bool:
+        """
+        Processed data was written as a json list of documents' lemmas before; it is converted to ProcessedDocuments
+        (the json file is kept)
+        :return: False if there is no json processed data of the part
+        """
+        part_file_name = ProcessedDocuments.get_part_file_name(data_file_name, part)
+        processed_data_file_name = Advisor.get_data_version_folders_file_path(lang, version, part_file_name, "json")
+        if path.exists(processed_data_file_name) is False:
+            return False
+        logging.info("--- Converting json processed data %s to binary format" % processed_data_file_name)
+        with open(processed_data_file_name) as json_file:
+            documents = json.load(json_file)
+            json_file.close()
+        ProcessedDocuments.write(lang, version, data_file_name, documents, part)
+        return True
+
+    def __init__(self, lang: str, pipeline_profile: str = "tagger", filter_entities: bool = False,
+                 lemma_cache_size: int = 100000):
         """
         :raise This should not be called, instead "get_text_process_related_lang_object" must be called
         :param lang: the language of text
+        :param pipeline_profile: the components of model's pipeline that are loaded (see "pipeline_profiles")
+        :param filter_entities: if True, tokens that are part of a named entity are not valid
+        :param lemma_cache_size: maximum number of cached lemmas of the language, 0 for no cache; if the model has
+        a lemmatizer component, it is taken out of the pipeline and only the valid tokens that their lemma is not
+        cached are lemmatized by it
         """
         self.lang = lang
-        self.model = self.__load_suitable_model(lang)
-        self.model.max_length = 20000000
+        self.pipeline_profile = pipeline_profile
+        self.filter_entities = filter_entities
+        start_time = perf_counter()
+        self.model = self.__load_suitable_model(lang, pipeline_profile)
+        self.load_time = perf_counter() - start_time
+        lemmatizer = None
+        if lemma_cache_size > 0 and self.lemmatizer_component in self.model.pipe_names:
+            lemmatizer = self.model.remove_pipe(self.lemmatizer_component)[1]
+        self.token_filter = TokenFilter(self.get_token_validation(filter_entities), lemma_cache_size, lemmatizer)
+        logging.info("--- Model of language '%s' with '%s' pipeline profile is loaded in %.2f sec" %
+                     (lang, pipeline_profile, self.load_time))
         return
 
     @classmethod
-    def __is_verb(cls, token: Token) -> bool:
-        if token.pos_ == "VERB":
-            return True
-        return False
-
-    @classmethod
-    def __is_adj(cls, token: Token):
-        if token.pos_ == "ADJ":
-            return True
-        return False
-
-    @classmethod
-    def __is_adv(cls, token: Token):
-        if token.pos_ == "ADV":
-            return True
-        return False
-
-    @classmethod
-    def __is_name_entity(cls, token: Token):
-        if len(token.ent_type_) > 0:
-            return True
-        return False
-
-    @classmethod
-    def __is_token_valid(cls, token: Token) -> bool:
-        if token.is_stop is True or \
-                token.is_space is True or \
-                token.is_currency is True or \
-                token.is_bracket is True or \
-                token.is_alpha is False or \
-                token.like_url is True or \
-                token.like_email is True or \
-                token.like_num is True or \
-                cls.__is_verb(token):
-            # cls.__is_adj(token) or \
-            # cls.__is_adv(token)
-
-            return False
-        return True
+    def get_token_validation(cls, filter_entities: bool = False) -> dict:
+        """
+        :param filter_entities: if True, tokens that are part of a named entity are not valid
+        :return: rules of token validation
+        """
+        token_validation = {"must": list(cls.token_validation["must"]),
+                            "must Not": list(cls.token_validation["must Not"])}
+        if filter_entities:
+            token_validation["must Not"].append("name_entity")
+        return token_validation
 
     @classmethod
-    def __load_suitable_model(cls, lang: str):
+    def __load_suitable_model(cls, lang: str, pipeline_profile: str = "tagger"):
         """
         :description: Load spacy's model
         :param lang: the model's language
+        :param pipeline_profile: the components of model's pipeline that are loaded
         :return: a model that support the language
         """
+        if pipeline_profile not in cls.pipeline_profiles:
+            raise NotImplementedError("--- Pipeline profile '%s' is not supported" % pipeline_profile)
         if lang in cls.lang_models:
-            return spacy.load(cls.lang_models[lang])
+            return spacy.load(cls.lang_models[lang], disable=cls.pipeline_profiles[pipeline_profile])
         else:
             raise Exception("Language {} is not supported yet!!".format(lang))
 
     @classmethod
-    def __process_raw_data_language_classified(cls, raw_data: dict) -> dict:
+    def release_objects_of_TextPreprocessor_for_each_lang(cls):
         """
-        :param raw_data: the output of data provider step
-        :return: (dict format) processed text based on its language
+        For training step there is no need for keeping TextPreprocessor objects in memory so we release them
         """
+        cls.objects_of_TextPreprocessor_for_each_lang = dict()
+        return
 
-        processed_data = dict()
-        for lang in raw_data:
-            try:
-                text_processor = cls.init_replacement(lang)
-                language_raw_data = raw_data[lang]
-                processed_data[lang] = text_processor.__process_list_of_docs(language_raw_data)
-            except NotImplementedError as err:
-                logging.error(err)
-        cls.release_objects_of_TextPreprocessor_for_each_lang()
-        return processed_data
+    @classmethod
+    def get_nlp_params(cls, batch_size: int = 1000, n_process: int = 1, pipeline_profile: str = "tagger",
+                       filter_entities: bool = False, chunk_size: int = 100000, language_workers: int = 1,
+                       models_memory_budget: int = 4000, lemma_cache_size: int = 100000) -> dict:
+        """
+        :param batch_size: number of documents that spacy's model processes at once
+        :param n_process: number of processes that spacy's model runs in
+        :param pipeline_profile: the components of spacy's pipeline that are loaded (see "pipeline_profiles")
+        :param filter_entities: if True, tokens that are part of a named entity are removed
+        :param chunk_size: maximum number of characters that the model processes at once; longer documents are split
+        :param language_workers: number of languages that are processed at once, each one in its own process
+        :param models_memory_budget: memory (MB) that models of the languages that are processed at once can use
+        :param lemma_cache_size: maximum number of cached lemmas of each language, 0 for no cache
+        :return: params of processing documents by spacy's models
+        """
+        if filter_entities and "ner" in cls.pipeline_profiles.get(pipeline_profile, []):
+            logging.warning("--- Filtering entities needs 'ner', so 'ner' pipeline profile is used")
+            pipeline_profile = "ner"
+        return {"batch_size": batch_size, "n_process": n_process,
+                "pipeline_profile": pipeline_profile, "filter_entities": filter_entities,
+                "chunk_size": chunk_size,
+                "language_workers": language_workers, "models_memory_budget": models_memory_budget,
+                "lemma_cache_size": lemma_cache_size}
 
     @classmethod
-    def release_objects_of_TextPreprocessor_for_each_lang(cls):
+    def get_pipeline_profiles_speed(cls, lang: str, docs: list, filter_entities: bool = False) -> dict:
         """
-        For training step there is no need for keeping TextPreprocessor objects in memory so we release them
+        Loads the model of the language by every pipeline profile and processes the same documents to compare them
+        :param lang: the language of documents
+        :param docs: list of documents' texts
+        :param filter_entities: if True, tokens that are part of a named entity are removed
+        :return: dict of profiles' names as keys, and their model's load time (sec) and latency of each document (ms)
         """
-        cls.objects_of_TextPreprocessor_for_each_lang = dict()
-        return
+        speeds = dict()
+        for pipeline_profile, disabled_components in cls.pipeline_profiles.items():
+            if filter_entities and "ner" in disabled_components:
+                continue
+            text_processor = TextPreprocessor(lang, pipeline_profile, filter_entities)
+            start_time = perf_counter()
+            for doc in docs:
+                text_processor.document_pre_process(doc)
+            speeds[pipeline_profile] = {"load_time": text_processor.load_time,
+                                        "doc_latency": 1000 * (perf_counter() - start_time) / max(len(docs), 1)}
+            logging.info("---- '%s' pipeline profile is loaded in %.2f sec and processes a document in %.2f ms" %
+                         (pipeline_profile, speeds[pipeline_profile]["load_time"],
+                          speeds[pipeline_profile]["doc_latency"]))
+        return speeds
 
     @classmethod
-    def init_replacement(cls, lang: str):
+    def init_replacement(cls, lang: str, pipeline_profile: str = "tagger", filter_entities: bool = False,
+                         lemma_cache_size: int = 100000):
         """
         We must use this instead of constructor.
         Responsible for getting related model to given language.
@@ -194,19 +291,46 @@ class TextPreprocessor:
         class variable. When there is a request for specific language first we see, if we created before, return that,
         else we crate one, and save it, then return the new created one
         :param lang: detected language of text ;the TextProcessor object is based on this language
+        :param pipeline_profile: the components of model's pipeline that are loaded (see "pipeline_profiles")
+        :param filter_entities: if True, tokens that are part of a named entity are not valid
+        :param lemma_cache_size: maximum number of cached lemmas of the language, 0 for no cache
         :return: A TextProcessor object
         """
         logging.info("--- Getting TextProcessor object for language '%s'" % lang)
         if lang in cls.lang_models:
-            if lang not in cls.objects_of_TextPreprocessor_for_each_lang:
-                cls.objects_of_TextPreprocessor_for_each_lang[lang] = TextPreprocessor(lang)
+            text_processor = cls.objects_of_TextPreprocessor_for_each_lang.get(lang)
+            # the model is loaded again for another cache size, since its lemmatizer may be taken out of its pipeline
+            if text_processor is None or text_processor.pipeline_profile != pipeline_profile or \
+                    text_processor.token_filter.cache_size != lemma_cache_size:
+                cls.objects_of_TextPreprocessor_for_each_lang[lang] = TextPreprocessor(lang, pipeline_profile,
+                                                                                       filter_entities,
+                                                                                       lemma_cache_size)
+            text_processor = cls.objects_of_TextPreprocessor_for_each_lang[lang]
+            if text_processor.filter_entities != filter_entities:
+                text_processor.filter_entities = filter_entities
+                text_processor.token_filter = TokenFilter(cls.get_token_validation(filter_entities), lemma_cache_size,
+                                                          text_processor.token_filter.lemmatizer)
             logging.info("-- Got TextProcessor object for language %s" % lang)
             return cls.objects_of_TextPreprocessor_for_each_lang[lang]
         raise NotImplementedError("--- Language '%s' is not supported" % lang)
 
     @classmethod
     def get_processed_data(cls, data_file_name, data_file_extension, data_version,
-                           data_file_type, include_tags, exclude_tags) -> dict:
+                           data_file_type, include_tags, exclude_tags,
+                           parse_workers: int = 1, parse_chunk_size: int = 64,
+                           extraction_backend: str = "html.parser",
+                           lang_sample_size: int = 2000, use_page_lang: bool = False,
+                           record_range: list = None,
+                           dedup_mode: str = "none", near_duplicate_threshold: float = 0.8,
+                           dedup_max_pages: int = 200000,
+                           data_shards: str = None, shard_workers: int = 1,
+                           incremental: bool = False,
+                           nlp_batch_size: int = 1000, nlp_processes: int = 1,
+                           pipeline_profile: str = "tagger", filter_entities: bool = False,
+                           nlp_chunk_size: int = 100000,
+                           checkpoint_size: int = 10000, requested_langs: list = None,
+                           language_workers: int = 1, models_memory_budget: int = 4000,
+                           lemma_cache_size: int = 100000) -> dict:
         """
         First it checks if data is read and processed before by looking for saved processed data file
         If it found the file read it and return the content
@@ -218,60 +342,641 @@ class TextPreprocessor:
         :param data_file_type: (DataProvider attribute)
         :param include_tags: (DataProvider attribute)
         :param exclude_tags: (DataProvider attribute)
+        :param parse_workers: (DataProvider attribute) number of processes that parse pages
+        :param parse_chunk_size: (DataProvider attribute) number of pages that are sent to a parsing process at once
+        :param extraction_backend: (DataProvider attribute) the html parser that pages are parsed by
+        :param lang_sample_size: (DataProvider attribute) number of characters that page's language is detected by
+        :param use_page_lang: (DataProvider attribute) use page's declared language instead of detection
+        :param record_range: (start, stop) of data file's records to read by its index, None to read the whole file
+        :param dedup_mode: (PageDeduplicator attribute) "none", "exact" or "near" duplicate pages are removed
+        :param near_duplicate_threshold: (PageDeduplicator attribute) similarity of near duplicate pages
+        :param dedup_max_pages: (PageDeduplicator attribute) number of pages that their hashes are remembered
+        :param data_shards: glob pattern or manifest file of data shards; if it is given, data is read from these
+        shards instead of data file and data_file_name is only the name of processed data
+        :param shard_workers: number of shards that are processed at the same time
+        :param incremental: if True and data is processed before, only the records that are appended to the data file
+        since then are processed and appended to the processed data as a new part
+        :param nlp_batch_size: number of documents that spacy's model processes at once
+        :param nlp_processes: number of processes that spacy's model runs in (for each language)
+        :param pipeline_profile: the components of spacy's pipeline that run (see "pipeline_profiles")
+        :param filter_entities: if True, tokens that are part of a named entity are removed
+        :param nlp_chunk_size: maximum number of characters that spacy's model processes at once
+        :param checkpoint_size: number of documents of each language that are processed and saved as a checkpoint
+        at once; if processing stops, it is resumed from the last saved checkpoint
+        :param requested_langs: languages that are needed, None for all languages; pages of other languages are
+        dropped right after their language is detected. Languages that are processed before (by other requests) are
+        reused, and only the requested languages that are not processed yet are added to the processed data
+        :param language_workers: number of languages that are processed at once, each one in its own process
+        :param models_memory_budget: memory (MB) that models of the languages that are processed at once can use
+        :param lemma_cache_size: maximum number of cached lemmas of each language, 0 for no cache
         :return: processed data
         """
         languages_processed_data = cls.__read_processed_data(data_file_name, data_version)
+        meta = cls.__read_data_meta_file(data_version)
+        nlp_params = cls.get_nlp_params(nlp_batch_size, nlp_processes, pipeline_profile, filter_entities,
+                                        nlp_chunk_size, language_workers, models_memory_budget, lemma_cache_size)
+        data_provider = DataProvider(include_tags, exclude_tags, parse_workers, parse_chunk_size,
+                                     extraction_backend, lang_sample_size, use_page_lang, requested_langs)
+        deduplicator = PageDeduplicator(dedup_mode, near_duplicate_threshold, max_pages=dedup_max_pages)
+        shards = None
+        if data_shards is not None:
+            shards = Advisor.get_data_shards_paths(data_shards)
+            if languages_processed_data is not None and \
+                    meta.get("shards") != [Advisor.get_shard_name(shard) for shard in shards]:
+                logging.info("-- Data shards are changed since data was processed")
+                languages_processed_data = None
+        not_processed_langs = list()
+        if languages_processed_data is not None:
+            not_processed_langs = cls.__get_not_processed_langs(meta, requested_langs)
+            if not_processed_langs is None or (not_processed_langs and shards is not None):
+                logging.info("-- Requested languages were not processed before")
+                if not_processed_langs is not None:
+                    data_provider.langs = meta["processed_langs"] + not_processed_langs
+                languages_processed_data = None
         if languages_processed_data is None:
             logging.info("-- Data file was not read completely before")
-            logging.info("-- Reading data from file")
-            data_provider = DataProvider(include_tags, exclude_tags)
-            raw_data = data_provider.get_train_data_ready_to_work(data_file_name=data_file_name,
-                                                                  data_file_extension=data_file_extension,
-                                                                  data_file_type=data_file_type)
-            logging.info("-- Start processing data")
-            languages_processed_data = TextPreprocessor.__process_raw_data_language_classified(raw_data)
-            logging.info("-- Processing data is Done")
-            languages = list(languages_processed_data.keys())
-            cls.__write_meta_data(languages, {"include": data_provider.include_tags,
-                                              "exclude": data_provider.exclude_tags,
-                                              "important": data_provider.important_tags,
-                                              "skip": data_provider.skip_tags}, data_version,
-                                  {lang: len(languages_processed_data[lang]) for lang in languages})
-            cls.__write_processed_data(version=data_version, data_file_name=data_file_name,
-                                       processed_data=languages_processed_data)
+            data_file_state = {"processed_langs": data_provider.langs}
+            if shards is None:
+                def read_raw_data(start_offset: int = 0):
+                    logging.info("-- Reading data from file")
+                    pages = data_provider.get_train_data_pages(data_file_name=data_file_name,
+                                                               data_file_extension=data_file_extension,
+                                                               data_file_type=data_file_type,
+                                                               record_range=record_range,
+                                                               start_offset=start_offset)
+                    return deduplicator.deduplicate(pages), lambda: {"removed_pages": deduplicator.removed_pages,
+                                                                     "read_offset": data_provider.read_offset}
+
+                run = {"data_file_name": data_file_name, "start_offset": 0, "append": False,
+                       "record_range": None if record_range is None else list(record_range),
+                       "langs": data_provider.langs}
+                languages_processed_data, raw_data_state = cls.__process_raw_data_with_checkpoints(
+                    run, read_raw_data, data_version, nlp_params, checkpoint_size)
+                removed_pages = raw_data_state["removed_pages"]
+                if record_range is None:
+                    data_file_state["read_offset"] = raw_data_state["read_offset"]
+                logging.info("-- Processing data is Done")
+                cls.__write_processed_data(version=data_version, data_file_name=data_file_name,
+                                           processed_data=languages_processed_data)
+                lang_length = {lang: len(languages_processed_data[lang]) for lang in languages_processed_data}
+            else:
+                lang_length, data_file_state["lang_parts"], removed_pages = cls._get_processed_shards(
+                    shards, data_file_name, data_version, data_file_type, data_provider, deduplicator, shard_workers,
+                    nlp_params, checkpoint_size)
+                data_file_state["shards"] = [Advisor.get_shard_name(shard) for shard in shards]
+            cls.__write_meta_data(list(lang_length), cls.__get_tags(data_provider), data_version, lang_length,
+                                  removed_pages, data_file_state, nlp_params["filter_entities"])
+            cls.__remove_checkpoints(data_version)
+            languages_processed_data = cls.__read_processed_data(data_file_name, data_version)
+        else:
+            is_changed = False
+            if not_processed_langs:
+                data_provider.langs = not_processed_langs
+                is_changed = cls.__add_languages(data_file_name, data_file_extension, data_version, data_file_type,
+                                                 data_provider, deduplicator, nlp_params, checkpoint_size,
+                                                 record_range)
+            if incremental and shards is None:
+                data_provider.langs = cls.__read_data_meta_file(data_version).get("processed_langs")
+                deduplicator = PageDeduplicator(dedup_mode, near_duplicate_threshold, max_pages=dedup_max_pages)
+                is_changed |= cls.__append_new_records(data_file_name, data_file_extension, data_version,
+                                                       data_file_type, data_provider, deduplicator, nlp_params,
+                                                       checkpoint_size)
+            if is_changed:
+                languages_processed_data = cls.__read_processed_data(data_file_name, data_version)
 
         return languages_processed_data
 
-    def __process_list_of_docs(self, list_of_docs: list) -> list:
+    @staticmethod
+    def __get_not_processed_langs(meta: dict, requested_langs: list = None):
+        """
+        :param meta: meta of data file; its "processed_langs" are the languages that are processed, None for all
+        :param requested_langs: languages that are needed, None for all languages
+        :return: list of requested languages that are not processed, None if all languages must be processed
+        """
+        processed_langs = meta.get("processed_langs")
+        if processed_langs is None:
+            return list()
+        if requested_langs is None:
+            return None
+        return [lang for lang in requested_langs if lang not in processed_langs]
+
+    @classmethod
+    def __add_languages(cls, data_file_name: str, data_file_extension: str, data_version: int, data_file_type: str,
+                        data_provider: DataProvider, deduplicator: PageDeduplicator, nlp_params: dict,
+                        checkpoint_size: int = 10000, record_range: list = None) -> bool:
+        """
+        Reads the same part of data file that processed data is read from again, but keeps only the pages of
+        data provider's languages (that are not processed before), and adds their processed data; processed data of
+        the other languages are not changed
+        :return: True if processed data is changed
+        """
+        meta = cls.__read_data_meta_file(data_version)
+        logging.info("-- Adding languages %s to processed data" % data_provider.langs)
+
+        def read_raw_data(start_offset: int = 0):
+            pages = data_provider.get_train_data_pages(data_file_name=data_file_name,
+                                                       data_file_extension=data_file_extension,
+                                                       data_file_type=data_file_type,
+                                                       record_range=record_range,
+                                                       start_offset=start_offset,
+                                                       stop_offset=meta.get("read_offset"))
+            return deduplicator.deduplicate(pages), lambda: {"removed_pages": deduplicator.removed_pages,
+                                                             "read_offset": data_provider.read_offset}
+
+        run = {"data_file_name": data_file_name, "start_offset": 0, "append": True,
+               "record_range": None if record_range is None else list(record_range), "langs": data_provider.langs}
+        new_processed_data, raw_data_state = cls.__process_raw_data_with_checkpoints(run, read_raw_data, data_version,
+                                                                                     nlp_params, checkpoint_size)
+        cls.__write_processed_data(version=data_version, data_file_name=data_file_name,
+                                   processed_data=new_processed_data)
+        languages = meta["languages"] + [lang for lang in new_processed_data if lang not in meta["languages"]]
+        lang_length = meta["lang_length"]
+        lang_parts = meta.get("lang_parts", {lang: 1 for lang in meta["languages"]})
+        for lang in new_processed_data:
+            lang_length[lang] = len(new_processed_data[lang])
+            lang_parts[lang] = 1
+        removed_pages = meta.get("removed_duplicate_pages", {"exact": 0, "near": 0})
+        for duplicate_type in removed_pages:
+            removed_pages[duplicate_type] += raw_data_state["removed_pages"][duplicate_type]
+        data_file_state = {"processed_langs": meta["processed_langs"] + data_provider.langs, "lang_parts": lang_parts}
+        if "read_offset" in meta:
+            data_file_state["read_offset"] = meta["read_offset"]
+        cls.__write_meta_data(languages, cls.__get_tags(data_provider), data_version, lang_length, removed_pages,
+                              data_file_state, nlp_params["filter_entities"])
+        cls.__remove_checkpoints(data_version)
+        logging.info("-- Languages %s are added to processed data" % data_provider.langs)
+        return bool(new_processed_data)
+
+    @staticmethod
+    def __get_tags(data_provider: DataProvider) -> dict:
+        return {"include": data_provider.include_tags,
+                "exclude": data_provider.exclude_tags,
+                "important": data_provider.important_tags,
+                "skip": data_provider.skip_tags}
+
+    @classmethod
+    def __append_new_records(cls, data_file_name: str, data_file_extension: str,
+                             data_version: int, data_file_type: str,
+                             data_provider: DataProvider, deduplicator: PageDeduplicator,
+                             nlp_params: dict = None, checkpoint_size: int = 10000) -> bool:
+        """
+        Reads the data file from the offset that the last run stopped at, processes its new records, and writes them
+        as a new part of each language's processed data; the parts that are written before are not rewritten.
+        Duplicates are removed among the new records, not between them and the records that are processed before
+        :return: True if new records are appended
+        """
+        nlp_params = cls.get_nlp_params() if nlp_params is None else nlp_params
+        meta = cls.__read_data_meta_file(data_version)
+        if "read_offset" not in meta:
+            logging.warning("-- The offset that processed data is read to is unknown, so new records can not be found")
+            return False
+
+        def read_raw_data(start_offset: int = meta["read_offset"]):
+            logging.info("-- Reading new records of data file from byte %d" % start_offset)
+            pages = data_provider.get_train_data_pages(data_file_name=data_file_name,
+                                                       data_file_extension=data_file_extension,
+                                                       data_file_type=data_file_type,
+                                                       start_offset=start_offset)
+            return deduplicator.deduplicate(pages), lambda: {"removed_pages": deduplicator.removed_pages,
+                                                             "read_offset": data_provider.read_offset}
+
+        run = {"data_file_name": data_file_name, "start_offset": meta["read_offset"], "append": True,
+               "record_range": None, "langs": data_provider.langs}
+        new_processed_data, raw_data_state = cls.__process_raw_data_with_checkpoints(run, read_raw_data, data_version,
+                                                                                     nlp_params, checkpoint_size)
+        if not any(new_processed_data.values()):
+            logging.info("-- There is no new record in data file")
+            cls.__remove_checkpoints(data_version)
+            return False
+        lang_parts = meta.get("lang_parts", {lang: 1 for lang in meta["languages"]})
+        new_lang_parts = {lang: lang_parts.get(lang, 0) for lang in new_processed_data}
+        cls.__write_processed_data(version=data_version, data_file_name=data_file_name,
+                                   processed_data=new_processed_data, lang_parts=new_lang_parts)
+
+        languages = meta["languages"] + [lang for lang in new_processed_data if lang not in meta["languages"]]
+        lang_length = meta["lang_length"]
+        for lang in new_processed_data:
+            lang_length[lang] = lang_length.get(lang, 0) + len(new_processed_data[lang])
+            lang_parts[lang] = new_lang_parts[lang] + 1
+        removed_pages = meta.get("removed_duplicate_pages", {"exact": 0, "near": 0})
+        for duplicate_type in removed_pages:
+            removed_pages[duplicate_type] += raw_data_state["removed_pages"][duplicate_type]
+        cls.__write_meta_data(languages, cls.__get_tags(data_provider), data_version, lang_length, removed_pages,
+                              {"read_offset": raw_data_state["read_offset"], "lang_parts": lang_parts,
+                               "processed_langs": meta.get("processed_langs")},
+                              nlp_params["filter_entities"])
+        cls.__remove_checkpoints(data_version)
+        logging.info("-- New records are appended to processed data")
+        return True
+
+    @staticmethod
+    def __read_checkpoints_manifest(data_version: int, checkpoints_name: str = None):
+        """
+        :param checkpoints_name: name of a separate processing of the data version (e.g. a data shard)
+        :return: the manifest of checkpoints of processing the data version, None if there is not any
+        """
+        manifest_path = Advisor.get_checkpoints_folder_path(data_version, checkpoints_name) + \
+            Advisor.file_with_extension.format("manifest", "json")
+        if path.exists(manifest_path) is False:
+            return None
+        with open(manifest_path, "r") as json_file:
+            return json.load(json_file)
+
+    @staticmethod
+    def __remove_checkpoints(data_version: int, checkpoints_name: str = None):
+        if path.exists(Advisor.get_checkpoints_folder_path(data_version, checkpoints_name)):
+            rmtree(Advisor.get_checkpoints_folder_path(data_version, checkpoints_name))
+        return
+
+    @classmethod
+    def __process_raw_data_with_checkpoints(cls, run: dict, read_raw_data, data_version: int, nlp_params: dict,
+                                            checkpoint_size: int = 10000, checkpoints_name: str = None) -> tuple:
+        """
+        Processes raw data of the reader and saves its progress as checkpoints: pages are taken from the reader one
+        by one (after deduplicating them) and kept for each language, and when 'checkpoint_size' pages of a language
+        are gathered, the kept pages of every language are saved as raw batches in checkpoints folder of the data
+        version and released, so at most one batch of each language is in memory while reading. The manifest of
+        checkpoints is updated after each of them with the reading progress (the offset that the saved pages are
+        read to), so a stopped reading is resumed from there; the deduplicator does not remember the pages that are
+        read before it is resumed. Then each batch is loaded only when it is processed, and its processed documents
+        are saved in place of it; the manifest is updated after each of them. So if processing stops, the next run
+        resumes it from the last saved batch and loads only the raw batches that are not processed yet.
+        Every file is written atomically, and checkpoints are removed after processed data and meta are written
+        :param run: what identifies this processing (data file, the offset that it is read from, ...); checkpoints
+        of another processing are discarded
+        :param read_raw_data: function (the byte offset to start reading from, the run's start by default) that
+        returns (generator of (language, text) of raw pages, function that returns {"removed_pages", "read_offset"}
+        of the pages that are taken from the generator)
+        :param nlp_params: how spacy's models process documents (see "get_nlp_params")
+        :param checkpoint_size: number of documents of each language that are saved as a checkpoint at once
+        :param checkpoints_name: name of a separate processing of the data version (e.g. a data shard) that keeps
+        its checkpoints in their own folder, None for processing the data version itself
+        :return: (processed data, {"removed_pages", "read_offset"} of reading raw data)
+        """
+        def get_checkpoint_file_path(file_name: str, file_extension: str) -> str:
+            return Advisor.get_checkpoints_folders_file_path(data_version, file_name, file_extension, checkpoints_name)
+
+        manifest = cls.__read_checkpoints_manifest(data_version, checkpoints_name)
+        if manifest is None or manifest["run"] != run or manifest["checkpoint_size"] != checkpoint_size or \
+                "read_progress" not in manifest:
+            cls.__remove_checkpoints(data_version, checkpoints_name)
+            manifest = {"run": run, "checkpoint_size": checkpoint_size, "raw_data": None, "read_progress": None,
+                        "raw_batches": dict(), "batches": dict()}
+            cls._write_json_file(get_checkpoint_file_path("manifest", "json"), manifest)
+        manifest_path = get_checkpoint_file_path("manifest", "json")
+        if manifest["raw_data"] is None:
+            read_progress = manifest["read_progress"]
+            if read_progress is None:
+                pages, get_raw_data_state = read_raw_data()
+                read_progress = {"removed_pages": {"exact": 0, "near": 0}}
+            else:
+                logging.info("-- Reading raw data is resumed from byte %d" % read_progress["read_offset"])
+                pages, get_raw_data_state = read_raw_data(read_progress["read_offset"])
+            raw_batches = {lang: list() for lang in manifest["raw_batches"]}
+            not_supported_langs = set()
+
+            def save_raw_batches():
+                """
+                Saves the kept pages of every language, and then the offset that they are read to in the manifest
+                """
+                for batch_lang in raw_batches:
+                    if raw_batches[batch_lang]:
+                        batch = manifest["raw_batches"][batch_lang]
+                        cls._write_json_file(
+                            get_checkpoint_file_path("{}-raw-batch-{}".format(batch_lang, batch), "json"),
+                            raw_batches[batch_lang])
+                        manifest["raw_batches"][batch_lang] = batch + 1
+                        raw_batches[batch_lang] = list()
+                raw_data_state = get_raw_data_state()
+                manifest["read_progress"] = {
+                    "read_offset": raw_data_state["read_offset"],
+                    "removed_pages": {duplicate_type: removed + raw_data_state["removed_pages"][duplicate_type]
+                                      for duplicate_type, removed in read_progress["removed_pages"].items()}}
+                cls._write_json_file(manifest_path, manifest)
+
+            for lang, text in pages:
+                if lang not in raw_batches:
+                    if lang not in cls.lang_models:
+                        if lang not in not_supported_langs:
+                            logging.error("--- Language '%s' is not supported" % lang)
+                            not_supported_langs.add(lang)
+                        continue
+                    manifest["raw_batches"][lang] = 0
+                    raw_batches[lang] = list()
+                raw_batches[lang].append(text)
+                if len(raw_batches[lang]) == checkpoint_size:
+                    save_raw_batches()
+            save_raw_batches()
+            del raw_batches
+            manifest["raw_data"] = manifest["read_progress"]
+            cls._write_json_file(manifest_path, manifest)
+        else:
+            logging.info("-- Raw data was read before, processing is resumed from checkpoints")
+
+        logging.info("-- Start processing data")
+        processed_data = dict()
+        not_processed_batches = dict()
+        for lang, number_of_batches in manifest["raw_batches"].items():
+            processed_data[lang] = list()
+            not_processed_batches[lang] = list()
+            for batch in range(number_of_batches):
+                if batch < manifest["batches"].get(lang, 0):
+                    processed_data[lang].extend(
+                        cls._read_json_file(get_checkpoint_file_path("{}-batch-{}".format(lang, batch), "json")))
+                else:
+                    not_processed_batches[lang].append(
+                        (batch, get_checkpoint_file_path("{}-raw-batch-{}".format(lang, batch), "json")))
+            logging.info("--- %d documents of '%s' are resumed from checkpoints" % (len(processed_data[lang]), lang))
+
+        def save_batch(lang: str, batch: int, processed_batch: list):
+            batch_path = get_checkpoint_file_path("{}-batch-{}".format(lang, batch), "json")
+            cls._write_json_file(batch_path, processed_batch)
+            manifest["batches"][lang] = batch + 1
+            cls._write_json_file(manifest_path, manifest)
+            remove(get_checkpoint_file_path("{}-raw-batch-{}".format(lang, batch), "json"))
+            processed_data[lang].extend(processed_batch)
+
+        not_processed_batches = {lang: batches for lang, batches in not_processed_batches.items() if batches}
+        if nlp_params["language_workers"] > 1:
+            cls.__process_languages_concurrently(not_processed_batches, save_batch, nlp_params)
+        else:
+            for lang, batches in not_processed_batches.items():
+                text_processor = cls.init_replacement(lang, nlp_params["pipeline_profile"],
+                                                      nlp_params["filter_entities"], nlp_params["lemma_cache_size"])
+                for batch, raw_batch_path in batches:
+                    save_batch(lang, batch, text_processor.__process_list_of_docs(cls._read_json_file(raw_batch_path),
+                                                                                  nlp_params["batch_size"],
+                                                                                  nlp_params["n_process"],
+                                                                                  nlp_params["chunk_size"]))
+                # the model is not needed anymore, so it is released before the next language's model is loaded
+                cls.objects_of_TextPreprocessor_for_each_lang.pop(lang, None)
+        cls.release_objects_of_TextPreprocessor_for_each_lang()
+        return processed_data, manifest["raw_data"]
+
+    @classmethod
+    def get_model_memory(cls, lang: str) -> int:
+        """
+        :return: approximate memory (MB) of the language's model when it is loaded, by the model's size
         """
+        return cls.models_memory.get(cls.lang_models[lang].rsplit("_", 1)[-1], max(cls.models_memory.values()))
+
+    @classmethod
+    def __process_languages_concurrently(cls, not_processed_batches: dict, save_batch, nlp_params: dict):
+        """
+        Each language is processed in its own worker process that loads the language's model once (in its
+        initializer) and processes its batches one after another, each batch is loaded by the worker; languages with
+        more batches are started first.
+        A language is started only if the approximate memory of its model fits in the models' memory budget beside
+        the models of running languages (or if nothing is running), and at most 'language_workers' languages run at
+        once. When a language is finished its worker is shut down, so its model's memory is released
+        :param not_processed_batches: dict of languages and list of their (batch number, path of batch's raw data)
+        :param save_batch: function (lang, batch number, processed batch) that saves a processed batch, it is
+        called in batches' order of each language
+        :param nlp_params: how spacy's models process documents (see "get_nlp_params")
+        """
+        waiting_langs = sorted(not_processed_batches, key=lambda lang: -len(not_processed_batches[lang]))
+        running_langs = dict()
+        while waiting_langs or running_langs:
+            used_memory = sum(cls.get_model_memory(lang) for lang in running_langs)
+            for lang in list(waiting_langs):
+                if len(running_langs) >= nlp_params["language_workers"]:
+                    break
+                if running_langs and used_memory + cls.get_model_memory(lang) > nlp_params["models_memory_budget"]:
+                    continue
+                executor = ProcessPoolExecutor(max_workers=1, initializer=cls._init_language_worker,
+                                               initargs=(lang, nlp_params))
+                futures = [(batch, executor.submit(cls._process_language_batch, lang, raw_batch_path, nlp_params))
+                           for batch, raw_batch_path in not_processed_batches[lang]]
+                running_langs[lang] = (executor, futures)
+                waiting_langs.remove(lang)
+                used_memory += cls.get_model_memory(lang)
+                logging.info("--- Processing '%s' is started in a worker process (models' memory: %d of %d MB)" %
+                             (lang, used_memory, nlp_params["models_memory_budget"]))
+            wait([future for executor, futures in running_langs.values() for batch, future in futures],
+                 return_when=FIRST_COMPLETED)
+            for lang, (executor, futures) in list(running_langs.items()):
+                while futures and futures[0][1].done():
+                    batch, future = futures.pop(0)
+                    save_batch(lang, batch, future.result())
+                if not futures:
+                    executor.shutdown()
+                    del running_langs[lang]
+                    logging.info("--- Processing '%s' is finished" % lang)
+        return
+
+    @classmethod
+    def _init_language_worker(cls, lang: str, nlp_params: dict):
+        """
+        Runs once in each language's worker process and loads the language's model
+        """
+        cls.init_replacement(lang, nlp_params["pipeline_profile"], nlp_params["filter_entities"],
+                             nlp_params["lemma_cache_size"])
+        return
 
+    @classmethod
+    def _process_language_batch(cls, lang: str, raw_batch_path: str, nlp_params: dict) -> list:
+        """
+        Runs in the language's worker process by the model that is loaded in its initializer
+        :param raw_batch_path: path of the batch's raw data, it is read in the worker
+        """
+        text_processor = cls.init_replacement(lang, nlp_params["pipeline_profile"], nlp_params["filter_entities"],
+                                              nlp_params["lemma_cache_size"])
+        return text_processor.__process_list_of_docs(cls._read_json_file(raw_batch_path), nlp_params["batch_size"],
+                                                     nlp_params["n_process"], nlp_params["chunk_size"])
+
+    @classmethod
+    def _get_processed_shards(cls, shards: list, data_file_name: str, data_version: int, data_file_type: str,
+                              data_provider: DataProvider, deduplicator: PageDeduplicator,
+                              shard_workers: int, nlp_params: dict = None, checkpoint_size: int = 10000) -> tuple:
+        """
+        Each shard is processed separately like a data file (see "_process_shard") and its processed data is kept
+        as its own ProcessedDocuments, so only the shards that are not processed before (e.g. newly added ones) are
+        processed; they are processed concurrently by 'shard_workers' processes. Then processed data of each shard
+        is written as the next part of its languages' processed data in shards' order; shards' lemma ids are mapped
+        to processed data's vocabulary, so their documents are not decoded.
+        Duplicate pages are removed in each shard, not between shards
+        :param shards: list of exact shards' paths
+        :return: (number of documents of each language, number of parts of each language, number of removed
+        duplicate pages)
+        """
+        # a shard that is processed for other languages is processed again (its name has its languages)
+        langs_suffix = "" if data_provider.langs is None else "-" + "-".join(sorted(data_provider.langs))
+        shards_names = [Advisor.get_shard_name(shard) + langs_suffix for shard in shards]
+        not_processed_shards = [(shard, shard_name) for shard, shard_name in zip(shards, shards_names)
+                                if path.exists(cls.get_shard_meta_path(data_version, shard_name)) is False]
+        logging.info("-- %d of %d data shards are processed before" %
+                     (len(shards) - len(not_processed_shards), len(shards)))
+        if not_processed_shards:
+            with ProcessPoolExecutor(max_workers=shard_workers) as executor:
+                futures = [executor.submit(cls._process_shard, shard, shard_name, data_version, data_file_type,
+                                           data_provider, deduplicator, Advisor.get_data_folder_path(),
+                                           nlp_params, checkpoint_size)
+                           for shard, shard_name in not_processed_shards]
+                for future in futures:
+                    future.result()
+        logging.info("-- Merging processed data shards")
+        lang_length = dict()
+        lang_parts = dict()
+        removed_pages = {"exact": 0, "near": 0}
+        for shard_name in shards_names:
+            with open(cls.get_shard_meta_path(data_version, shard_name), "r") as json_file:
+                shard_meta = json.load(json_file)
+            for lang in shard_meta["languages"]:
+                documents = ProcessedDocuments.read(lang, data_version, cls.get_shard_data_file_name(shard_name))
+                ProcessedDocuments.write_documents(lang, data_version, data_file_name, documents,
+                                                   lang_parts.get(lang, 0))
+                lang_parts[lang] = lang_parts.get(lang, 0) + 1
+                lang_length[lang] = lang_length.get(lang, 0) + len(documents)
+            for duplicate_type in removed_pages:
+                removed_pages[duplicate_type] += shard_meta["removed_pages"][duplicate_type]
+        return lang_length, lang_parts, removed_pages
+
+    @staticmethod
+    def get_shard_meta_path(data_version: int, shard_name: str) -> str:
+        """
+        Shard's meta is written after its processed data, so a shard is processed if its meta is there
+        """
+        return Advisor.get_shards_folders_file_path(data_version, shard_name + "-meta", "json")
+
+    @staticmethod
+    def get_shard_data_file_name(shard_name: str) -> str:
+        """
+        :return: the name of shard's processed data in the data version's folder of each of its languages
+        """
+        return "shard-" + shard_name
+
+    @classmethod
+    def _process_shard(cls, shard: str, shard_name: str, data_version: int, data_file_type: str,
+                       data_provider: DataProvider, deduplicator: PageDeduplicator, data_folder: str,
+                       nlp_params: dict = None, checkpoint_size: int = 10000):
+        """
+        Runs in a worker process; it reads, deduplicates and processes one shard like a data file (by
+        "__process_raw_data_with_checkpoints" with shard's own checkpoints, so a stopped shard is resumed) and writes
+        its processed data as ProcessedDocuments and then its meta
+        """
+        if Advisor.data_folder_is_set is False:
+            Advisor.set_data_folder_path(data_folder.rstrip("/"))
+        logging.info("-- Processing data shard %s" % shard)
+
+        def read_raw_data(start_offset: int = 0):
+            pages = data_provider.get_data_file_pages(shard, data_file_type, start_offset=start_offset)
+            return deduplicator.deduplicate(pages), lambda: {"removed_pages": deduplicator.removed_pages,
+                                                             "read_offset": data_provider.read_offset}
+
+        run = {"shard": shard_name, "langs": data_provider.langs}
+        processed_data, raw_data_state = cls.__process_raw_data_with_checkpoints(run, read_raw_data, data_version,
+                                                                                 nlp_params, checkpoint_size,
+                                                                                 shard_name)
+        cls.__write_processed_data(cls.get_shard_data_file_name(shard_name), processed_data, data_version)
+        cls._write_json_file(cls.get_shard_meta_path(data_version, shard_name),
+                             {"languages": list(processed_data), "removed_pages": raw_data_state["removed_pages"]})
+        cls.__remove_checkpoints(data_version, shard_name)
+        logging.info("-- Data shard %s is processed" % shard)
+        return
+
+    @classmethod
+    def _get_chunks(cls, document: str, chunk_size: int):
+        """
+        Splits a long document into chunks of at most 'chunk_size' characters, so the model's memory is bounded.
+        Each chunk ends at the last paragraph, sentence or word boundary in its second half (or exactly at
+        'chunk_size' if there is none), so tokens are not split between chunks
+        :param document: document's text
+        :param chunk_size: maximum number of characters of each chunk
+        :return: generator of document's chunks in their order
+        """
+        start = 0
+        while len(document) - start > chunk_size:
+            end = start + chunk_size
+            for separator in cls.chunk_separators:
+                boundary = document.rfind(separator, start + chunk_size // 2, end)
+                if boundary != -1:
+                    end = boundary + len(separator)
+                    break
+            yield document[start:end]
+            start = end
+        yield document[start:]
+
+    def __get_chunks_of_docs(self, list_of_docs: list, chunk_size: int):
+        """
+        :return: generator of (chunk, (document's index, chunk's index)) of all documents in their order
+        """
+        for doc_index, document in enumerate(list_of_docs):
+            for chunk_index, chunk in enumerate(self._get_chunks(document, chunk_size)):
+                yield chunk, (doc_index, chunk_index)
+
+    def __get_batches_of_chunks(self, list_of_docs: list, batch_size: int, chunk_size: int):
+        """
+        :return: generator of batches of (chunk, (document's index, chunk's index)); a batch has at most 'batch_size'
+        chunks and at most 'chunk_size' characters (or only one chunk)
+        """
+        batch = list()
+        batch_characters = 0
+        for chunk, indexes in self.__get_chunks_of_docs(list_of_docs, chunk_size):
+            if batch and (len(batch) == batch_size or batch_characters + len(chunk) > chunk_size):
+                yield batch
+                batch = list()
+                batch_characters = 0
+            batch.append((chunk, indexes))
+            batch_characters += len(chunk)
+        if batch:
+            yield batch
+
+    def __process_list_of_docs(self, list_of_docs: list, batch_size: int = 1000, n_process: int = 1,
+                               chunk_size: int = 100000) -> list:
+        """
+        Documents are processed by spacy's "pipe" in batches by 'n_process' processes; "pipe" runs the same pipeline
+        as calling the model on each document, so the tokens are the same.
+        Documents longer than 'chunk_size' are split into chunks and their tokens are concatenated. A batch has at
+        most 'batch_size' documents (chunks) and at most 'chunk_size' characters, so long documents do not make the
+        model's memory 'batch_size' times bigger. Spacy's processes take batches by their number of documents, so
+        with more than one process the batch size is lowered until a batch of the longest chunks fits in 'chunk_size'
         :param list_of_docs: list of documents to preprocess that each of them is a string
+        :param batch_size: maximum number of documents (chunks) that the model processes at once
+        :param n_process: number of processes that the model runs in
+        :param chunk_size: maximum number of characters that the model processes at once
         :return: list of documents that each of them is a list of preprocessed words that were is its document's text
         """
         logging.info("--- Processing texts extracted from pages")
-        for index, doc in enumerate(list_of_docs):
-            list_of_docs[index] = self.document_pre_process(doc)
+        start_time = perf_counter()
+        if self.model is not None:
+            chunk_size = min(chunk_size, self.model.max_length)
+            if n_process > 1:
+                longest_chunk = max([min(len(document), chunk_size) for document in list_of_docs] + [1])
+                docs = self.model.pipe(self.__get_chunks_of_docs(list_of_docs, chunk_size), as_tuples=True,
+                                       batch_size=max(1, min(batch_size, chunk_size // longest_chunk)),
+                                       n_process=n_process)
+            else:
+                docs = (doc for batch in self.__get_batches_of_chunks(list_of_docs, batch_size, chunk_size)
+                        for doc in self.model.pipe(batch, as_tuples=True, batch_size=len(batch)))
+            for doc, (doc_index, chunk_index) in docs:
+                if chunk_index == 0:
+                    list_of_docs[doc_index] = self.__get_valid_lemmas(doc)
+                else:
+                    list_of_docs[doc_index].extend(self.__get_valid_lemmas(doc))
 
-        logging.info("--- Extracted texts are processed")
+        self.token_filter.log_statistics(self.lang)
+        logging.info("--- Extracted texts are processed in %.2f ms per document by '%s' pipeline profile" %
+                     (1000 * (perf_counter() - start_time) / max(len(list_of_docs), 1), self.pipeline_profile))
         return list_of_docs
 
-    def document_pre_process(self, document: str):
+    def __get_valid_lemmas(self, doc: Doc) -> list:
+        """
+        :param doc: the document that is processed by the model
+        :return: lemmas of document's valid tokens
+        """
+        return self.token_filter.get_lemmas(doc)
+
+    def document_pre_process(self, document: str, chunk_size: int = 100000):
         """
         :description: based on document's text's language there is a model in spacy, by that we preprocess the text
         :param document: is one string (concatenation of text of requested tags done in data_providing step)
+        :param chunk_size: maximum number of characters that the model processes at once
         :return: a list of tokens of document's text
         """
         nlp = self.model
         post_process_data = list()
         if nlp is not None:
-            data = nlp(document)
-            if self.lang == "en":
-                for token in data:
-                    if self.__is_token_valid(token):
-                        post_process_data.append(token.lemma_)
-            else:
-                for token in data:
-                    if self.__is_token_valid(token):
-                        post_process_data.append(token.lemma_)
+            for doc in nlp.pipe(self._get_chunks(document, min(chunk_size, nlp.max_length)), batch_size=1):
+                post_process_data.extend(self.__get_valid_lemmas(doc))
         # return list(data.ents)
         return post_process_data
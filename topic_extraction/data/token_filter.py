@@ -0,0 +1,137 @@
+import logging
+from collections import OrderedDict
+
+import numpy
+from spacy.attrs import IS_ALPHA, IS_STOP, IS_SPACE, IS_BRACKET, IS_CURRENCY, LIKE_URL, LIKE_EMAIL, LIKE_NUM, \
+    POS, ENT_TYPE, LEMMA, ORTH
+from spacy.symbols import VERB, ADJ, ADV
+from spacy.tokens.doc import Doc
+
+
+class TokenFilter:
+    """
+    Finds the valid tokens of a document by a declarative rule set:
+        • "must" rules are the token properties that a valid token must have
+        • "must Not" rules are the token properties that a valid token must not have
+    The rules are compiled into one boolean mask over the attributes' array of document (Doc.to_array), so tokens
+    are not checked one by one in python; lemmas of valid tokens are read from the same array (their hashes) and
+    looked up in model's StringStore.
+    If the model's lemmatizer is given (it is removed from the model's pipeline), only valid tokens are lemmatized:
+    lemmas are cached by (orth, POS) of token in a bounded LRU cache, and the lemmatizer runs only for the distinct
+    tokens of a document that are not cached
+    """
+    # rule name: (spacy's attribute, the attribute's value that the token property holds for, None for any non zero)
+    rules_attributes = {
+        "alpha": (IS_ALPHA, None),
+        "stop_word": (IS_STOP, None),
+        "space": (IS_SPACE, None),
+        "bracket": (IS_BRACKET, None),
+        "currency": (IS_CURRENCY, None),
+        "url": (LIKE_URL, None),
+        "email": (LIKE_EMAIL, None),
+        "number": (LIKE_NUM, None),
+        "verb": (POS, VERB),
+        "adj": (POS, ADJ),
+        "adv": (POS, ADV),
+        "name_entity": (ENT_TYPE, None)
+    }
+
+    def __init__(self, rules: dict, cache_size: int = 100000, lemmatizer=None):
+        """
+        :param rules: {"must": [rule names], "must Not": [rule names]}; rule names are keys of "rules_attributes"
+        :param cache_size: maximum number of cached lemmas (the least recently used ones are evicted), 0 for no cache
+        :param lemmatizer: the lemmatizer component of the model that is removed from its pipeline, None if lemmas
+        are assigned by the pipeline
+        """
+        for rule in rules["must"] + rules["must Not"]:
+            if rule not in self.rules_attributes:
+                raise NotImplementedError("--- Token validation rule '%s' is not supported" % rule)
+        self.rules = rules
+        self.attributes = list()
+        for rule in rules["must"] + rules["must Not"]:
+            if self.rules_attributes[rule][0] not in self.attributes:
+                self.attributes.append(self.rules_attributes[rule][0])
+        self.attributes.extend([ORTH, POS, LEMMA])
+        self.must = self.__compile_rules(rules["must"])
+        self.must_not = self.__compile_rules(rules["must Not"])
+        self.cache_size = cache_size
+        self.lemmatizer = lemmatizer
+        self.cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_evictions = 0
+
+    def __compile_rules(self, rules: list) -> list:
+        """
+        :return: list of (column of the rule's attribute in attributes' array, the attribute's value)
+        """
+        return [(self.attributes.index(self.rules_attributes[rule][0]), self.rules_attributes[rule][1])
+                for rule in rules]
+
+    @staticmethod
+    def __get_rule_mask(array: numpy.ndarray, column: int, value):
+        if value is None:
+            return array[:, column] != 0
+        return array[:, column] == value
+
+    def get_mask(self, array: numpy.ndarray) -> numpy.ndarray:
+        """
+        :param array: the document's attributes' array, its columns are "attributes"
+        :return: boolean mask of valid tokens
+        """
+        mask = numpy.ones(len(array), dtype=bool)
+        for column, value in self.must:
+            mask &= self.__get_rule_mask(array, column, value)
+        for column, value in self.must_not:
+            mask &= ~self.__get_rule_mask(array, column, value)
+        return mask
+
+    def __get_valid_tokens_array(self, doc: Doc) -> tuple:
+        """
+        :return: (indexes of the document's valid tokens, their attributes' array); the last columns of the array
+        are orth, POS and lemma
+        """
+        if len(doc) == 0:
+            return numpy.zeros(0, dtype=numpy.int64), numpy.zeros((0, len(self.attributes)), dtype=numpy.uint64)
+        array = doc.to_array(self.attributes).reshape(len(doc), len(self.attributes))
+        mask = self.get_mask(array)
+        return numpy.flatnonzero(mask), array[mask]
+
+    def get_lemmas(self, doc: Doc) -> list:
+        """
+        :param doc: the document that is processed by spacy's model
+        :return: lemmas of the document's valid tokens
+        """
+        indexes, array = self.__get_valid_tokens_array(doc)
+        if len(array) == 0:
+            return list()
+        if self.cache_size == 0:
+            strings = doc.vocab.strings
+            return [strings[lemma_hash] for lemma_hash in array[:, -1].tolist()]
+        keys, first_indexes, inverse = numpy.unique(array[:, -3:-1], axis=0, return_index=True, return_inverse=True)
+        lemmas = [self.__get_lemma(tuple(key), doc[token_index])
+                  for key, token_index in zip(keys.tolist(), indexes[first_indexes].tolist())]
+        return [lemmas[index] for index in inverse.reshape(-1).tolist()]
+
+    def __get_lemma(self, key: tuple, token) -> str:
+        """
+        :param key: (orth, POS) of the token
+        :param token: the token that is lemmatized if its lemma is not cached
+        """
+        if key in self.cache:
+            self.cache_hits += 1
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        self.cache_misses += 1
+        lemma = token.lemma_ if self.lemmatizer is None else self.lemmatizer.lemmatize(token)[0]
+        self.cache[key] = lemma
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+            self.cache_evictions += 1
+        return lemma
+
+    def log_statistics(self, lang: str):
+        lookups = self.cache_hits + self.cache_misses
+        logging.info("---- Lemma cache of '%s': %.1f%% hit rate of %d lookups, %d cached, %d evicted" %
+                     (lang, 100 * self.cache_hits / max(lookups, 1), lookups, len(self.cache), self.cache_evictions))
+        return
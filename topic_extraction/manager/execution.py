@@ -34,6 +34,88 @@ class Execution:
         self.parser.add_argument("-ex-tags", dest="exclude_tags", type=str, nargs='?', default=None,
                                  help="""html tags that their text are not important, so they are the only text that 
                                  not going to process (either this should be passed or -in-tags) e.g. button div form """)
+        # parse_workers
+        self.parser.add_argument("-parse-workers", dest="parse_workers", type=int, default=1,
+                                 help="""number of processes that parse html pages and detect their language;
+                                 with 1 pages are parsed one after another""")
+        # parse_chunk_size
+        self.parser.add_argument("-parse-chunk-size", dest="parse_chunk_size", type=int, default=64,
+                                 help="number of pages that are sent to a parsing process at once")
+        # extraction_backend
+        self.parser.add_argument("-html-backend", dest="extraction_backend", type=str,
+                                 choices=["html.parser", "lxml"], default="html.parser",
+                                 help="""the html parser that pages are parsed by; 'lxml' is a C parser and is much
+                                 faster than python's 'html.parser'""")
+        # lang_sample_size
+        self.parser.add_argument("-lang-sample-size", dest="lang_sample_size", type=int, default=2000,
+                                 help="maximum number of page text's characters that its language is detected by")
+        # use_page_lang
+        self.parser.add_argument("-page-lang", dest="use_page_lang", action="store_true",
+                                 help="""if passed, the language that page declares by <html lang> or meta tags is
+                                 used and language detection is skipped for that page""")
+        # record_range
+        self.parser.add_argument("-records", dest="record_range", type=int, nargs=2, default=None,
+                                 help="""start and stop of the records (pages) of data file to read e.g. 0 100000;
+                                 by this, data file's index is built once next to it and only these records are
+                                 read from the file""")
+        # dedup_mode
+        self.parser.add_argument("-dedup", dest="dedup_mode", type=str, choices=["none", "exact", "near"],
+                                 default="none",
+                                 help="""remove duplicate pages before processing them; 'none' (default) keeps all
+                                 pages, 'exact' removes pages with the same text, 'near' removes near duplicates too
+                                 (by MinHash/LSH)""")
+        # near_duplicate_threshold
+        self.parser.add_argument("-near-dup-threshold", dest="near_duplicate_threshold", type=float, default=0.8,
+                                 help="pages with more Jaccard similarity than this are near duplicates")
+        # dedup_max_pages
+        self.parser.add_argument("-dedup-max-pages", dest="dedup_max_pages", type=int, default=200000,
+                                 help="""number of last kept pages that are remembered to find duplicates; it bounds
+                                 the memory of deduplication""")
+        # data_shards
+        self.parser.add_argument("-shards", dest="data_shards", type=str, default=None,
+                                 help="""glob pattern of data shards (e.g. 'crawl-*.warc.gz') or a manifest file that
+                                 each line of it is a shard's path, relative to the data folder; if it is passed
+                                 data is read from the shards and -file-name is the name of the processed data""")
+        # shard_workers
+        self.parser.add_argument("-shard-workers", dest="shard_workers", type=int, default=1,
+                                 help="number of data shards that are processed at the same time")
+        # incremental
+        self.parser.add_argument("-incremental", dest="incremental", action="store_true",
+                                 help="""if passed and the data version is processed before, only the records that
+                                 are appended to the data file since the last run are processed and appended to it""")
+        # nlp_batch_size
+        self.parser.add_argument("-nlp-batch-size", dest="nlp_batch_size", type=int, default=1000,
+                                 help="number of documents that spacy's model processes at once")
+        # nlp_processes
+        self.parser.add_argument("-nlp-processes", dest="nlp_processes", type=int, default=1,
+                                 help="number of processes that spacy's model runs in for each language")
+        # pipeline_profile
+        self.parser.add_argument("-nlp-profile", dest="pipeline_profile", type=str,
+                                 choices=["tagger", "ner", "full"], default="tagger",
+                                 help="""components of spacy's pipeline that are loaded; "tagger" for POS and lemma,
+                                 "ner" for named entities too and "full" for the whole pipeline""")
+        # filter_entities
+        self.parser.add_argument("-filter-entities", dest="filter_entities", action="store_true",
+                                 help="if passed, tokens that are part of a named entity are removed (needs ner)")
+        # nlp_chunk_size
+        self.parser.add_argument("-nlp-chunk-size", dest="nlp_chunk_size", type=int, default=100000,
+                                 help="""maximum number of characters that spacy's model processes at once; longer
+                                 documents are split at paragraph, sentence or word boundaries""")
+        # checkpoint_size
+        self.parser.add_argument("-checkpoint-size", dest="checkpoint_size", type=int, default=10000,
+                                 help="""number of documents of each language that are processed and saved as a
+                                 checkpoint at once; a stopped processing is resumed from its last checkpoint""")
+        # language_workers
+        self.parser.add_argument("-language-workers", dest="language_workers", type=int, default=1,
+                                 help="""number of languages that are processed at once, each one in its own process;
+                                 with 1 languages are processed one after another in the current process""")
+        # models_memory_budget
+        self.parser.add_argument("-models-memory", dest="models_memory_budget", type=int, default=4000,
+                                 help="memory (MB) that spacy's models of languages that are processed at once can use")
+        # lemma_cache_size
+        self.parser.add_argument("-lemma-cache-size", dest="lemma_cache_size", type=int, default=100000,
+                                 help="""maximum number of cached lemmas of each language, 0 for no cache; with a
+                                 cache only the valid tokens that their lemma is not cached are lemmatized""")
         # dictionary_version
         self.parser.add_argument("-dict-v", dest="dictionary_version", type=int, required=True,
                                  help="the version of dictionary")
@@ -101,6 +183,32 @@ class Execution:
                                  It is either a list of one exact value for 'n_most_frequent' or 
                                  it can be a list with 3 elements [start, stop, step]. 
                                  These represent a rang of values to test 'n_most_frequent'""")
+        # n_grams
+        self.parser.add_argument("-n-grams", dest="n_grams", type=int, choices=[1, 2, 3], default=1,
+                                 help="""1 for words only, 2 to join bigram phrases (e.g. "new_york") and 3 to join
+                                 bigram and trigram phrases of processed data before making the dictionary""")
+        # phrase_min_count
+        self.parser.add_argument("-phrase-min-count", dest="phrase_min_count", type=int, default=5,
+                                 help="bigrams and trigrams that happen less than this are not phrases")
+        # phrase_threshold
+        self.parser.add_argument("-phrase-threshold", dest="phrase_threshold", type=float, default=10.0,
+                                 help="minimum score of phrases, higher means fewer phrases")
+        # phrase_max_vocab_size
+        self.parser.add_argument("-phrase-max-vocab", dest="phrase_max_vocab_size", type=int, default=20000000,
+                                 help="""maximum number of bigrams and trigrams that are counted at once, the rare
+                                 ones are pruned to keep memory bounded""")
+        # essentials_cache_size
+        self.parser.add_argument("-dict-cache-size", dest="essentials_cache_size", type=int, default=4,
+                                 help="""maximum number of dictionaries and corpora (of different languages or
+                                 dictionary parameters) that are kept in memory at once""")
+        # dictionary_workers
+        self.parser.add_argument("-dict-workers", dest="dictionary_workers", type=int, default=1,
+                                 help="""number of processes that make the unfiltered dictionary and corpus of a
+                                 language in parallel; the result is the same as making them in one process""")
+        # max_vocabulary_size
+        self.parser.add_argument("-max-vocab", dest="max_vocabulary_size", type=int, default=0,
+                                 help="""maximum number of words of a language that are counted at once, the rare ones
+                                 are pruned approximately while counting; 0 for exact counting of all words""")
         # list_of_requested_models
         self.parser.add_argument("-models", dest="requested_models", nargs="*",
                                  choices=["lda", "mallet", "lsi", "hdp"],
@@ -5,6 +5,27 @@ class DataParams:
     data_file_name = "data_file_name"
     data_folder_path = "data_folder_path"
     data_file_extension = "data_file_extension"
+    parse_workers = "parse_workers"
+    parse_chunk_size = "parse_chunk_size"
+    extraction_backend = "extraction_backend"
+    lang_sample_size = "lang_sample_size"
+    use_page_lang = "use_page_lang"
+    record_range = "record_range"
+    dedup_mode = "dedup_mode"
+    near_duplicate_threshold = "near_duplicate_threshold"
+    dedup_max_pages = "dedup_max_pages"
+    data_shards = "data_shards"
+    shard_workers = "shard_workers"
+    incremental = "incremental"
+    nlp_batch_size = "nlp_batch_size"
+    nlp_processes = "nlp_processes"
+    pipeline_profile = "pipeline_profile"
+    filter_entities = "filter_entities"
+    nlp_chunk_size = "nlp_chunk_size"
+    checkpoint_size = "checkpoint_size"
+    language_workers = "language_workers"
+    models_memory_budget = "models_memory_budget"
+    lemma_cache_size = "lemma_cache_size"
 
     @classmethod
     def get_data_params_as_list(cls):
@@ -13,5 +34,26 @@ class DataParams:
                 cls.data_file_extension,
                 cls.data_file_type,
                 cls.include_tags,
-                cls.exclude_tags]
+                cls.exclude_tags,
+                cls.parse_workers,
+                cls.parse_chunk_size,
+                cls.extraction_backend,
+                cls.lang_sample_size,
+                cls.use_page_lang,
+                cls.record_range,
+                cls.dedup_mode,
+                cls.near_duplicate_threshold,
+                cls.dedup_max_pages,
+                cls.data_shards,
+                cls.shard_workers,
+                cls.incremental,
+                cls.nlp_batch_size,
+                cls.nlp_processes,
+                cls.pipeline_profile,
+                cls.filter_entities,
+                cls.nlp_chunk_size,
+                cls.checkpoint_size,
+                cls.language_workers,
+                cls.models_memory_budget,
+                cls.lemma_cache_size]
 
@@ -2,9 +2,23 @@ class DictionaryParams:
     no_below = "no_below"
     no_above = "no_above"
     n_most_frequent = "n_most_frequent"
+    n_grams = "n_grams"
+    phrase_min_count = "phrase_min_count"
+    phrase_threshold = "phrase_threshold"
+    phrase_max_vocab_size = "phrase_max_vocab_size"
+    essentials_cache_size = "essentials_cache_size"
+    dictionary_workers = "dictionary_workers"
+    max_vocabulary_size = "max_vocabulary_size"
 
     @classmethod
     def get_dictionary_params_as_list(cls):
         return [cls.no_below,
                 cls.no_above,
-                cls.n_most_frequent]
+                cls.n_most_frequent,
+                cls.n_grams,
+                cls.phrase_min_count,
+                cls.phrase_threshold,
+                cls.phrase_max_vocab_size,
+                cls.essentials_cache_size,
+                cls.dictionary_workers,
+                cls.max_vocabulary_size]
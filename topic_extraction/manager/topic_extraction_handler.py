@@ -2,6 +2,7 @@ import logging
 import sys
 
 from topic_extraction.advisor import Advisor
+from topic_extraction.data.n_grams import NGrams
 from topic_extraction.data.text_preprocessor import TextPreprocessor
 from topic_extraction.manager.execution import Execution
 from topic_extraction.manager.interfaces.data_params import DataParams
@@ -13,7 +14,9 @@ from topic_extraction.manager.interfaces.versionify_params import VersionifyPara
 from topic_extraction.topic_model.hdp_topic_model import HdpTopicModel
 from topic_extraction.topic_model.lda_mallet_topic_model import LdaMalletTopicModel
 from topic_extraction.topic_model.lda_topic_model import LdaTopicModel
+from topic_extraction.topic_model.document_frequencies import DocumentFrequencies
 from topic_extraction.topic_model.lsi_topic_model import LsiTopicModel
+from topic_extraction.topic_model.topic_model_essential import TopicModelEssential
 from topic_extraction.visualization.comparative_view import ComparativeView
 
 logging.basicConfig(format='%(asctime)s --%(levelname)s %(message)s', level=logging.INFO)
@@ -27,9 +30,14 @@ class TopicExtractionHandler:
     def get_topic_extraction(self, passed_args):
         passed_args, data_args, dictionary_args, model_args, version_args, request_args = ExeParams.get_parameters(passed_args)
         Advisor.set_data_folder_path(data_args[DataParams.data_folder_path])
-        processed_data = self._get_processed_data(data_args, version_args)
+        processed_data = self._get_processed_data(data_args, version_args, request_args)
+        processed_data = self._get_phrased_data(processed_data, dictionary_args, version_args, request_args)
 
         all_models_args_values = ModelParams.get_possible_model_params_values()
+        TopicModelEssential.set_cache_size(dictionary_args[DictionaryParams.essentials_cache_size])
+        DocumentFrequencies.set_number_of_workers(dictionary_args[DictionaryParams.dictionary_workers])
+        DocumentFrequencies.set_max_vocabulary_size(dictionary_args[DictionaryParams.max_vocabulary_size])
+        DocumentFrequencies.set_n_grams_name(self._get_n_grams_name(dictionary_args))
 
         for requested_model_type in request_args[RequestParams.requested_models]:
             for lang in processed_data:
@@ -46,16 +54,64 @@ class TopicExtractionHandler:
                                                            version_args[VersionifyParams.data_version],
                                                            version_args[VersionifyParams.dictionary_version],
                                                            version_args[VersionifyParams.model_version])
+        TopicModelEssential.log_statistics()
         return
 
     @classmethod
-    def _get_processed_data(cls, data_args: dict, version_args: dict):
+    def _get_processed_data(cls, data_args: dict, version_args: dict, request_args: dict):
         return TextPreprocessor.get_processed_data(data_args[DataParams.data_file_name],
                                                    data_args[DataParams.data_file_extension],
                                                    version_args[VersionifyParams.data_version],
                                                    data_args[DataParams.data_file_type],
                                                    data_args[DataParams.include_tags],
-                                                   data_args[DataParams.exclude_tags])
+                                                   data_args[DataParams.exclude_tags],
+                                                   data_args[DataParams.parse_workers],
+                                                   data_args[DataParams.parse_chunk_size],
+                                                   data_args[DataParams.extraction_backend],
+                                                   data_args[DataParams.lang_sample_size],
+                                                   data_args[DataParams.use_page_lang],
+                                                   data_args[DataParams.record_range],
+                                                   data_args[DataParams.dedup_mode],
+                                                   data_args[DataParams.near_duplicate_threshold],
+                                                   data_args[DataParams.dedup_max_pages],
+                                                   data_args[DataParams.data_shards],
+                                                   data_args[DataParams.shard_workers],
+                                                   data_args[DataParams.incremental],
+                                                   data_args[DataParams.nlp_batch_size],
+                                                   data_args[DataParams.nlp_processes],
+                                                   data_args[DataParams.pipeline_profile],
+                                                   data_args[DataParams.filter_entities],
+                                                   data_args[DataParams.nlp_chunk_size],
+                                                   data_args[DataParams.checkpoint_size],
+                                                   request_args[RequestParams.requested_langs],
+                                                   data_args[DataParams.language_workers],
+                                                   data_args[DataParams.models_memory_budget],
+                                                   data_args[DataParams.lemma_cache_size])
+
+    @classmethod
+    def _get_phrased_data(cls, processed_data: dict, dictionary_args: dict, version_args: dict, request_args: dict):
+        if dictionary_args[DictionaryParams.n_grams] < 2:
+            return processed_data
+        for lang in processed_data:
+            if lang in request_args[RequestParams.requested_langs]:
+                processed_data[lang] = NGrams.get_phrased_documents(
+                    lang, version_args[VersionifyParams.data_version], processed_data[lang],
+                    dictionary_args[DictionaryParams.n_grams], dictionary_args[DictionaryParams.phrase_min_count],
+                    dictionary_args[DictionaryParams.phrase_threshold],
+                    dictionary_args[DictionaryParams.phrase_max_vocab_size])
+        return processed_data
+
+    @classmethod
+    def _get_n_grams_name(cls, dictionary_args: dict) -> str:
+        """
+        :return: the name of n-grams that phrases of processed data are joined by, empty if they are not joined
+        """
+        if dictionary_args[DictionaryParams.n_grams] < 2:
+            return ""
+        return NGrams.get_n_grams_name(dictionary_args[DictionaryParams.n_grams],
+                                       dictionary_args[DictionaryParams.phrase_min_count],
+                                       dictionary_args[DictionaryParams.phrase_threshold],
+                                       dictionary_args[DictionaryParams.phrase_max_vocab_size])
 
     @classmethod
     def _make_param_metrics_ready_to_plot(cls, param_metrics):
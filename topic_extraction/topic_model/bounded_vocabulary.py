@@ -0,0 +1,110 @@
+import logging
+from collections import defaultdict
+from collections.abc import Sequence
+from hashlib import blake2b
+
+import numpy
+
+
+class BoundedVocabulary:
+    """
+    Finds the words of processed data that can pass dictionary filters, by at most 'max_size' words in memory
+    instead of all words of data (that can be tens of millions for multilingual crawls):
+        • document frequencies of all words are counted approximately in a count-min sketch ('depth' rows of
+        'width' counters), its estimate of a word's frequency is never less than the exact one
+        • a table keeps the words that are being counted; a new word's count starts from its estimate in the
+        sketch, so the table's counts are never less than the exact ones either
+        • when the table has more than 'max_size' words (checked after each batch of documents) the words with the
+        least counts are pruned until at most half of 'max_size' words are left; the biggest count that is pruned
+        is kept as 'pruning_threshold'
+    Error bounds: a word that is not in the table at the end was pruned by a count that is at most
+    'pruning_threshold' and did not happen again, so its exact document frequency is at most 'pruning_threshold'.
+    The frequencies of the table's words are counted exactly afterwards (see "RestrictedDocuments"), so filtering
+    by no_below > 'pruning_threshold' (and any no_above) gives exactly the same dictionary as exact counting; with a
+    smaller no_below only words whose frequency is between no_below and 'pruning_threshold' may be missing.
+    The sketch over-estimates a frequency by at most e / width * (number of (word, document) pairs) with probability
+    1 - e ^ -depth; it does not change the bounds above, but more over-estimated rare words are kept by the table
+    """
+
+    def __init__(self, max_size: int, width: int = 2 ** 20, depth: int = 4):
+        """
+        :param max_size: maximum number of words in the table (at least 2)
+        :param width: number of counters of each row of the sketch
+        :param depth: number of rows (hash functions) of the sketch
+        """
+        self.max_size = max(max_size, 2)
+        self.width = width
+        self.depth = depth
+        self.sketch = numpy.zeros((depth, width), dtype=numpy.int64)
+        self.counts = dict()
+        self.pruning_threshold = 0
+        self.number_of_documents = 0
+
+    def __get_columns(self, word: str) -> numpy.ndarray:
+        """
+        :return: the word's counter in each row of the sketch
+        """
+        digest = blake2b(word.encode("utf-8", "surrogatepass"), digest_size=4 * self.depth).digest()
+        return numpy.frombuffer(digest, dtype=numpy.uint32) % self.width
+
+    def add_documents(self, documents, batch_size: int = 10000):
+        """
+        The table is only bounded after each batch: a batch's distinct words are counted apart and then all of them
+        are added to the table before it is pruned, so the table can have 'max_size' plus the number of distinct
+        words of one batch for a while (besides the batch's own counts); a smaller batch size keeps the peak closer
+        to 'max_size'
+        :param documents: sequence of documents that each of them is a list of words
+        :param batch_size: number of documents that are counted before the table is pruned
+        """
+        rows = numpy.arange(self.depth)
+        for start in range(0, len(documents), batch_size):
+            batch_counts = defaultdict(int)
+            for index in range(start, min(start + batch_size, len(documents))):
+                for word in set(documents[index]):
+                    batch_counts[word] += 1
+            self.number_of_documents += min(batch_size, len(documents) - start)
+            if not batch_counts:
+                continue
+            columns = numpy.stack([self.__get_columns(word) for word in batch_counts])
+            for word, count, word_columns in zip(batch_counts, batch_counts.values(), columns):
+                if word not in self.counts:
+                    self.counts[word] = int(self.sketch[rows, word_columns].min())
+                self.counts[word] += count
+            counts = numpy.fromiter(batch_counts.values(), dtype=numpy.int64, count=len(batch_counts))
+            for row in rows:
+                numpy.add.at(self.sketch[row], columns[:, row], counts)
+            if len(self.counts) > self.max_size:
+                self.__prune()
+        logging.info("---- Vocabulary of %d documents is bounded to %d words (pruned counts are at most %d)" %
+                     (self.number_of_documents, len(self.counts), self.pruning_threshold))
+        return
+
+    def __prune(self):
+        counts = numpy.fromiter(self.counts.values(), dtype=numpy.int64, count=len(self.counts))
+        kth = len(counts) - self.max_size // 2 - 1
+        threshold = int(numpy.partition(counts, kth)[kth])
+        self.pruning_threshold = max(self.pruning_threshold, threshold)
+        self.counts = {word: count for word, count in self.counts.items() if count > threshold}
+        return
+
+    def get_words(self) -> set:
+        return set(self.counts)
+
+
+class RestrictedDocuments(Sequence):
+    """
+    Documents without the words that are not in a vocabulary, they are filtered when a document is accessed
+    """
+
+    def __init__(self, words: set, documents):
+        self.words = words
+        self.documents = documents
+
+    def __len__(self):
+        return len(self.documents)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[document_index] for document_index in range(*index.indices(len(self)))]
+        words = self.words
+        return [word for word in self.documents[index] if word in words]
@@ -0,0 +1,340 @@
+import json
+import logging
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+from os import path, remove
+
+import numpy
+from gensim.corpora import Dictionary
+
+from topic_extraction.advisor import Advisor
+from topic_extraction.data.processed_documents import ProcessedDocuments
+from topic_extraction.topic_model.bounded_vocabulary import BoundedVocabulary, RestrictedDocuments
+from topic_extraction.topic_model.sparse_corpus import SparseCorpus
+
+
+class DocumentFrequencies:
+    """
+    Word and document frequencies of a language's processed data, that is the unfiltered dictionary (its dfs and
+    cfs) and the corpus by its ids. They are made once for a dictionary version and saved, then a dictionary of any
+    (no_below, no_above, n_most_frequent) is filtered from a copy of the unfiltered dictionary, and its corpus is
+    the unfiltered corpus that its ids are mapped to the filtered dictionary's ids by numpy, so processed data is not
+    read again; the result is the same as making the dictionary and the corpus from processed data.
+    With more than one worker, the unfiltered dictionary and corpus are made in parallel from contiguous shards of
+    processed data, and they are exactly the same as the ones that gensim makes in one pass (by its default
+    'prune_at', that is replaced by "BoundedVocabulary" when the vocabulary is bounded).
+    With a maximum vocabulary size, words that can not pass dictionary filters are pruned by "BoundedVocabulary"
+    before counting, so the unfiltered dictionary is bounded; its error bounds are kept as 'pruning_threshold'.
+    Frequencies are cached and saved by the maximum vocabulary size and the n-grams of processed data too (see
+    "get_counting_name"), so frequencies that are counted by another pruning or of other phrases are never used.
+    The number of documents and the vocabulary size of processed data are saved with frequencies, and they are
+    counted again when processed data is changed since then
+    """
+    document_frequencies = OrderedDict()
+    cache_size = 2
+    number_of_workers = 1
+    max_vocabulary_size = 0
+    n_grams_name = ""
+    shards_per_worker = 4
+    prune_at = 2000000
+    prune_check_interval = 10000
+    worker_processed_data = None
+
+    file_types = [["dictionary-unfiltered", "dict"], ["corpus-unfiltered", "npy"], ["vocabulary-pruning", "json"]]
+
+    def __init__(self, dictionary: Dictionary, corpus: SparseCorpus, pruning_threshold: int = 0):
+        """
+        :raise This should not be called, instead "get_document_frequencies" must be called
+        :param dictionary: unfiltered dictionary of processed data
+        :param corpus: corpus of processed data by the unfiltered dictionary's ids
+        :param pruning_threshold: words whose document frequency is at most this may be pruned, 0 for no pruning
+        """
+        self.dictionary = dictionary
+        self.corpus = corpus
+        self.pruning_threshold = pruning_threshold
+
+    @classmethod
+    def get_document_frequencies(cls, lang: str, data_version: int, dictionary_version: float,
+                                 language_processed_data: list):
+        """
+        First it looks for frequencies in memory and on disk, if they are not there they are made and saved
+        :return: DocumentFrequencies object
+        """
+        key = (lang, data_version, dictionary_version, cls.get_counting_name())
+        if key in cls.document_frequencies:
+            cls.document_frequencies.move_to_end(key)
+            return cls.document_frequencies[key]
+        dictionary_file_path, corpus_file_path, pruning_file_path = [
+            Advisor.get_dictionary_version_folder_file_path(lang, data_version, dictionary_version,
+                                                            "{}-{}".format(file_type[0], cls.get_counting_name()),
+                                                            file_type[1]) for file_type in cls.file_types]
+        data_size = cls.get_data_size(language_processed_data)
+        pruning = None
+        if SparseCorpus.exists(corpus_file_path) and path.exists(dictionary_file_path) and \
+                path.exists(pruning_file_path):
+            with open(pruning_file_path, "r") as json_file:
+                pruning = json.load(json_file)
+            if all(pruning.get(name) == size for name, size in data_size.items()):
+                logging.info("---- Word and document frequencies were counted before")
+                dictionary = Dictionary.load(dictionary_file_path)
+                pruning_threshold = pruning["pruning_threshold"]
+            else:
+                logging.info("---- Processed data of '%s' is changed since its frequencies were counted" % lang)
+                pruning = None
+        if pruning is None:
+            pruning_threshold = 0
+            if cls.max_vocabulary_size > 0:
+                vocabulary = BoundedVocabulary(cls.max_vocabulary_size)
+                vocabulary.add_documents(language_processed_data)
+                pruning_threshold = vocabulary.pruning_threshold
+                if pruning_threshold > 0:
+                    language_processed_data = RestrictedDocuments(vocabulary.get_words(), language_processed_data)
+            dictionary = None
+            if cls.number_of_workers > 1:
+                logging.info("---- Counting word and document frequencies of processed data by %d workers" %
+                             cls.number_of_workers)
+                dictionary = cls.__count_in_parallel(language_processed_data, corpus_file_path)
+            if dictionary is None:
+                logging.info("---- Counting word and document frequencies of processed data")
+                dictionary = Dictionary(language_processed_data, prune_at=cls.get_prune_at())
+                SparseCorpus.write(corpus_file_path, (dictionary.doc2bow(list_of_words_of_doc)
+                                                      for list_of_words_of_doc in language_processed_data))
+            dictionary.save(dictionary_file_path)
+            with open(pruning_file_path, "w") as json_file:
+                json.dump(dict(pruning_threshold=pruning_threshold, **data_size), json_file)
+        cls.document_frequencies[key] = DocumentFrequencies(dictionary, SparseCorpus.read(corpus_file_path),
+                                                            pruning_threshold)
+        while len(cls.document_frequencies) > cls.cache_size:
+            cls.document_frequencies.popitem(last=False)
+        return cls.document_frequencies[key]
+
+    @classmethod
+    def set_number_of_workers(cls, number_of_workers: int):
+        cls.number_of_workers = max(number_of_workers, 1)
+        return
+
+    @classmethod
+    def set_max_vocabulary_size(cls, max_vocabulary_size: int):
+        """
+        :param max_vocabulary_size: maximum number of words that are counted at once, 0 for exact counting
+        """
+        cls.max_vocabulary_size = max(max_vocabulary_size, 0)
+        return
+
+    @classmethod
+    def set_n_grams_name(cls, n_grams_name: str = ""):
+        """
+        :param n_grams_name: the name of n-grams that phrases of processed data are joined by
+        (NGrams.get_n_grams_name), empty for processed data without phrases
+        """
+        cls.n_grams_name = n_grams_name
+        return
+
+    @classmethod
+    def get_counting_name(cls) -> str:
+        """
+        :return: what frequencies are counted by, the maximum vocabulary size and the n-grams of processed data if
+        it has phrases
+        """
+        if cls.n_grams_name:
+            return "{}-{}".format(cls.max_vocabulary_size, cls.n_grams_name)
+        return str(cls.max_vocabulary_size)
+
+    @staticmethod
+    def get_data_size(language_processed_data) -> dict:
+        """
+        :return: number of documents and the vocabulary size of processed data, 0 for the vocabulary size of
+        documents that have no vocabulary (e.g. lists of words)
+        """
+        vocab = getattr(language_processed_data, "vocab", None)
+        return {"number_of_documents": len(language_processed_data),
+                "vocab_size": 0 if vocab is None else len(vocab)}
+
+    @classmethod
+    def get_prune_at(cls):
+        """
+        :return: gensim's 'prune_at' of the unfiltered dictionary, None when the vocabulary is bounded, since words
+        are pruned by "BoundedVocabulary" before counting then
+        """
+        return cls.prune_at if cls.max_vocabulary_size == 0 else None
+
+    @classmethod
+    def __count_in_parallel(cls, language_processed_data, corpus_file_path: str) -> Dictionary:
+        """
+        Workers count shards of processed data like gensim's Dictionary, each by its own local ids, and write the
+        shards' corpora. Then the shards are merged in their order: a shard's new words get the next global ids in
+        the order of its local ids, and document and collection frequencies are summed in the order that gensim
+        adds them, so ids and frequencies are the same as one pass over all documents. Workers map their corpus
+        shards to the global ids (entries are sorted by id again) and shards are concatenated into the corpus.
+        gensim prunes its dictionary when it has more than 'prune_at' words before one of every 10000 documents,
+        and pruning changes ids, so the size of the merged vocabulary at those documents is checked; if gensim would
+        prune it, the shards are dropped and processed data is counted in one pass instead
+        :return: unfiltered dictionary, None if it must be counted in one pass
+        """
+        number_of_documents = len(language_processed_data)
+        number_of_shards = cls.number_of_workers * cls.shards_per_worker
+        bounds = [number_of_documents * shard // number_of_shards for shard in range(number_of_shards + 1)]
+        shards_files_paths = ["{}-shard-{}.npy".format(path.splitext(corpus_file_path)[0], shard)
+                              for shard in range(number_of_shards)]
+        with ProcessPoolExecutor(max_workers=cls.number_of_workers, initializer=cls._init_worker,
+                                 initargs=cls._get_worker_args(language_processed_data)) as executor:
+            shards = list(executor.map(cls._count_shard, bounds[:-1], bounds[1:], shards_files_paths))
+
+            dictionary = Dictionary()
+            ids_maps = list()
+            prune_at = cls.get_prune_at()
+            for tokens, sizes, dfs, cfs, number_of_positions, number_of_nnz in shards:
+                number_of_words = len(dictionary.token2id)
+                ids_map = [dictionary.token2id.setdefault(token, len(dictionary.token2id)) for token in tokens]
+                new_words = numpy.cumsum(numpy.array(ids_map, dtype=numpy.int64) >= number_of_words)
+                if prune_at is not None and any(number_of_words + (new_words[size - 1] if size else 0) > prune_at
+                                                for size in sizes):
+                    logging.info("---- Vocabulary is bigger than %d words, so it is pruned like gensim in one pass" %
+                                 prune_at)
+                    cls.__remove_shards(shards_files_paths)
+                    return None
+                for local_id, frequency in dfs:
+                    dictionary.dfs[ids_map[local_id]] = dictionary.dfs.get(ids_map[local_id], 0) + frequency
+                for local_id, frequency in cfs:
+                    dictionary.cfs[ids_map[local_id]] = dictionary.cfs.get(ids_map[local_id], 0) + frequency
+                dictionary.num_pos += number_of_positions
+                dictionary.num_nnz += number_of_nnz
+                ids_maps.append(numpy.array(ids_map, dtype=numpy.int64))
+            dictionary.num_docs = number_of_documents
+            list(executor.map(cls._map_shard_ids, shards_files_paths, ids_maps))
+
+        shards = [SparseCorpus.read(shard_file_path) for shard_file_path in shards_files_paths]
+        pointers = [numpy.zeros(1, dtype=numpy.int64)]
+        for shard in shards:
+            pointers.append(shard.pointers[1:] + pointers[-1][-1])
+        SparseCorpus.write_arrays(corpus_file_path, numpy.concatenate(pointers),
+                                  numpy.concatenate([shard.ids for shard in shards]),
+                                  numpy.concatenate([shard.counts for shard in shards]))
+        cls.__remove_shards(shards_files_paths)
+        return dictionary
+
+    @classmethod
+    def __remove_shards(cls, shards_files_paths: list):
+        for shard_file_path in shards_files_paths:
+            for file_path in SparseCorpus.get_files_paths(shard_file_path):
+                remove(file_path)
+        return
+
+    @staticmethod
+    def _get_worker_args(language_processed_data) -> tuple:
+        """
+        Processed documents are not pickled to workers, only where they are read from (see "_init_worker")
+        :return: (location of processed documents or None, words of restricted documents or None, documents that
+        are not read from files or None)
+        """
+        words = None
+        if isinstance(language_processed_data, RestrictedDocuments):
+            words = language_processed_data.words
+            language_processed_data = language_processed_data.documents
+        if isinstance(language_processed_data, ProcessedDocuments):
+            return language_processed_data.location, words, None
+        return None, words, language_processed_data
+
+    @classmethod
+    def _init_worker(cls, location: tuple, words: set = None, documents=None):
+        """
+        Runs once in each worker process and reopens processed documents by their location, so their memory mapped
+        files are shared and processed data is not sent to workers for each shard
+        :param location: (lang, data_version, data_file_name, number_of_parts) of ProcessedDocuments, None for
+        documents that are passed
+        :param words: vocabulary of RestrictedDocuments, None if documents are not restricted
+        """
+        if location is not None:
+            documents = ProcessedDocuments.read(*location)
+        if words is not None:
+            documents = RestrictedDocuments(words, documents)
+        cls.worker_processed_data = documents
+        return
+
+    @classmethod
+    def _count_shard(cls, start: int, end: int, shard_file_path: str) -> tuple:
+        """
+        Runs in a worker process and counts documents [start, end) like gensim's Dictionary.doc2bow
+        :return: (words by their local ids, numbers of local words before each document that gensim checks for
+        pruning, [(local id, document frequency)], [(local id, collection frequency)], number of positions, number
+        of non zero entries); frequencies are in the order that gensim adds them
+        """
+        token2id = dict()
+        dfs = dict()
+        cfs = dict()
+        number_of_positions = 0
+        number_of_nnz = 0
+        sizes = list()
+        lengths = list()
+        ids = list()
+        counts = list()
+        for index in range(start, end):
+            if index % cls.prune_check_interval == 0:
+                sizes.append(len(token2id))
+            counter = defaultdict(int)
+            for word in cls.worker_processed_data[index]:
+                counter[word] += 1
+            for word in sorted(word for word in counter if word not in token2id):
+                token2id[word] = len(token2id)
+            result = {token2id[word]: frequency for word, frequency in counter.items()}
+            number_of_positions += sum(counter.values())
+            number_of_nnz += len(result)
+            for token_id, frequency in result.items():
+                cfs[token_id] = cfs.get(token_id, 0) + frequency
+                dfs[token_id] = dfs.get(token_id, 0) + 1
+            lengths.append(len(result))
+            ids.extend(result.keys())
+            counts.extend(result.values())
+        pointers = numpy.zeros(len(lengths) + 1, dtype=numpy.int64)
+        numpy.cumsum(lengths, out=pointers[1:])
+        SparseCorpus.write_arrays(shard_file_path, pointers, numpy.array(ids, dtype=numpy.int64),
+                                  numpy.array(counts, dtype=numpy.int64))
+        return list(token2id), sizes, list(dfs.items()), list(cfs.items()), number_of_positions, number_of_nnz
+
+    @classmethod
+    def _map_shard_ids(cls, shard_file_path: str, ids_map: numpy.ndarray):
+        """
+        Runs in a worker process and maps the shard's corpus to global ids, entries of each document are sorted by id
+        """
+        shard = SparseCorpus.read(shard_file_path)
+        ids = ids_map[shard.ids]
+        documents = numpy.repeat(numpy.arange(len(shard)), numpy.diff(shard.pointers))
+        order = numpy.lexsort((ids, documents))
+        SparseCorpus.write_arrays(shard_file_path, numpy.array(shard.pointers), ids[order],
+                                  numpy.array(shard.counts)[order])
+        return
+
+    def get_filtered_dictionary(self, no_below: int, no_above: float, n_most_frequent: int) -> Dictionary:
+        if no_below <= self.pruning_threshold:
+            logging.warning("---- Words whose document frequency is between %d (no_below) and %d were pruned while "
+                            "counting, so some of them may be missing from the dictionary" %
+                            (no_below, self.pruning_threshold))
+        dictionary = deepcopy(self.dictionary)
+        dictionary.filter_n_most_frequent(n_most_frequent)
+        dictionary.filter_extremes(no_below=no_below, no_above=no_above)
+        return dictionary
+
+    def get_ids_map(self, dictionary: Dictionary) -> numpy.ndarray:
+        """
+        :param dictionary: a filtered dictionary of the unfiltered one
+        :return: an array that maps an unfiltered id to its id in dictionary, -1 if it is filtered
+        """
+        ids_map = numpy.full(len(self.dictionary), -1, dtype=numpy.int64)
+        for token, token_id in dictionary.token2id.items():
+            ids_map[self.dictionary.token2id[token]] = token_id
+        return ids_map
+
+    def write_filtered_corpus(self, dictionary: Dictionary, corpus_file_path: str):
+        """
+        Writes the corpus of the filtered dictionary; filtered dictionaries keep the order of ids, so documents'
+        entries stay sorted by id like gensim's doc2bow
+        :param dictionary: a filtered dictionary of the unfiltered one
+        """
+        ids = self.get_ids_map(dictionary)[self.corpus.ids]
+        kept = ids >= 0
+        kept_before = numpy.zeros(len(kept) + 1, dtype=numpy.int64)
+        numpy.cumsum(kept, out=kept_before[1:])
+        SparseCorpus.write_arrays(corpus_file_path, kept_before[self.corpus.pointers], ids[kept],
+                                  self.corpus.counts[kept])
+        return
@@ -1,7 +1,7 @@
 import logging
 from os import path
 
-from gensim.models import TfidfModel, LsiModel, CoherenceModel
+from gensim.models import LsiModel, CoherenceModel
 
 from topic_extraction.advisor import Advisor
 from topic_extraction.visualization.model_view import ModelView
@@ -47,11 +47,11 @@ class LsiTopicModel(TopicModel):
                   param_name: str, param_version: int,
                   model_file_path: str, language_processed_data: list):
         logging.info("---- Create LSI model ")
-        tf_idf = TfidfModel(self.essentials.corpus)
-        tf_idf_corpus = tf_idf[self.essentials.corpus]
-        model = LsiModel(tf_idf_corpus,
-                         id2word=self.essentials.dictionary,
+        model = LsiModel(id2word=self.essentials.dictionary,
                          num_topics=self.number_of_topics)
+        for tf_idf_matrix in self.essentials.corpus.get_tf_idf_matrices(len(self.essentials.dictionary),
+                                                                         model.chunksize):
+            model.add_documents(tf_idf_matrix)
         model.save(model_file_path)
         self.model = model
         logging.info("---- LSI model is created")
@@ -0,0 +1,173 @@
+import logging
+from collections.abc import Sequence
+from os import path, remove, replace
+
+import numpy
+from scipy.sparse import csc_matrix
+
+
+class SparseCorpus(Sequence):
+    """
+    Bag of words corpus in compressed sparse row format instead of a list of lists of (word id, count) tuples:
+        • an int64 array of pointers, document i is the entries pointers[i]:pointers[i + 1]
+        • an int32 array of word ids and an int32 array of their counts
+    The arrays are memory mapped, so the corpus is not loaded in memory. It is a sequence of gensim's bag of words
+    documents (streamed one by one when it is iterated), so gensim's models and coherence models can use it as
+    their corpus; its arrays are also the compressed sparse column format of the (word, document) matrix of it,
+    which is used directly where gensim takes a sparse matrix (TF-IDF chunks of LSI)
+    """
+    pointer_dtype = numpy.int64
+    id_dtype = numpy.int32
+    count_dtype = numpy.int32
+    write_buffer_size = 1 << 20
+
+    array_names = ["pointers", "ids", "counts"]
+
+    def __init__(self, pointers: numpy.ndarray, ids: numpy.ndarray, counts: numpy.ndarray):
+        """
+        :raise This should not be called, instead "read" must be called
+        """
+        self.pointers = pointers
+        self.ids = ids
+        self.counts = counts
+
+    @classmethod
+    def get_files_paths(cls, corpus_file_path: str) -> list:
+        """
+        :param corpus_file_path: path of corpus (its extension is ignored)
+        :return: paths of pointers, ids and counts arrays
+        """
+        corpus_file_path = path.splitext(corpus_file_path)[0]
+        return ["{}-{}.npy".format(corpus_file_path, array_name) for array_name in cls.array_names]
+
+    @classmethod
+    def exists(cls, corpus_file_path: str) -> bool:
+        return all(path.exists(file_path) for file_path in cls.get_files_paths(corpus_file_path))
+
+    @classmethod
+    def read(cls, corpus_file_path: str):
+        """
+        :return: SparseCorpus object, None if some of its files are not there
+        """
+        if not cls.exists(corpus_file_path):
+            return None
+        return SparseCorpus(*[numpy.load(file_path, mmap_mode="r")
+                              for file_path in cls.get_files_paths(corpus_file_path)])
+
+    @classmethod
+    def write(cls, corpus_file_path: str, corpus):
+        """
+        Documents' ids and counts are appended to raw temporary files in buffers of 'write_buffer_size' entries, so
+        the corpus is never gathered in memory; then the raw files are memory mapped and saved as the arrays
+        :param corpus: iterable of bag of words documents, it is iterated once
+        """
+        ids_file_path, counts_file_path = cls.get_files_paths(corpus_file_path)[1:]
+        lengths = list()
+        with open(ids_file_path + ".raw", "wb") as ids_file, open(counts_file_path + ".raw", "wb") as counts_file:
+            ids = list()
+            counts = list()
+            for document in corpus:
+                lengths.append(len(document))
+                for word_id, count in document:
+                    ids.append(word_id)
+                    counts.append(count)
+                if len(ids) >= cls.write_buffer_size:
+                    numpy.array(ids, dtype=cls.id_dtype).tofile(ids_file)
+                    numpy.array(counts, dtype=cls.count_dtype).tofile(counts_file)
+                    ids.clear()
+                    counts.clear()
+            numpy.array(ids, dtype=cls.id_dtype).tofile(ids_file)
+            numpy.array(counts, dtype=cls.count_dtype).tofile(counts_file)
+        pointers = numpy.zeros(len(lengths) + 1, dtype=cls.pointer_dtype)
+        numpy.cumsum(lengths, out=pointers[1:])
+        if pointers[-1] > 0:
+            ids = numpy.memmap(ids_file_path + ".raw", dtype=cls.id_dtype, mode="r")
+            counts = numpy.memmap(counts_file_path + ".raw", dtype=cls.count_dtype, mode="r")
+        else:
+            ids = numpy.zeros(0, dtype=cls.id_dtype)
+            counts = numpy.zeros(0, dtype=cls.count_dtype)
+        cls.write_arrays(corpus_file_path, pointers, ids, counts)
+        del ids, counts
+        remove(ids_file_path + ".raw")
+        remove(counts_file_path + ".raw")
+        return
+
+    @classmethod
+    def write_arrays(cls, corpus_file_path: str, pointers: numpy.ndarray, ids: numpy.ndarray, counts: numpy.ndarray):
+        """
+        Writes a corpus that is already in compressed sparse row format.
+        Every file is written by a temporary name and then renamed, so a half-written corpus is never read
+        """
+        arrays = [pointers.astype(cls.pointer_dtype, copy=False), ids.astype(cls.id_dtype, copy=False),
+                  counts.astype(cls.count_dtype, copy=False)]
+        for file_path, array in zip(cls.get_files_paths(corpus_file_path), arrays):
+            with open(file_path + ".tmp", "wb") as npy_file:
+                numpy.save(npy_file, array)
+            replace(file_path + ".tmp", file_path)
+        logging.info("---- Corpus of %d documents (%d non zero entries) is written" % (len(pointers) - 1, len(ids)))
+        return
+
+    def __len__(self):
+        return len(self.pointers) - 1
+
+    def get_document(self, index: int) -> tuple:
+        """
+        :return: (word ids, counts) of the document, views of the memory mapped arrays (no copy)
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("document index out of range")
+        start, end = self.pointers[index], self.pointers[index + 1]
+        return self.ids[start:end], self.counts[start:end]
+
+    def __getitem__(self, index):
+        """
+        :return: the document's bag of words, or list of documents if index is a slice
+        """
+        if isinstance(index, slice):
+            return [self[document_index] for document_index in range(*index.indices(len(self)))]
+        ids, counts = self.get_document(index)
+        return list(zip(ids.tolist(), counts.tolist()))
+
+    def __iter__(self):
+        pointers = self.pointers.tolist()
+        for start, end in zip(pointers[:-1], pointers[1:]):
+            yield list(zip(self.ids[start:end].tolist(), self.counts[start:end].tolist()))
+
+    def get_csc_matrix(self, number_of_words: int, start: int = 0, end: int = None) -> csc_matrix:
+        """
+        :param number_of_words: number of rows, the size of the corpus' dictionary
+        :param start: first document (column) of the matrix
+        :param end: the document after the last one, by default the end of the corpus
+        :return: (word, document) matrix of counts of the documents over the memory mapped arrays (no copy)
+        """
+        end = len(self) if end is None else end
+        pointers = numpy.asarray(self.pointers[start:end + 1])
+        entries = slice(int(pointers[0]), int(pointers[-1]))
+        return csc_matrix((self.counts[entries], self.ids[entries], pointers - pointers[0]),
+                          shape=(number_of_words, end - start), copy=False)
+
+    def get_tf_idf_matrices(self, number_of_words: int, chunk_size: int):
+        """
+        TF-IDF of the corpus by numpy over its arrays instead of gensim's TfidfModel over bag of words documents,
+        with TfidfModel's default weights: count * log2(number of documents / document frequency), and each document
+        is normalized to unit length (words that are in all documents have zero weight and are dropped).
+        Models that take a sparse matrix as their corpus (LsiModel's add_documents) can use these chunks, so
+        documents are never converted to lists of tuples and back
+        :param number_of_words: number of rows, the size of the corpus' dictionary
+        :param chunk_size: number of documents (columns) of each matrix
+        :return: generator of (word, document) float64 matrices of chunks of documents, in their order
+        """
+        dfs = numpy.bincount(self.ids, minlength=number_of_words)
+        idfs = numpy.zeros(number_of_words)
+        numpy.log2(len(self) / dfs, out=idfs, where=dfs > 0)
+        for start in range(0, len(self), chunk_size):
+            matrix = self.get_csc_matrix(number_of_words, start, min(start + chunk_size, len(self)))
+            matrix = csc_matrix((matrix.data * idfs[matrix.indices], matrix.indices.copy(), matrix.indptr),
+                                shape=matrix.shape)
+            columns = numpy.repeat(numpy.arange(matrix.shape[1]), numpy.diff(matrix.indptr))
+            lengths = numpy.sqrt(numpy.bincount(columns, weights=matrix.data ** 2, minlength=matrix.shape[1]))
+            matrix.data /= numpy.where(lengths > 0, lengths, 1)[columns]
+            matrix.eliminate_zeros()
+            yield matrix
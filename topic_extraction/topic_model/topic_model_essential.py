@@ -1,15 +1,29 @@
 import logging
+from collections import OrderedDict
 from os import path
 
-from gensim.corpora import Dictionary, MmCorpus
+from gensim.corpora import Dictionary
 
 from topic_extraction.advisor import Advisor
+from topic_extraction.topic_model.document_frequencies import DocumentFrequencies
+from topic_extraction.topic_model.sparse_corpus import SparseCorpus
 
 
 class TopicModelEssential:
-    topic_model_essential = None
+    """
+    Dictionary and corpus of a language's processed data by some dictionary parameters.
+    They are cached by (lang, data_version, dictionary_version, no_below, no_above, n_most_frequent) and what their
+    word and document frequencies are counted by (DocumentFrequencies.get_counting_name), so models of different
+    languages and dictionary parameters can be made in one process; the least recently used ones are evicted when
+    there are more than 'cache_size' of them
+    """
+    topic_model_essentials = OrderedDict()
+    cache_size = 4
+    cache_hits = 0
+    cache_misses = 0
+    cache_evictions = 0
 
-    file_types = [["dictionary", "dict"], ["corpus", "mm"]]
+    file_types = [["dictionary", "dict"], ["corpus", "npy"]]
 
     @classmethod
     def init(cls,
@@ -20,11 +34,55 @@ class TopicModelEssential:
              no_below: int,
              no_above: float,
              n_most_frequent: int):
-        if cls.topic_model_essential is None:
-            cls.topic_model_essential = TopicModelEssential(lang, data_version, dictionary_version,
-                                                            language_processed_data,
-                                                            no_below, no_above, n_most_frequent)
-        return cls.topic_model_essential
+        key = (lang, data_version, dictionary_version, no_below, no_above, n_most_frequent,
+               DocumentFrequencies.get_counting_name())
+        if key in cls.topic_model_essentials:
+            cls.cache_hits += 1
+            cls.topic_model_essentials.move_to_end(key)
+            return cls.topic_model_essentials[key]
+        cls.cache_misses += 1
+        cls.topic_model_essentials[key] = TopicModelEssential(lang, data_version, dictionary_version,
+                                                              language_processed_data,
+                                                              no_below, no_above, n_most_frequent)
+        cls.__evict()
+        return cls.topic_model_essentials[key]
+
+    @classmethod
+    def set_cache_size(cls, cache_size: int):
+        """
+        :param cache_size: maximum number of cached dictionaries and corpora, at least the last one is kept
+        """
+        cls.cache_size = max(cache_size, 1)
+        cls.__evict()
+        return
+
+    @classmethod
+    def __evict(cls):
+        while len(cls.topic_model_essentials) > cls.cache_size:
+            key, _ = cls.topic_model_essentials.popitem(last=False)
+            cls.cache_evictions += 1
+            logging.info("---- Dictionary and corpus of %s are evicted from cache" % str(key))
+        return
+
+    @classmethod
+    def log_statistics(cls):
+        logging.info("--- Dictionary and corpus cache: %d hits, %d misses, %d cached, %d evicted" %
+                     (cls.cache_hits, cls.cache_misses, len(cls.topic_model_essentials), cls.cache_evictions))
+        return
+
+    @classmethod
+    def get_file_path(cls, lang: str, data_version: int, dictionary_version: float, no_below: int, no_above: float,
+                      n_most_frequent: int, file_type: list) -> str:
+        """
+        Files of a dictionary version are named by their dictionary parameters and what their frequencies are counted
+        by too (the maximum vocabulary size and the n-grams of processed data), so a dictionary version can have the
+        dictionaries and corpora of more than one value of the parameters
+        :param file_type: one of "file_types"
+        """
+        file_name = "{}-{}-{}-{}-{}".format(file_type[0], no_below, no_above, n_most_frequent,
+                                            DocumentFrequencies.get_counting_name())
+        return Advisor.get_dictionary_version_folder_file_path(lang, data_version, dictionary_version, file_name,
+                                                               file_type[1])
 
     def __init__(self,
                  lang: str,
@@ -36,16 +94,22 @@ class TopicModelEssential:
                  n_most_frequent: int):
         self.dictionary = None
         self.corpus = None
+        self.versions = (lang, data_version, dictionary_version)
         self.get_dictionary(lang, data_version, dictionary_version, no_above, no_below, n_most_frequent,
                             language_processed_data)
-        self.get_corpus(lang, data_version, dictionary_version, language_processed_data)
+        self.get_corpus(lang, data_version, dictionary_version, no_above, no_below, n_most_frequent,
+                        language_processed_data)
+
+    def get_document_frequencies(self, language_processed_data: list) -> DocumentFrequencies:
+        """
+        Frequencies are only needed when the dictionary or the corpus is not created before
+        """
+        return DocumentFrequencies.get_document_frequencies(*self.versions, language_processed_data)
 
     def set_dictionary(self, language_processed_data: list, no_below: int, no_above: float, n_most_frequent: int,
                        dictionary_file_path):
-        logging.info("---- Creating dictionary from processed data")
-        dic = Dictionary(language_processed_data)
-        dic.filter_n_most_frequent(n_most_frequent)
-        dic.filter_extremes(no_below=no_below, no_above=no_above)
+        logging.info("---- Creating dictionary from word and document frequencies")
+        dic = self.get_document_frequencies(language_processed_data).get_filtered_dictionary(no_below, no_above, n_most_frequent)
         dic.save(dictionary_file_path)
         self.dictionary = dic
         logging.info("---- Dictionary is created")
@@ -55,10 +119,8 @@ class TopicModelEssential:
                        language_processed_data: list):
         logging.info("--- Getting dictionary")
         if self.dictionary is None:
-            dictionary_file_path = Advisor.get_dictionary_version_folder_file_path(lang, data_version,
-                                                                                   dictionary_version,
-                                                                                   self.file_types[0][0],
-                                                                                   self.file_types[0][1])
+            dictionary_file_path = self.get_file_path(lang, data_version, dictionary_version, no_below, no_above,
+                                                      n_most_frequent, self.file_types[0])
             if path.exists(dictionary_file_path):
                 logging.info("---- Dictionary was created before")
                 self.dictionary = Dictionary.load(dictionary_file_path)
@@ -67,25 +129,24 @@ class TopicModelEssential:
         logging.info("--- Dictionary captured")
         return
 
-    def get_corpus(self, lang, data_version, dictionary_version, language_processed_data: list = None):
+    def get_corpus(self, lang, data_version, dictionary_version, no_above, no_below, n_most_frequent,
+                   language_processed_data: list = None):
         logging.info("--- Getting corpus")
         if self.corpus is None:
-            corpus_file_path = Advisor.get_dictionary_version_folder_file_path(lang, data_version, dictionary_version,
-                                                                               self.file_types[1][0],
-                                                                               self.file_types[1][1])
-            if path.exists(corpus_file_path):
+            corpus_file_path = self.get_file_path(lang, data_version, dictionary_version, no_below, no_above,
+                                                  n_most_frequent, self.file_types[1])
+            if SparseCorpus.exists(corpus_file_path):
                 logging.info("---- Corpus was created before")
-                self.corpus = list(MmCorpus(corpus_file_path))
+                self.corpus = SparseCorpus.read(corpus_file_path)
             else:
                 self.set_corpus(language_processed_data, corpus_file_path)
         logging.info("--- Corpus captured")
         return
 
     def set_corpus(self, language_processed_data: list, corpus_file_path: str):
-        logging.info("---- Creating corpus from processed data")
-        corpus = [self.dictionary.doc2bow(list_of_words_of_doc)
-                  for list_of_words_of_doc in language_processed_data]
-        MmCorpus.serialize(corpus_file_path, corpus)
-        self.corpus = corpus
+        logging.info("---- Creating corpus from the unfiltered corpus")
+        self.get_document_frequencies(language_processed_data).write_filtered_corpus(self.dictionary,
+                                                                                      corpus_file_path)
+        self.corpus = SparseCorpus.read(corpus_file_path)
         logging.info("---- Corpus is created")
         return